@@ -1,4 +1,16 @@
+import sys
 from .duckling import Duckling
+from .cache import ResultCache
 from .dim import Dim
+from .entity import Entity, WrapperEntity
+from .instrumentation import Instrumentation, ParseRecord
 from .language import Language
+from .prepared import PreparedParser
+from .server import DucklingServer
 from .wrapper import DucklingWrapper
+
+# the asyncio interfaces and DucklingPool use syntax and executor options
+# (initializer, mp_context) of Python 3.7
+if sys.version_info >= (3, 7):
+    from .aio import AsyncDuckling, AsyncDucklingWrapper
+    from .pool import DucklingPool
@@ -0,0 +1,295 @@
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from .duckling import Duckling
+from .jvm import attach_thread
+from .wrapper import DucklingWrapper
+
+_STREAM_END = object()
+
+
+class _AsyncExecutor(object):
+
+    def __init__(self, max_concurrency):
+        # every executor thread is attached to the JVM once when it starts
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_concurrency,
+            thread_name_prefix='duckling',
+            initializer=attach_thread)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    async def _run(self, function, args, kwargs, timeout):
+        loop = asyncio.get_running_loop()
+        future = loop.run_in_executor(
+            self._executor, functools.partial(function, *args, **kwargs))
+        return await asyncio.wait_for(future, timeout)
+
+    async def _stream(self, function, args, kwargs, timeout):
+        # every item of the stream is awaited on the executor, timeout applies
+        # to each of them
+        stream = await self._run(function, args, kwargs, timeout)
+        try:
+            while True:
+                item = await self._run(next, (stream, _STREAM_END), {}, timeout)
+                if item is _STREAM_END:
+                    return
+                yield item
+        finally:
+            await self._run(stream.close, (), {}, None)
+
+    def close(self, wait=True):
+        """Shuts down the executor.
+
+        Args:
+            wait: Optional parameter to wait for running parses. Default is
+                True.
+        """
+        self._executor.shutdown(wait=wait)
+
+
+class AsyncDuckling(_AsyncExecutor):
+
+    """asyncio interface for Duckling.
+
+    Provides an awaitable counterpart for every parse method of Duckling,
+    e.g. await duckling.parse_batch([u'2pm', u'42 degrees']), each accepting
+    an additional timeout keyword argument. parse_stream() returns an
+    asynchronous iterator instead.
+
+    Engine calls run on a dedicated thread pool whose threads are attached to
+    the JVM once, so awaiting a parse never blocks the event loop. Cancelling
+    a pending call removes it from the queue; a call that is already running
+    in the JVM completes in the background and its result is discarded.
+
+    Attributes:
+        duckling: Optional Duckling instance to use. Default creates a new
+            one with the remaining keyword arguments.
+        max_concurrency: Optional maximum number of parses running in the
+            JVM at the same time. Default is 4.
+    """
+
+    def __init__(self, duckling=None, max_concurrency=4, **kwargs):
+        super(AsyncDuckling, self).__init__(max_concurrency)
+        self.duckling = duckling or Duckling(**kwargs)
+
+    async def load(self, languages=[]):
+        """Asynchronous version of Duckling.load()."""
+        return await self._run(self.duckling.load, (languages,), {}, None)
+
+    async def parse(self, *args, timeout=None, **kwargs):
+        """Asynchronous version of Duckling.parse()."""
+        return await self._run(self.duckling.parse, args, kwargs, timeout)
+
+    async def parse_multilingual(self, *args, timeout=None, **kwargs):
+        """Asynchronous version of Duckling.parse_multilingual()."""
+        return await self._run(self.duckling.parse_multilingual, args, kwargs, timeout)
+
+    async def parse_batch(self, *args, timeout=None, **kwargs):
+        """Asynchronous version of Duckling.parse_batch()."""
+        return await self._run(self.duckling.parse_batch, args, kwargs, timeout)
+
+    async def parse_columns(self, *args, timeout=None, **kwargs):
+        """Asynchronous version of Duckling.parse_columns()."""
+        return await self._run(self.duckling.parse_columns, args, kwargs, timeout)
+
+    async def parse_document(self, *args, timeout=None, **kwargs):
+        """Asynchronous version of Duckling.parse_document()."""
+        return await self._run(self.duckling.parse_document, args, kwargs, timeout)
+
+    def parse_stream(self, *args, timeout=None, **kwargs):
+        """Asynchronous iterator version of Duckling.parse_stream().
+
+        The timeout applies to each item.
+        """
+        return self._stream(self.duckling.parse_stream, args, kwargs, timeout)
+
+
+class AsyncDucklingWrapper(_AsyncExecutor):
+
+    """asyncio interface for DucklingWrapper.
+
+    Provides an awaitable counterpart for every parse method of
+    DucklingWrapper, e.g. await wrapper.parse_time(u'tomorrow'), each accepting
+    an additional timeout keyword argument. parse_stream() returns an
+    asynchronous iterator instead. See AsyncDuckling for how calls are
+    executed and cancelled.
+
+    Attributes:
+        wrapper: Optional DucklingWrapper instance to use. Default creates a
+            new one with the remaining keyword arguments.
+        max_concurrency: Optional maximum number of parses running in the
+            JVM at the same time. Default is 4.
+    """
+
+    def __init__(self, wrapper=None, max_concurrency=4, **kwargs):
+        super(AsyncDucklingWrapper, self).__init__(max_concurrency)
+        self.wrapper = wrapper or DucklingWrapper(**kwargs)
+
+    async def parse(self, *args, timeout=None, **kwargs):
+        """Asynchronous version of DucklingWrapper.parse()."""
+        return await self._run(self.wrapper.parse, args, kwargs, timeout)
+
+    async def parse_batch(self, *args, timeout=None, **kwargs):
+        """Asynchronous version of DucklingWrapper.parse_batch()."""
+        return await self._run(self.wrapper.parse_batch, args, kwargs, timeout)
+
+    async def parse_document(self, *args, timeout=None, **kwargs):
+        """Asynchronous version of DucklingWrapper.parse_document()."""
+        return await self._run(self.wrapper.parse_document, args, kwargs, timeout)
+
+    def parse_stream(self, *args, timeout=None, **kwargs):
+        """Asynchronous iterator version of DucklingWrapper.parse_stream().
+
+        The timeout applies to each item.
+        """
+        return self._stream(self.wrapper.parse_stream, args, kwargs, timeout)
+
+    async def parse_time(self, *args, timeout=None, **kwargs):
+        """Asynchronous version of DucklingWrapper.parse_time()."""
+        return await self._run(self.wrapper.parse_time, args, kwargs, timeout)
+
+    async def parse_time_batch(self, *args, timeout=None, **kwargs):
+        """Asynchronous version of DucklingWrapper.parse_time_batch()."""
+        return await self._run(self.wrapper.parse_time_batch, args, kwargs, timeout)
+
+    async def parse_timezone(self, *args, timeout=None, **kwargs):
+        """Asynchronous version of DucklingWrapper.parse_timezone()."""
+        return await self._run(self.wrapper.parse_timezone, args, kwargs, timeout)
+
+    async def parse_timezone_batch(self, *args, timeout=None, **kwargs):
+        """Asynchronous version of DucklingWrapper.parse_timezone_batch()."""
+        return await self._run(self.wrapper.parse_timezone_batch, args, kwargs, timeout)
+
+    async def parse_temperature(self, *args, timeout=None, **kwargs):
+        """Asynchronous version of DucklingWrapper.parse_temperature()."""
+        return await self._run(self.wrapper.parse_temperature, args, kwargs, timeout)
+
+    async def parse_temperature_batch(self, *args, timeout=None, **kwargs):
+        """Asynchronous version of DucklingWrapper.parse_temperature_batch()."""
+        return await self._run(self.wrapper.parse_temperature_batch, args, kwargs, timeout)
+
+    async def parse_number(self, *args, timeout=None, **kwargs):
+        """Asynchronous version of DucklingWrapper.parse_number()."""
+        return await self._run(self.wrapper.parse_number, args, kwargs, timeout)
+
+    async def parse_number_batch(self, *args, timeout=None, **kwargs):
+        """Asynchronous version of DucklingWrapper.parse_number_batch()."""
+        return await self._run(self.wrapper.parse_number_batch, args, kwargs, timeout)
+
+    async def parse_ordinal(self, *args, timeout=None, **kwargs):
+        """Asynchronous version of DucklingWrapper.parse_ordinal()."""
+        return await self._run(self.wrapper.parse_ordinal, args, kwargs, timeout)
+
+    async def parse_ordinal_batch(self, *args, timeout=None, **kwargs):
+        """Asynchronous version of DucklingWrapper.parse_ordinal_batch()."""
+        return await self._run(self.wrapper.parse_ordinal_batch, args, kwargs, timeout)
+
+    async def parse_distance(self, *args, timeout=None, **kwargs):
+        """Asynchronous version of DucklingWrapper.parse_distance()."""
+        return await self._run(self.wrapper.parse_distance, args, kwargs, timeout)
+
+    async def parse_distance_batch(self, *args, timeout=None, **kwargs):
+        """Asynchronous version of DucklingWrapper.parse_distance_batch()."""
+        return await self._run(self.wrapper.parse_distance_batch, args, kwargs, timeout)
+
+    async def parse_volume(self, *args, timeout=None, **kwargs):
+        """Asynchronous version of DucklingWrapper.parse_volume()."""
+        return await self._run(self.wrapper.parse_volume, args, kwargs, timeout)
+
+    async def parse_volume_batch(self, *args, timeout=None, **kwargs):
+        """Asynchronous version of DucklingWrapper.parse_volume_batch()."""
+        return await self._run(self.wrapper.parse_volume_batch, args, kwargs, timeout)
+
+    async def parse_money(self, *args, timeout=None, **kwargs):
+        """Asynchronous version of DucklingWrapper.parse_money()."""
+        return await self._run(self.wrapper.parse_money, args, kwargs, timeout)
+
+    async def parse_money_batch(self, *args, timeout=None, **kwargs):
+        """Asynchronous version of DucklingWrapper.parse_money_batch()."""
+        return await self._run(self.wrapper.parse_money_batch, args, kwargs, timeout)
+
+    async def parse_duration(self, *args, timeout=None, **kwargs):
+        """Asynchronous version of DucklingWrapper.parse_duration()."""
+        return await self._run(self.wrapper.parse_duration, args, kwargs, timeout)
+
+    async def parse_duration_batch(self, *args, timeout=None, **kwargs):
+        """Asynchronous version of DucklingWrapper.parse_duration_batch()."""
+        return await self._run(self.wrapper.parse_duration_batch, args, kwargs, timeout)
+
+    async def parse_email(self, *args, timeout=None, **kwargs):
+        """Asynchronous version of DucklingWrapper.parse_email()."""
+        return await self._run(self.wrapper.parse_email, args, kwargs, timeout)
+
+    async def parse_email_batch(self, *args, timeout=None, **kwargs):
+        """Asynchronous version of DucklingWrapper.parse_email_batch()."""
+        return await self._run(self.wrapper.parse_email_batch, args, kwargs, timeout)
+
+    async def parse_url(self, *args, timeout=None, **kwargs):
+        """Asynchronous version of DucklingWrapper.parse_url()."""
+        return await self._run(self.wrapper.parse_url, args, kwargs, timeout)
+
+    async def parse_url_batch(self, *args, timeout=None, **kwargs):
+        """Asynchronous version of DucklingWrapper.parse_url_batch()."""
+        return await self._run(self.wrapper.parse_url_batch, args, kwargs, timeout)
+
+    async def parse_phone_number(self, *args, timeout=None, **kwargs):
+        """Asynchronous version of DucklingWrapper.parse_phone_number()."""
+        return await self._run(self.wrapper.parse_phone_number, args, kwargs, timeout)
+
+    async def parse_phone_number_batch(self, *args, timeout=None, **kwargs):
+        """Asynchronous version of DucklingWrapper.parse_phone_number_batch()."""
+        return await self._run(self.wrapper.parse_phone_number_batch, args, kwargs, timeout)
+
+    async def parse_leven_product(self, *args, timeout=None, **kwargs):
+        """Asynchronous version of DucklingWrapper.parse_leven_product()."""
+        return await self._run(self.wrapper.parse_leven_product, args, kwargs, timeout)
+
+    async def parse_leven_product_batch(self, *args, timeout=None, **kwargs):
+        """Asynchronous version of DucklingWrapper.parse_leven_product_batch()."""
+        return await self._run(self.wrapper.parse_leven_product_batch, args, kwargs, timeout)
+
+    async def parse_leven_unit(self, *args, timeout=None, **kwargs):
+        """Asynchronous version of DucklingWrapper.parse_leven_unit()."""
+        return await self._run(self.wrapper.parse_leven_unit, args, kwargs, timeout)
+
+    async def parse_leven_unit_batch(self, *args, timeout=None, **kwargs):
+        """Asynchronous version of DucklingWrapper.parse_leven_unit_batch()."""
+        return await self._run(self.wrapper.parse_leven_unit_batch, args, kwargs, timeout)
+
+    async def parse_quantity(self, *args, timeout=None, **kwargs):
+        """Asynchronous version of DucklingWrapper.parse_quantity()."""
+        return await self._run(self.wrapper.parse_quantity, args, kwargs, timeout)
+
+    async def parse_quantity_batch(self, *args, timeout=None, **kwargs):
+        """Asynchronous version of DucklingWrapper.parse_quantity_batch()."""
+        return await self._run(self.wrapper.parse_quantity_batch, args, kwargs, timeout)
+
+    async def parse_cycle(self, *args, timeout=None, **kwargs):
+        """Asynchronous version of DucklingWrapper.parse_cycle()."""
+        return await self._run(self.wrapper.parse_cycle, args, kwargs, timeout)
+
+    async def parse_cycle_batch(self, *args, timeout=None, **kwargs):
+        """Asynchronous version of DucklingWrapper.parse_cycle_batch()."""
+        return await self._run(self.wrapper.parse_cycle_batch, args, kwargs, timeout)
+
+    async def parse_unit(self, *args, timeout=None, **kwargs):
+        """Asynchronous version of DucklingWrapper.parse_unit()."""
+        return await self._run(self.wrapper.parse_unit, args, kwargs, timeout)
+
+    async def parse_unit_batch(self, *args, timeout=None, **kwargs):
+        """Asynchronous version of DucklingWrapper.parse_unit_batch()."""
+        return await self._run(self.wrapper.parse_unit_batch, args, kwargs, timeout)
+
+    async def parse_unit_of_duration(self, *args, timeout=None, **kwargs):
+        """Asynchronous version of DucklingWrapper.parse_unit_of_duration()."""
+        return await self._run(self.wrapper.parse_unit_of_duration, args, kwargs, timeout)
+
+    async def parse_unit_of_duration_batch(self, *args, timeout=None, **kwargs):
+        """Asynchronous version of DucklingWrapper.parse_unit_of_duration_batch()."""
+        return await self._run(self.wrapper.parse_unit_of_duration_batch, args, kwargs, timeout)
+
@@ -0,0 +1,240 @@
+"""Benchmark suite for Duckling.
+
+Measures JVM start, requiring duckling.core, loading per language, parse
+latency percentiles per dim and input length, the cost of converting Duckling
+results to Python (_parse_result) and the DucklingWrapper post-processing.
+Parses use a fixed reference time, so runs are comparable over time.
+
+Usage:
+    python -m duckling.bench [--out results.json] [--baseline baseline.json]
+
+With a baseline, every timing which got slower by more than the tolerance is
+reported and the exit code is 1.
+"""
+
+import sys
+import json
+import time
+import argparse
+import platform
+import jpype
+from timeit import default_timer as timer
+from .duckling import Duckling
+from .wrapper import DucklingWrapper
+from .dim import Dim
+from .language import Language
+
+REFERENCE_TIME = u'2013-02-12T04:30:00-02:00'
+
+CORPUS = {
+    Dim.TIME:          [u'tomorrow at 5pm', u'the day before labor day 2020',
+                        u'from 9am to 11am on monday'],
+    Dim.NUMBER:        [u'forty-two', u'3.5 million', u'twenty one'],
+    Dim.ORDINAL:       [u'the second one', u'21st'],
+    Dim.AMOUNTOFMONEY: [u'$20', u'you owe me twenty bucks'],
+    Dim.DISTANCE:      [u'5 miles', u'42km'],
+    Dim.DURATION:      [u'2 hours', u'42 days'],
+    Dim.TEMPERATURE:   [u'65 degrees', u'thirty two celsius'],
+    Dim.VOLUME:        [u'1 gallon', u'3785ml'],
+    Dim.EMAIL:         [u'contact@frank-blechschmidt.com'],
+    Dim.URL:           [u'github.com/FraBle'],
+    Dim.PHONENUMBER:   [u'(650)-424-4242']
+}
+
+FILLER = u' and then we talked about all the other things'
+
+INPUT_LENGTHS = {
+    u'short': 0,
+    u'medium': 100,
+    u'long': 1000
+}
+
+
+def percentiles(samples):
+    """Returns count, mean and p50/p90/p99/max of samples in milliseconds."""
+    samples = sorted(samples)
+
+    def rank(percent):
+        return samples[min(len(samples) - 1, int(len(samples) * percent / 100.0))]
+
+    return {
+        u'count': len(samples),
+        u'mean_ms': 1000.0 * sum(samples) / len(samples),
+        u'p50_ms': 1000.0 * rank(50),
+        u'p90_ms': 1000.0 * rank(90),
+        u'p99_ms': 1000.0 * rank(99),
+        u'max_ms': 1000.0 * samples[-1]
+    }
+
+
+def pad(text, length):
+    """Pads text with filler sentences to at least length characters."""
+    while len(text) < length:
+        text += FILLER
+    return text
+
+
+class _TimedDuckling(Duckling):
+
+    jvm_start_time = 0.0
+
+    def _start_jvm(self, minimum_heap_size, maximum_heap_size):
+        started = timer()
+        super(_TimedDuckling, self)._start_jvm(minimum_heap_size, maximum_heap_size)
+        self.jvm_start_time = timer() - started
+
+
+def _time(function, iterations):
+    samples = []
+    for _ in range(iterations):
+        started = timer()
+        function()
+        samples.append(timer() - started)
+    return samples
+
+
+def run(languages=[Language.ENGLISH], iterations=100, warmup=20):
+    """Runs all benchmarks.
+
+    Args:
+        languages: Optional languages to measure load() for. English is always
+            loaded since the parse benchmarks use English inputs.
+        iterations: Optional number of measured calls per benchmark.
+        warmup: Optional number of unmeasured calls before each benchmark.
+
+    Returns:
+        A dict with the environment under u'meta' and the measurements under
+        u'results'.
+    """
+    started = timer()
+    duckling = _TimedDuckling()
+    startup = {
+        u'jvm_start_s': duckling.jvm_start_time,
+        u'require_s': timer() - started - duckling.jvm_start_time
+    }
+
+    load = {}
+    for language in languages:
+        started = timer()
+        duckling.load([language])
+        load[Language.convert_to_iso(language)] = timer() - started
+    duckling.load([Language.ENGLISH])
+
+    clojure_parse = duckling.clojure.var("duckling.core", "parse")
+    reference_context = duckling._reference_time_context(REFERENCE_TIME)
+    wrapper = DucklingWrapper(jvm_started=True)
+
+    parse = {}
+    conversion = {}
+    postprocessing = {}
+    for dim, inputs in sorted(CORPUS.items()):
+        dim_filter = duckling._dim_filter(dim)
+        parse[dim] = {}
+        for length_name, length in sorted(INPUT_LENGTHS.items()):
+            padded = [pad(text, length) for text in inputs]
+            calls = [lambda text=text: duckling.parse(
+                text, dim_filter=dim, reference_time=REFERENCE_TIME) for text in padded]
+            _time(lambda: [call() for call in calls], warmup)
+            samples = []
+            for call in calls:
+                samples.extend(_time(call, iterations))
+            parse[dim][length_name] = percentiles(samples)
+
+        raw_results = [clojure_parse.invoke(Language.ENGLISH, text, dim_filter, reference_context)
+                       for text in inputs]
+        converted = [duckling._parse_result(raw_result) for raw_result in raw_results]
+        samples = []
+        for raw_result in raw_results:
+            samples.extend(_time(lambda: duckling._parse_result(raw_result), iterations))
+        conversion[dim] = percentiles(samples)
+        samples = []
+        for result in converted:
+            samples.extend(_time(lambda: wrapper._process(result), iterations))
+        postprocessing[dim] = percentiles(samples)
+
+    return {
+        u'meta': {
+            u'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+            u'python': platform.python_version(),
+            u'jpype': getattr(jpype, '__version__', None),
+            u'jvm': jpype.getDefaultJVMPath(),
+            u'classpath': duckling._create_classpath(),
+            u'iterations': iterations
+        },
+        u'results': {
+            u'startup': startup,
+            u'load_s': load,
+            u'parse': parse,
+            u'conversion': conversion,
+            u'wrapper_postprocessing': postprocessing
+        }
+    }
+
+
+def _flatten(results, prefix=u''):
+    flat = {}
+    for key, value in results.items():
+        name = u'{prefix}{key}'.format(prefix=prefix, key=key)
+        if isinstance(value, dict):
+            flat.update(_flatten(value, name + u'.'))
+        elif isinstance(value, float):
+            flat[name] = value
+    return flat
+
+
+def compare(results, baseline, tolerance=0.2):
+    """Compares results with a baseline.
+
+    Args:
+        results: The results of run().
+        baseline: The results of a previous run().
+        tolerance: Optional relative slowdown which is still accepted.
+
+    Returns:
+        A list of (metric, baseline value, current value) for every timing
+        slower than baseline * (1 + tolerance).
+    """
+    current = _flatten(results[u'results'])
+    previous = _flatten(baseline[u'results'])
+    return [(metric, previous[metric], current[metric])
+            for metric in sorted(set(current) & set(previous))
+            if current[metric] > previous[metric] * (1 + tolerance)]
+
+
+def main(argv=None):
+    arg_parser = argparse.ArgumentParser(
+        prog='python -m duckling.bench',
+        description='Benchmark Duckling startup, load, parse and conversion.')
+    arg_parser.add_argument('--out', default=None,
+                            help='write results as JSON to this file (default: stdout)')
+    arg_parser.add_argument('--baseline', default=None,
+                            help='compare against results of a previous run')
+    arg_parser.add_argument('--tolerance', type=float, default=0.2,
+                            help='accepted relative slowdown (default: 0.2)')
+    arg_parser.add_argument('--languages', default='en',
+                            help='comma-separated languages to measure load() for')
+    arg_parser.add_argument('--iterations', type=int, default=100)
+    arg_parser.add_argument('--warmup', type=int, default=20)
+    args = arg_parser.parse_args(argv)
+
+    results = run(languages=args.languages.split(','),
+                  iterations=args.iterations, warmup=args.warmup)
+    if args.out:
+        with open(args.out, 'w') as out_file:
+            json.dump(results, out_file, indent=2, sort_keys=True)
+    else:
+        json.dump(results, sys.stdout, indent=2, sort_keys=True)
+        sys.stdout.write('\n')
+
+    if args.baseline:
+        with open(args.baseline) as baseline_file:
+            regressions = compare(results, json.load(baseline_file), args.tolerance)
+        for metric, previous, current in regressions:
+            sys.stderr.write('REGRESSION {metric}: {previous:.4f} -> {current:.4f}\n'.format(
+                metric=metric, previous=previous, current=current))
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,141 @@
+import sys
+import time
+import calendar
+import threading
+from collections import OrderedDict
+from six import text_type
+from .dim import Dim
+
+
+class ResultCache(object):
+
+    """Bounded in-process LRU cache for Duckling results.
+
+    Entries are keyed on input string, language, dims, reference time and
+    the output options of the parsing instance, so a cache can be shared by
+    instances with different options.
+    Results which may contain times relative to the current time (parses
+    including Dim.TIME without an explicit reference time) are stored per
+    reference-time bucket and expire when the bucket ends. All other entries
+    never expire and are only evicted when the cache is full.
+
+    Cached results are shared between callers and must not be modified.
+
+    Attributes:
+        max_entries: Optional maximum number of cached results. Default is
+            10000.
+        max_bytes: Optional maximum estimated size of all cached results in
+            bytes. Default is None (no limit).
+        time_bucket: Optional size of the reference-time bucket in seconds,
+            e.g. ResultCache.MINUTE or ResultCache.DAY. Buckets are aligned to
+            local time. Default is ResultCache.MINUTE.
+    """
+
+    MINUTE = 60
+    HOUR = 60 * 60
+    DAY = 24 * 60 * 60
+
+    def __init__(self, max_entries=10000, max_bytes=None, time_bucket=MINUTE):
+        if not max_entries and not max_bytes:
+            raise ValueError('Either max_entries or max_bytes has to be set')
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.time_bucket = time_bucket
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def key(self, input_str, language, dims, reference_time, options=()):
+        """Builds the cache key for a parse request.
+
+        Args:
+            input_str: The input string.
+            language: The Duckling language id.
+            dims: A list of dims, empty for all dims.
+            reference_time: The reference time of the request, None or ''
+                for the current time.
+            options: Optional tuple of the output options of the parsing
+                instance which change the shape of its results.
+
+        Returns:
+            A tuple of the cache key and the expiry timestamp of the entry,
+            None if the entry never expires.
+        """
+        dims = tuple(sorted(dims))
+        if reference_time not in (None, '') or (dims and Dim.TIME not in dims):
+            return (text_type(input_str), language, dims, reference_time, options), None
+        now = time.time()
+        local_now = calendar.timegm(time.localtime(now))
+        bucket = int(local_now // self.time_bucket)
+        expires = now + (bucket + 1) * self.time_bucket - local_now
+        return (text_type(input_str), language, dims, ('bucket', bucket), options), expires
+
+    def get(self, key, default=None):
+        """Returns the cached result for key, or default on a miss."""
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            if entry is None:
+                self.misses += 1
+                return default
+            value, expires, size = entry
+            if expires is not None and expires <= time.time():
+                self._bytes -= size
+                self.expirations += 1
+                self.misses += 1
+                return default
+            # re-insert to mark the entry as most recently used
+            self._entries[key] = entry
+            self.hits += 1
+            return value
+
+    def put(self, key, value, expires=None):
+        """Stores a result, evicting least recently used entries if full."""
+        size = _estimate_size(value) if self.max_bytes else 0
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._bytes -= previous[2]
+            self._entries[key] = (value, expires, size)
+            self._bytes += size
+            while self._entries and (
+                    (self.max_entries and len(self._entries) > self.max_entries) or
+                    (self.max_bytes and self._bytes > self.max_bytes)):
+                _, (_, _, evicted_size) = self._entries.popitem(last=False)
+                self._bytes -= evicted_size
+                self.evictions += 1
+
+    def clear(self):
+        """Removes all entries, keeping the counters."""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self):
+        """Returns the cache counters as dict."""
+        with self._lock:
+            return {
+                u'entries': len(self._entries),
+                u'bytes': self._bytes,
+                u'hits': self.hits,
+                u'misses': self.misses,
+                u'evictions': self.evictions,
+                u'expirations': self.expirations
+            }
+
+
+def _estimate_size(value):
+    size = sys.getsizeof(value)
+    if isinstance(value, dict):
+        for key, item in value.items():
+            size += _estimate_size(key) + _estimate_size(item)
+    elif isinstance(value, (list, tuple)):
+        for item in value:
+            size += _estimate_size(item)
+    return size
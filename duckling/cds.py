@@ -0,0 +1,175 @@
+"""JVM Class Data Sharing (AppCDS) archive for the bundled Duckling classpath.
+
+Building the archive runs a separate JVM which loads duckling.core, records
+the loaded classes and dumps them into a shared archive. Duckling uses the
+archive automatically on start when it matches the JVM and classpath, which
+saves loading and verifying the Clojure classes on every cold start.
+
+Usage:
+    python -m duckling.cds build [--archive PATH]
+    python -m duckling.cds status [--archive PATH]
+    python -m duckling.cds remove [--archive PATH]
+
+The archive location defaults to ~/.cache/duckling/duckling.jsa and can be
+overridden with the DUCKLING_CDS_ARCHIVE environment variable.
+"""
+
+import os
+import sys
+import json
+import argparse
+import tempfile
+import subprocess
+import jpype
+
+
+def default_archive_path():
+    """Returns the archive path from DUCKLING_CDS_ARCHIVE or the default."""
+    return os.environ.get(
+        'DUCKLING_CDS_ARCHIVE',
+        os.path.join(os.path.expanduser('~'), '.cache', 'duckling', 'duckling.jsa'))
+
+
+def _metadata_path(archive_path):
+    return archive_path + '.json'
+
+
+def _fingerprint(jvm_path, classpath):
+    jvm_stat = os.stat(jvm_path)
+    return {
+        u'jvm_path': jvm_path,
+        u'jvm_size': jvm_stat.st_size,
+        u'jvm_mtime': int(jvm_stat.st_mtime),
+        u'classpath': classpath
+    }
+
+
+def _java_executable(jvm_path):
+    # libjvm lives in <java home>/[jre/]lib/[<arch>/]server, java in <java home>/bin
+    directory = os.path.dirname(jvm_path)
+    while directory != os.path.dirname(directory):
+        for name in ('java', 'java.exe'):
+            executable = os.path.join(directory, 'bin', name)
+            if os.path.isfile(executable):
+                return executable
+        directory = os.path.dirname(directory)
+    raise RuntimeError(
+        'No java executable found for JVM {jvm}'.format(jvm=jvm_path))
+
+
+def jvm_options(classpath, archive_path=None, jvm_path=None):
+    """Returns the JVM options to use the archive, if it matches.
+
+    Args:
+        classpath: The classpath the JVM is started with.
+        archive_path: Optional archive path, defaults to
+            default_archive_path().
+        jvm_path: Optional path of the JVM library, defaults to JPype's
+            default JVM.
+
+    Returns:
+        A list of JVM options, empty if there is no archive or it was built
+        for another JVM or classpath.
+    """
+    archive_path = archive_path or default_archive_path()
+    try:
+        with open(_metadata_path(archive_path)) as metadata_file:
+            metadata = json.load(metadata_file)
+        if not os.path.isfile(archive_path) or metadata != _fingerprint(
+                jvm_path or jpype.getDefaultJVMPath(), classpath):
+            return []
+    except (IOError, OSError, ValueError):
+        return []
+    # -Xshare:auto silently falls back to no sharing if the JVM rejects it
+    return [
+        '-XX:SharedArchiveFile={archive}'.format(archive=archive_path),
+        '-Xshare:auto'
+    ]
+
+
+def build(archive_path=None, jvm_path=None):
+    """Builds the archive for the bundled classpath.
+
+    A JVM is started which requires duckling.core and loads the interop
+    helpers, while the loaded classes are recorded. The classes are then
+    dumped into the archive.
+
+    Args:
+        archive_path: Optional archive path, defaults to
+            default_archive_path().
+        jvm_path: Optional path of the JVM library, defaults to JPype's
+            default JVM.
+
+    Returns:
+        The path of the archive.
+    """
+    from .duckling import Duckling
+
+    archive_path = archive_path or default_archive_path()
+    jvm_path = jvm_path or jpype.getDefaultJVMPath()
+    java = _java_executable(jvm_path)
+    classpath = Duckling._create_classpath()
+    archive_dir = os.path.dirname(os.path.abspath(archive_path))
+    if not os.path.isdir(archive_dir):
+        os.makedirs(archive_dir)
+
+    warmup = '(require (quote duckling.core)) (load-file "{interop}")'.format(
+        interop=Duckling._interop_path().replace('\\', '\\\\'))
+    class_list = tempfile.NamedTemporaryFile(suffix='.classlist', delete=False)
+    class_list.close()
+    try:
+        subprocess.check_call([
+            java, '-Xshare:off',
+            '-XX:DumpLoadedClassList={path}'.format(path=class_list.name),
+            '-cp', classpath, 'clojure.main', '-e', warmup])
+        subprocess.check_call([
+            java, '-Xshare:dump',
+            '-XX:SharedClassListFile={path}'.format(path=class_list.name),
+            '-XX:SharedArchiveFile={archive}'.format(archive=archive_path),
+            '-cp', classpath])
+    finally:
+        os.remove(class_list.name)
+
+    with open(_metadata_path(archive_path), 'w') as metadata_file:
+        json.dump(_fingerprint(jvm_path, classpath), metadata_file)
+    return archive_path
+
+
+def remove(archive_path=None):
+    """Removes the archive and its metadata."""
+    archive_path = archive_path or default_archive_path()
+    for path in (archive_path, _metadata_path(archive_path)):
+        if os.path.exists(path):
+            os.remove(path)
+
+
+def main(argv=None):
+    from .duckling import Duckling
+
+    arg_parser = argparse.ArgumentParser(
+        prog='python -m duckling.cds',
+        description='Manage the JVM class data sharing archive for Duckling.')
+    arg_parser.add_argument('command', choices=['build', 'status', 'remove'])
+    arg_parser.add_argument('--archive', default=None,
+                            help='archive path (default: {path})'.format(
+                                path=default_archive_path()))
+    arg_parser.add_argument('--jvm', default=None,
+                            help='path of the JVM library (default: JPype\'s default JVM)')
+    args = arg_parser.parse_args(argv)
+
+    if args.command == 'build':
+        print('Archive written to {path}'.format(
+            path=build(args.archive, args.jvm)))
+    elif args.command == 'remove':
+        remove(args.archive)
+    else:
+        options = jvm_options(Duckling._create_classpath(), args.archive, args.jvm)
+        print('Archive {path} is {state}'.format(
+            path=args.archive or default_archive_path(),
+            state='valid' if options else 'missing or outdated'))
+        return 0 if options else 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
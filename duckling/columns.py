@@ -0,0 +1,36 @@
+try:
+    import numpy
+except ImportError:  # numpy is an optional dependency
+    numpy = None
+
+# the order of the primitive arrays returned by duckling.interop/parse-batch-columns
+COLUMNS = (u'input_index', u'start', u'end', u'dim', u'value', u'time')
+
+
+def to_columns(java_columns):
+    """Converts the primitive Java arrays of parse-batch-columns to numpy.
+
+    JPype exposes primitive arrays through the buffer protocol, so the
+    columns are created without a Python object per element.
+
+    Args:
+        java_columns: The Object[] returned by parse-batch-columns.
+
+    Returns:
+        A dict of column name to numpy array:
+            input_index: int32 index of the input of each entity.
+            start: int32 start index of each entity in its input.
+            end: int32 end index of each entity in its input.
+            dim: int32 code of the dim of each entity, see Dim.code().
+            value: float64 numeric value, NaN if the entity has none.
+            time: datetime64[ms] (UTC) time value or start of the interval,
+                NaT if the entity is not a time.
+    """
+    if numpy is None:
+        raise ImportError('Columnar results require numpy, install it with '
+                          '"pip install duckling[numpy]"')
+    columns = dict((name, numpy.asarray(memoryview(java_array)))
+                   for name, java_array in zip(COLUMNS, java_columns))
+    # Long.MIN_VALUE is numpy's NaT
+    columns[u'time'] = columns[u'time'].view('datetime64[ms]')
+    return columns
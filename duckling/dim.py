@@ -21,3 +21,37 @@ class Dim(object):
     UNITOFDURATION = u'unit-of-duration'
     URL = u'url'
     VOLUME = u'volume'
+
+    # categorical codes of the dims, used by Duckling.parse_columns()
+    CODES = (
+        AMOUNTOFMONEY,
+        CYCLE,
+        DISTANCE,
+        DURATION,
+        EMAIL,
+        LEVENPRODUCT,
+        LEVENUNIT,
+        NUMBER,
+        ORDINAL,
+        PHONENUMBER,
+        QUANTITY,
+        TEMPERATURE,
+        TIME,
+        TIMEZONE,
+        UNIT,
+        UNITOFDURATION,
+        URL,
+        VOLUME,
+    )
+
+    @classmethod
+    def code(cls, dim):
+        """Returns the categorical code of a dim, -1 if it is unknown."""
+
+        return cls.CODES.index(dim) if dim in cls.CODES else -1
+
+    @classmethod
+    def from_code(cls, code):
+        """Returns the dim of a categorical code, None if it is unknown."""
+
+        return cls.CODES[code] if 0 <= code < len(cls.CODES) else None
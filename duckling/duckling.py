@@ -1,21 +1,64 @@
 import os
 import imp
+import json
+import functools
 import jpype
 import socket
+import calendar
 import threading
-from six import string_types
+from collections import OrderedDict
+from datetime import datetime
+from six import integer_types, string_types, text_type
 from distutils.util import strtobool
-from dateutil import parser
+from timeit import default_timer as timer
+from . import cds, memory, snapshot, warmup
+from .cache import ResultCache
+from .columns import to_columns
 from .dim import Dim
+from .entity import Entity
 from .language import Language
+from .instrumentation import Instrumentation
+from .isotime import parse_datetime
+from .jvm import attach_thread
+from .prepared import PreparedParser
+from .prescreen import might_contain_entities
+from .segment import merge, segment
+from .stream import stream_parse
 
 socket.setdefaulttimeout(15)
 
+# conversion of the value field per dim, shared by the JPype and the JSON
+# result transport so both return the same results
+_VALUE_KINDS = {
+    Dim.AMOUNTOFMONEY:  u'float',
+    Dim.CYCLE:          u'string',
+    Dim.DISTANCE:       u'float',
+    Dim.DURATION:       u'float',
+    Dim.EMAIL:          u'string',
+    Dim.LEVENPRODUCT:   u'string',
+    Dim.LEVENUNIT:      u'string',
+    Dim.NUMBER:         u'float',
+    Dim.ORDINAL:        u'int',
+    Dim.PHONENUMBER:    u'string',
+    Dim.QUANTITY:       u'string',
+    Dim.TEMPERATURE:    u'float',
+    Dim.TIME:           u'time',
+    Dim.TIMEZONE:       u'string',
+    Dim.UNITOFDURATION: u'string',
+    Dim.URL:            u'string',
+    Dim.VOLUME:         u'float'
+}
+
 
 class Duckling(object):
 
     """Python wrapper for Duckling by wit.ai.
 
+    One instance can be shared by any number of threads. Every thread is
+    attached to the JVM on its first call and detached when it exits. JPype
+    releases the GIL while Duckling runs, so parses from several threads run
+    in parallel on the JVM side.
+
     Attributes:
         jvm_started: Optional attribute to specify if the JVM has already been
             started (with all Java dependencies loaded).
@@ -24,36 +67,101 @@ class Duckling(object):
         minimum_heap_size: Optional attribute to set initial and minimum heap
             size. Default is 128m.
         maximum_heap_size: Optional attribute to set maximum heap size. Default
-            is 2048m.
+            is 2048m. With 'auto', the heap is sized for heap_languages, see
+            duckling.memory.heap_size().
+        cache: Optional ResultCache to cache parse results in. Default is
+            None (no caching).
+        json_transport: Optional attribute to specify if results should be
+            serialized to JSON inside the JVM and decoded in Python instead of
+            being converted field by field via JPype. Default is False.
+        lazy_load: Optional attribute to specify if languages should be loaded
+            on demand the first time they are parsed, instead of requiring a
+            call to load(). Default is False.
+        instrumentation: Instrumentation registry to add hooks to, which
+            receive a ParseRecord with stage timings for every parse() call.
+        max_concurrency: Optional attribute to limit the number of Duckling
+            calls running in the JVM at the same time, across all threads.
+            Default is None (no limit).
+        compact_results: Optional attribute to specify if results should be
+            returned as Entity objects instead of dicts, which take less
+            memory when many results are kept. Default is False.
+        prescreen: Optional attribute to specify if inputs should be checked
+            for anything Duckling could match before entering the JVM, see
+            duckling.prescreen. Inputs failing the check get an empty result.
+            Default is False.
+        heap_languages: Optional languages the heap is sized for when
+            maximum_heap_size is 'auto', i.e. every language load() or
+            lazy_load may load. Default is all supported languages.
+        heap_footprints: Optional dict of ISO 639-1 code to measured heap
+            footprint in MB, see duckling.memory.measure(). With
+            maximum_heap_size 'auto', the heap is only sized below 2048m if
+            all heap_languages have a measured footprint.
+        warmup_on_load: Optional attribute to specify if load() should warm
+            up the languages it loaded, see warmup(). The report is kept in
+            warmup_report. Default is False.
     """
 
     def __init__(self,
                  jvm_started=False,
                  parse_datetime=False,
                  minimum_heap_size='128m',
-                 maximum_heap_size='2048m'):
+                 maximum_heap_size='2048m',
+                 cache=None,
+                 json_transport=False,
+                 lazy_load=False,
+                 max_concurrency=None,
+                 compact_results=False,
+                 prescreen=False,
+                 heap_languages=[],
+                 heap_footprints=None,
+                 warmup_on_load=False):
         """Initializes Duckling.
         """
 
         self.parse_datetime = parse_datetime
+        self.cache = cache
+        self.json_transport = json_transport
+        self.lazy_load = lazy_load
+        self.instrumentation = Instrumentation()
         self._is_loaded = False
+        self._loaded_languages = set()
         self._lock = threading.Lock()
+        self._load_lock = threading.Lock()
+        self.max_concurrency = max_concurrency
+        self.compact_results = compact_results
+        self.prescreen = prescreen
+        self._engine_slots = threading.BoundedSemaphore(
+            max_concurrency) if max_concurrency else None
+        # Clojure reference time contexts per (epoch second, UTC offset)
+        self._reference_contexts = ResultCache(max_entries=1024)
+        self.minimum_heap_size = minimum_heap_size
+        self.maximum_heap_size = maximum_heap_size
+        self.heap_languages = heap_languages
+        self.heap_footprints = heap_footprints
+        self.warmup_on_load = warmup_on_load
+        self.warmup_report = None
+        self.clojure = None
 
         if not jvm_started:
             self._classpath = self._create_classpath()
-            self._start_jvm(minimum_heap_size, maximum_heap_size)
+            if maximum_heap_size == 'auto':
+                self.maximum_heap_size = memory.heap_size(heap_languages, heap_footprints)
+            self._start_jvm(minimum_heap_size, self.maximum_heap_size)
+        self._require_duckling()
 
+    def _require_duckling(self):
         try:
-            # make it thread-safe
-            if threading.activeCount() > 1:
-                if not jpype.isThreadAttachedToJVM():
-                    jpype.attachThreadToJVM()
+            attach_thread()
             self._lock.acquire()
 
-            self.clojure = jpype.JClass('clojure.java.api.Clojure')
+            clojure = jpype.JClass('clojure.java.api.Clojure')
             # require the duckling Clojure lib
-            require = self.clojure.var("clojure.core", "require")
-            require.invoke(self.clojure.read("duckling.core"))
+            require = clojure.var("clojure.core", "require")
+            require.invoke(clojure.read("duckling.core"))
+            # load the interop helpers shipped with this package
+            load_file = clojure.var("clojure.core", "load-file")
+            load_file.invoke(self._interop_path())
+            self.clojure = clojure
         finally:
             self._lock.release()
 
@@ -64,47 +172,166 @@ class Duckling(object):
             '-Djava.class.path={classpath}'.format(
                 classpath=self._classpath)
         ]
+        # use the class data sharing archive built by duckling.cds, if any
+        jvm_options.extend(cds.jvm_options(self._classpath))
         if not jpype.isJVMStarted():
             jpype.startJVM(
                 jpype.getDefaultJVMPath(),
                 *jvm_options
             )
 
-    def _create_classpath(self):
+    @staticmethod
+    def _interop_path():
+        return os.path.join(imp.find_module('duckling')[1], 'interop.clj')
+
+    @staticmethod
+    def _create_classpath():
         jars = []
         for top, dirs, files in os.walk(os.path.join(imp.find_module('duckling')[1], 'jars')):
             for file_name in files:
                 if file_name.endswith('.jar'):
                     jars.append(os.path.join(top, file_name))
-        return os.pathsep.join(jars)
+        # a stable order keeps the classpath valid for class data sharing
+        return os.pathsep.join(sorted(jars))
 
-    def load(self, languages=[]):
+    def load(self, languages=[], snapshot_path=None):
         """Loads the Duckling corpus.
 
-        Languages can be specified, defaults to all.
+        Languages can be specified, defaults to all. Loading is incremental:
+        languages which are already loaded are skipped and stay available
+        while new ones are loaded.
+
+        With a snapshot path, the trained classifiers are restored from that
+        file instead of being trained from the corpus. Languages missing from
+        the snapshot are trained and the snapshot is rewritten to include
+        them. Snapshots written for other Duckling jars are ignored.
 
         Args:
             languages: Optional parameter to specify languages,
                 e.g. [Duckling.ENGLISH, Duckling.FRENCH] or supported ISO 639-1 Codes (e.g. ["en", "fr"])
-        """
-        duckling_load = self.clojure.var("duckling.core", "load!")
-        clojure_hashmap = self.clojure.var("clojure.core", "hash-map")
-        clojure_list = self.clojure.var("clojure.core", "list")
+            snapshot_path: Optional path of a snapshot file to restore the
+                trained languages from and to save them to.
 
-        if languages:
+        If warmup_on_load is set, the languages are warmed up before load()
+        returns.
+        """
+        with self._load_lock:
             # Duckling's load function expects ISO 639-1 Language Codes (e.g. "en")
-            iso_languages = [Language.convert_to_iso(lang) for lang in languages]
-
-            duckling_load.invoke(
-                clojure_hashmap.invoke(
-                    self.clojure.read(':languages'),
-                    clojure_list.invoke(*iso_languages)
-                )
-            )
-        else:
-            duckling_load.invoke()
+            iso_languages = sorted(set(
+                Language.convert_to_iso(lang)
+                for lang in languages or Language.SUPPORTED_LANGUAGES))
+            restored_modules = None
+            if snapshot_path:
+                restored_modules = self._restore_snapshot(snapshot_path, iso_languages)
+            duckling_load = self.clojure.var("duckling.interop", "load-languages!")
+            loaded_modules = set(text_type(module) for module in duckling_load.invoke(
+                jpype.JArray(jpype.JString)(iso_languages)).iterator())
+            if snapshot_path and loaded_modules != restored_modules:
+                self._save_snapshot(snapshot_path)
+            self._loaded_languages = loaded_modules
 
         self._is_loaded = True
+        if self.warmup_on_load:
+            self.warmup_report = self.warmup(languages or None)
+
+    def _restore_snapshot(self, snapshot_path, iso_languages):
+        payload = snapshot.read(snapshot_path, self._snapshot_fingerprint())
+        if payload is None:
+            return None
+        duckling_restore = self.clojure.var("duckling.interop", "restore-languages!")
+        return set(text_type(module) for module in duckling_restore.invoke(
+            payload, jpype.JArray(jpype.JString)(iso_languages)).iterator())
+
+    def _save_snapshot(self, snapshot_path):
+        # keep the classifiers of languages saved by other processes
+        previous_payload = snapshot.read(snapshot_path, self._snapshot_fingerprint())
+        duckling_snapshot = self.clojure.var("duckling.interop", "snapshot")
+        snapshot.write(snapshot_path, self._snapshot_fingerprint(),
+                       text_type(duckling_snapshot.invoke(previous_payload or u'{}')))
+
+    def _snapshot_fingerprint(self):
+        return snapshot.fingerprint(self._create_classpath())
+
+    def memory_stats(self):
+        """Reads memory usage and garbage collection stats from the JVM.
+
+        Returns:
+            A dict with heap and non-heap usage, usage per memory pool and
+            collection count and time per garbage collector, see
+            duckling.memory.memory_stats(). Sizes are in bytes.
+        """
+        attach_thread()
+        return memory.memory_stats()
+
+    def warmup(self, languages=None, dims=None, iterations=20, corpus=None, tolerance=0.1):
+        """Warms up the JVM JIT by parsing a corpus until latency is steady.
+
+        Every language is parsed in rounds over its corpus until the mean
+        latency of the last 3 rounds differs by at most tolerance, or
+        iterations rounds are done. Parses bypass cache and prescreen.
+
+        Args:
+            languages: Optional languages to warm up, defaults to all loaded
+                languages.
+            dims: Optional parameter to specify a single filter or list of
+                filters for dimensions in Duckling, defaults to all.
+            iterations: Optional maximum number of rounds per language.
+                Default is 20.
+            corpus: Optional list of input strings to use for all languages,
+                or dict of language to list of input strings. Default is the
+                built-in corpus of each language, see duckling.warmup.
+            tolerance: Optional relative latency difference still counted as
+                steady. Default is 0.1.
+
+        Returns:
+            A dict of Duckling language id to the warm-up report of the
+            language, see duckling.warmup.run(). For example:
+
+            {
+                'en$core': {
+                    'rounds': 7,
+                    'steady': True,
+                    'first_ms': 41.2,
+                    'steady_ms': 1.3,
+                    'seconds': 5.8
+                }
+            }
+
+        Raises:
+            RuntimeError: An error occurres when Duckling model is not loaded
+                via load().
+        """
+        languages = [Language.convert_to_duckling_language_id(language)
+                     for language in languages or sorted(self._loaded_languages)]
+        self._check_loaded(languages)
+        attach_thread()
+        if isinstance(corpus, dict):
+            corpus = dict((Language.convert_to_duckling_language_id(language), texts)
+                          for language, texts in corpus.items())
+        reference_context = self._reference_time_context(warmup.REFERENCE_TIME)
+        report = OrderedDict()
+        for language in languages:
+            if corpus is None:
+                texts = warmup.corpus(Language.convert_to_iso(language))
+            elif isinstance(corpus, dict):
+                texts = corpus.get(language, [])
+            else:
+                texts = corpus
+            report[language] = warmup.run(
+                functools.partial(self._engine_parse, language=language, dim_filter=dims,
+                                  reference_context=reference_context),
+                texts, iterations=iterations, tolerance=tolerance)
+        return report
+
+    def _check_loaded(self, languages):
+        if self.lazy_load:
+            missing = [language for language in languages
+                       if language not in self._loaded_languages]
+            if missing:
+                self.load(missing)
+        elif self._is_loaded is False:
+            raise RuntimeError(
+                'Please load the model first by calling load()')
 
     def parse(self, input_str, language=Language.ENGLISH, dim_filter=None, reference_time=''):
         """Parses datetime information out of string input.
@@ -114,58 +341,493 @@ class Duckling(object):
 
         Args:
             input_str: The input as string that has to be parsed.
+            language: Optional parameter to specify language,
+                e.g. Duckling.ENGLISH or supported ISO 639-1 Code (e.g. "en"),
+                or a list of languages, see parse_multilingual().
+            dim_filter: Optional parameter to specify a single filter or
+                list of filters for dimensions in Duckling.
+            reference_time: Optional reference time for Duckling, either a
+                datetime string, a datetime or epoch seconds. Times without
+                timezone are UTC.
+
+        Returns:
+            A list of dicts with the result from the Duckling.parse() call, or
+            of Entity objects if compact_results is set. For a list of
+            languages, a dict of language id to such a list.
+
+        Raises:
+            RuntimeError: An error occurres when Duckling model is not loaded
+                via load().
+        """
+        if isinstance(language, (list, tuple)):
+            return self.parse_multilingual(input_str, language, dim_filter, reference_time)
+        if not self.instrumentation.hooks:
+            return self._parse_input(input_str, language, dim_filter, reference_time)
+        record, owner = self.instrumentation.begin(input_str, language, dim_filter)
+        result = error = None
+        try:
+            result = self._parse_input(
+                input_str, language, dim_filter, reference_time, record)
+            return result
+        except Exception as parse_error:
+            error = parse_error
+            raise
+        finally:
+            self.instrumentation.end(record, owner, result, error)
+
+    def _parse_input(self, input_str, language, dim_filter, reference_time, record=None):
+        attach_thread()
+        if record is not None:
+            record.mark(u'attach')
+        language = Language.convert_to_duckling_language_id(language)
+        self._check_loaded([language])
+        if self.prescreen and not might_contain_entities(
+                input_str, language, self._dim_list(dim_filter)):
+            if record is not None:
+                record.mark(u'prescreen')
+            return []
+        if self.cache is not None:
+            cache_key, expires = self.cache.key(
+                input_str, language, self._dim_list(dim_filter), reference_time,
+                self._cache_options())
+            result = self.cache.get(cache_key)
+            if record is not None:
+                record.mark(u'cache')
+            if result is not None:
+                return result
+        result = self._engine_parse(
+            input_str, language, dim_filter, self._reference_time_context(reference_time), record)
+        if self.cache is not None:
+            self.cache.put(cache_key, result, expires)
+        return result
+
+    def _engine_parse(self, input_str, language, dim_filter, reference_context, record=None):
+        if self.json_transport:
+            duckling_parse_json = self.clojure.var("duckling.interop", "parse-json")
+            duckling_result = self._invoke(
+                duckling_parse_json, language, input_str, self._dim_filter(dim_filter), reference_context)
+            if record is not None:
+                record.mark(u'engine')
+            result = self._decode_result(duckling_result)
+        else:
+            duckling_parse = self.clojure.var("duckling.core", "parse")
+            if reference_context is not None:
+                duckling_result = self._invoke(
+                    duckling_parse,
+                    language,
+                    input_str,
+                    self._dim_filter(dim_filter),
+                    reference_context
+                )
+            else:
+                duckling_result = self._invoke(
+                    duckling_parse, language, input_str, self._dim_filter(dim_filter))
+            if record is not None:
+                record.mark(u'engine')
+            result = self._parse_result(duckling_result)
+        if self.compact_results:
+            result = self._compact(result)
+        if record is not None:
+            record.mark(u'conversion')
+        return result
+
+    def parse_multilingual(self, input_str, languages, dim_filter=None, reference_time=''):
+        """Parses input with several languages in a single call into Duckling.
+
+        The languages are parsed in parallel inside the JVM.
+
+        Args:
+            input_str: The input as string that has to be parsed.
+            languages: A list of languages, e.g. [Duckling.ENGLISH,
+                Duckling.GERMAN] or supported ISO 639-1 Codes (e.g. ["en", "de"])
+            dim_filter: Optional parameter to specify a single filter or
+                list of filters for dimensions in Duckling.
+            reference_time: Optional reference time for Duckling.
+
+        Returns:
+            A dict of Duckling language id (e.g. Duckling.GERMAN) to the list
+            of dicts (or Entity objects if compact_results is set) found with
+            that language.
+
+        Raises:
+            RuntimeError: An error occurres when Duckling model is not loaded
+                via load().
+        """
+        languages = list(OrderedDict.fromkeys(
+            Language.convert_to_duckling_language_id(language) for language in languages))
+        results = self.parse_batch(
+            [input_str] * len(languages), languages, dim_filter=dim_filter,
+            reference_time=reference_time, parallel=len(languages) > 1)
+        return OrderedDict(zip(languages, results))
+
+    def parse_batch(self, inputs, language=Language.ENGLISH, dim_filter=None, reference_time='',
+                    parallel=False):
+        """Parses a list of strings with a single call into Duckling.
+
+        The inputs are passed to the JVM as one Java array and parsed there,
+        so the JPype boundary is crossed once per batch instead of once per
+        input. Identical inputs (same string, language and reference time)
+        are only parsed once, and inputs of mixed languages are grouped by
+        language.
+
+        Args:
+            inputs: A list of strings that have to be parsed.
+            language: Optional parameter to specify language, either a single
+                language for all inputs or a list with one language per input,
+                e.g. Duckling.ENGLISH or supported ISO 639-1 Code (e.g. "en")
+            dim_filter: Optional parameter to specify a single filter or
+                list of filters for dimensions in Duckling.
+            reference_time: Optional reference time for Duckling, either a
+                single reference time for all inputs or a list with one
+                reference time per input.
+            parallel: Optional parameter to parse the inputs in parallel
+                inside the JVM. Default is False.
+
+        Returns:
+            A list with one list of dicts (or Entity objects if
+            compact_results is set) per input, in input order. Results of
+            identical inputs share the same objects.
+
+        Raises:
+            RuntimeError: An error occurres when Duckling model is not loaded
+                via load().
+            ValueError: An error occurres when the number of languages or
+                reference times does not match the number of inputs.
+        """
+        inputs = list(inputs)
+        if not self.instrumentation.hooks:
+            return self._parse_inputs(inputs, language, dim_filter, reference_time, parallel)
+        record, owner = self.instrumentation.begin_batch(inputs, language, dim_filter)
+        results = error = None
+        try:
+            results = self._parse_inputs(
+                inputs, language, dim_filter, reference_time, parallel, record)
+            return results
+        except Exception as parse_error:
+            error = parse_error
+            raise
+        finally:
+            self.instrumentation.end(record, owner, results, error)
+
+    def _parse_inputs(self, inputs, language, dim_filter, reference_time, parallel, record=None):
+        attach_thread()
+        if record is not None:
+            record.mark(u'attach')
+        languages = [Language.convert_to_duckling_language_id(input_language) for input_language
+                     in self._broadcast(language, len(inputs), 'language')]
+        self._check_loaded(set(languages))
+        reference_times = self._broadcast(
+            reference_time, len(inputs), 'reference_time')
+
+        # map every input to the index of its first occurrence
+        positions = {}
+        indices = []
+        batch = []
+        for input_str, input_language, input_reference_time in zip(inputs, languages, reference_times):
+            key = (input_str, input_language, input_reference_time)
+            if key not in positions:
+                positions[key] = len(batch)
+                batch.append(key)
+            indices.append(positions[key])
+        if not batch:
+            return []
+
+        results = [None] * len(batch)
+        misses = range(len(batch))
+        if self.cache is not None:
+            dims = self._dim_list(dim_filter)
+            options = self._cache_options()
+            cache_keys = [self.cache.key(input_str, input_language, dims, input_reference_time, options)
+                          for input_str, input_language, input_reference_time in batch]
+            misses = []
+            for position, (cache_key, _) in enumerate(cache_keys):
+                results[position] = self.cache.get(cache_key)
+                if results[position] is None:
+                    misses.append(position)
+            if record is not None:
+                record.mark(u'cache')
+
+        if self.prescreen:
+            dims = self._dim_list(dim_filter)
+            screened = []
+            for position in misses:
+                if might_contain_entities(batch[position][0], batch[position][1], dims):
+                    screened.append(position)
+                else:
+                    results[position] = []
+            misses = screened
+            if record is not None:
+                record.mark(u'prescreen')
+
+        if misses:
+            # group the inputs by language, so each module runs in one stretch
+            misses = sorted(misses, key=lambda position: batch[position][1])
+            batch_args = (
+                jpype.JArray(jpype.JString)([batch[position][1] for position in misses]),
+                jpype.JArray(jpype.JString)([batch[position][0] for position in misses]),
+                self._dim_filter(dim_filter),
+                jpype.JArray(jpype.JObject)(
+                    [self._reference_time_context(batch[position][2]) for position in misses])
+            )
+            if parallel:
+                batch_args += (True,)
+            if self.json_transport:
+                duckling_parse_batch = self.clojure.var("duckling.interop", "parse-batch-json")
+                duckling_results = self._invoke(duckling_parse_batch, *batch_args)
+                if record is not None:
+                    record.mark(u'engine')
+                parsed = self._decode_results(duckling_results)
+            else:
+                duckling_parse_batch = self.clojure.var("duckling.interop", "parse-batch")
+                duckling_results = self._invoke(duckling_parse_batch, *batch_args)
+                if record is not None:
+                    record.mark(u'engine')
+                parsed = [self._parse_result(duckling_result) for duckling_result
+                          in duckling_results.iterator()]
+            if self.compact_results:
+                parsed = [self._compact(result) for result in parsed]
+            if record is not None:
+                record.mark(u'conversion')
+            for position, result in zip(misses, parsed):
+                results[position] = result
+                if self.cache is not None:
+                    self.cache.put(cache_keys[position][0], result,
+                                   cache_keys[position][1])
+        return [results[index] for index in indices]
+
+    def parse_columns(self, inputs, language=Language.ENGLISH, dim_filter=None, reference_time=''):
+        """Parses a list of strings and returns the entities as numpy columns.
+
+        Like parse_batch(), but the JVM fills primitive arrays with one
+        element per entity, which are handed to numpy without creating a
+        Python object per entity. Requires numpy. The cache is not used.
+
+        Args:
+            inputs: A list of strings that have to be parsed.
+            language: Optional parameter to specify language, either a single
+                language for all inputs or a list with one language per input,
+                e.g. Duckling.ENGLISH or supported ISO 639-1 Code (e.g. "en")
+            dim_filter: Optional parameter to specify a single filter or
+                list of filters for dimensions in Duckling.
+            reference_time: Optional reference time for Duckling, either a
+                single reference time for all inputs or a list with one
+                reference time per input.
+
+        Returns:
+            A dict of column name to numpy array with one element per entity:
+            input_index, start, end, dim (see Dim.code()), value (float64,
+            NaN if not numeric) and time (datetime64[ms] in UTC, NaT if not a
+            time).
+
+        Raises:
+            ImportError: An error occurres when numpy is not installed.
+            RuntimeError: An error occurres when Duckling model is not loaded
+                via load().
+            ValueError: An error occurres when the number of languages or
+                reference times does not match the number of inputs.
+        """
+        attach_thread()
+        inputs = list(inputs)
+        languages = [Language.convert_to_duckling_language_id(input_language) for input_language
+                     in self._broadcast(language, len(inputs), 'language')]
+        self._check_loaded(set(languages))
+        reference_times = self._broadcast(
+            reference_time, len(inputs), 'reference_time')
+
+        duckling_parse_columns = self.clojure.var("duckling.interop", "parse-batch-columns")
+        return to_columns(self._invoke(
+            duckling_parse_columns,
+            jpype.JArray(jpype.JString)(languages),
+            jpype.JArray(jpype.JString)(inputs),
+            self._dim_filter(dim_filter),
+            jpype.JArray(jpype.JObject)(
+                [self._reference_time_context(input_reference_time)
+                 for input_reference_time in reference_times]),
+            jpype.JArray(jpype.JString)(list(Dim.CODES))))
+
+    def parse_document(self, document, language=Language.ENGLISH, dim_filter=None,
+                       reference_time='', max_segment_length=1000, overlap=100,
+                       parallel=True):
+        """Parses a long document in segments.
+
+        Duckling gets slow on long inputs, so the document is split into
+        overlapping segments at sentence or line boundaries, which are parsed
+        with a single parse_batch() call. Entity positions are relative to
+        the document.
+
+        Args:
+            document: The document string that has to be parsed.
             language: Optional parameter to specify language,
                 e.g. Duckling.ENGLISH or supported ISO 639-1 Code (e.g. "en")
             dim_filter: Optional parameter to specify a single filter or
                 list of filters for dimensions in Duckling.
             reference_time: Optional reference time for Duckling.
+            max_segment_length: Optional maximum length of a segment. Default
+                is 1000.
+            overlap: Optional maximum number of characters shared by two
+                consecutive segments. Default is 100.
+            parallel: Optional parameter to parse the segments in parallel
+                inside the JVM. Default is True.
 
         Returns:
-            A list of dicts with the result from the Duckling.parse() call.
+            A list of dicts (or Entity objects if compact_results is set)
+            with the result from the Duckling.parse() call for the whole
+            document.
 
         Raises:
             RuntimeError: An error occurres when Duckling model is not loaded
                 via load().
         """
-        if self._is_loaded is False:
-            raise RuntimeError(
-                'Please load the model first by calling load()')
-        if threading.activeCount() > 1:
-            if not jpype.isThreadAttachedToJVM():
-                jpype.attachThreadToJVM()
-        language = Language.convert_to_duckling_language_id(language)
-        duckling_parse = self.clojure.var("duckling.core", "parse")
-        duckling_time = self.clojure.var("duckling.time.obj", "t")
-        clojure_hashmap = self.clojure.var("clojure.core", "hash-map")
+        segments = segment(document, max_segment_length, overlap)
+        results = self.parse_batch(
+            [segment_str for _, segment_str in segments], language,
+            dim_filter=dim_filter, reference_time=reference_time, parallel=parallel)
+        return merge(segments, results)
+
+    def parse_stream(self, inputs, language=Language.ENGLISH, dim_filter=None,
+                     reference_time='', window=256, batch_size=32, workers=1,
+                     ordered=True):
+        """Lazily parses an iterable of inputs with a bounded in-flight window.
 
-        filter_str = '[]'
+        Inputs are read in batches and parsed with parse_batch(), so at most
+        window inputs are held in memory regardless of the input size.
+
+        Args:
+            inputs: An iterable of input strings or of (id, text) and
+                (id, text, reference_time) tuples.
+            language: Optional parameter to specify language,
+                e.g. Duckling.ENGLISH or supported ISO 639-1 Code (e.g. "en")
+            dim_filter: Optional parameter to specify a single filter or
+                list of filters for dimensions in Duckling.
+            reference_time: Optional reference time for inputs which don't
+                specify one.
+            window: Optional maximum number of inputs in flight. Default is
+                256.
+            batch_size: Optional number of inputs per parse_batch() call.
+                Default is 32.
+            workers: Optional number of threads parsing batches. Default is 1.
+            ordered: Optional parameter to yield results in input order. If
+                False, results are yielded as soon as their batch completes.
+                Default is True.
+
+        Yields:
+            A list of dicts for each input string, or an (id, list of dicts)
+            tuple for each tuple input.
+        """
+        return stream_parse(
+            functools.partial(self.parse_batch, language=language, dim_filter=dim_filter),
+            inputs, reference_time=reference_time, window=window,
+            batch_size=batch_size, workers=workers, ordered=ordered)
+
+    def prepare(self, language=Language.ENGLISH, dim_filter=None, reference_time=None):
+        """Creates a reusable parser for a fixed language, dims and reference
+        time.
+
+        The Duckling parse function, the dimension filter and the reference
+        time context are resolved once, so calling the returned parser only
+        invokes Duckling and converts the result.
+
+        Args:
+            language: Optional parameter to specify language,
+                e.g. Duckling.ENGLISH or supported ISO 639-1 Code (e.g. "en")
+            dim_filter: Optional parameter to specify a single filter or
+                list of filters for dimensions in Duckling.
+            reference_time: Optional reference time for Duckling. If omitted,
+                the current time at each call is used.
+
+        Returns:
+            A PreparedParser, callable with an input string.
+
+        Raises:
+            RuntimeError: An error occurres when Duckling model is not loaded
+                via load().
+        """
+        language = Language.convert_to_duckling_language_id(language)
+        self._check_loaded([language])
+        return PreparedParser(
+            self,
+            language,
+            self._dim_filter(dim_filter),
+            self._reference_time_context(reference_time),
+            self._dim_list(dim_filter))
+
+    def _invoke(self, function, *args):
+        # the GIL is released during the call, the semaphore bounds how many
+        # threads run inside the JVM at once
+        if self._engine_slots is None:
+            return function.invoke(*args)
+        with self._engine_slots:
+            return function.invoke(*args)
+
+    def _cache_options(self):
+        # options changing the results, a cache may be shared by instances
+        return (self.parse_datetime, self.json_transport, self.compact_results)
+
+    def _compact(self, result):
+        return [Entity.from_dict(entry) for entry in result]
+
+    def _broadcast(self, value, count, name):
+        if isinstance(value, (list, tuple)):
+            if len(value) != count:
+                raise ValueError(
+                    'Expected {count} values for {name}, got {actual}'.format(
+                        count=count, name=name, actual=len(value)))
+            return list(value)
+        return [value] * count
+
+    def _dim_list(self, dim_filter):
         if isinstance(dim_filter, string_types):
-            filter_str = '[:{filter}]'.format(filter=dim_filter)
-        elif isinstance(dim_filter, list):
-            filter_str = '[{filter}]'.format(filter=' :'.join(dim_filter))
-        if reference_time:
-            duckling_result = duckling_parse.invoke(
-                language,
-                input_str,
-                self.clojure.read(filter_str),
-                clojure_hashmap.invoke(
-                    self.clojure.read(':reference-time'),
-                    duckling_time.invoke(
-                        *self._parse_reference_time(reference_time))
-                )
+            return [dim_filter]
+        elif isinstance(dim_filter, (list, tuple)):
+            return list(dim_filter)
+        return []
+
+    def _dim_filter(self, dim_filter):
+        clojure_keyword = jpype.JClass('clojure.lang.Keyword')
+        clojure_vec = self.clojure.var("clojure.core", "vec")
+        return clojure_vec.invoke(jpype.JArray(jpype.JObject)(
+            [clojure_keyword.intern(dim) for dim in self._dim_list(dim_filter)]))
+
+    def _reference_time_context(self, reference_time):
+        if reference_time is None or (
+                isinstance(reference_time, string_types) and not reference_time):
+            return None
+        instant = self._reference_instant(reference_time)
+        context = self._reference_contexts.get(instant)
+        if context is None:
+            epoch_seconds, utc_offset = instant
+            # a DateTime as timezone keeps offsets which aren't whole hours
+            date_time = jpype.JClass('org.joda.time.DateTime')(
+                jpype.JLong(epoch_seconds * 1000),
+                jpype.JClass('org.joda.time.DateTimeZone').forOffsetMillis(utc_offset * 1000))
+            duckling_time = self.clojure.var("duckling.time.obj", "t")
+            clojure_hashmap = self.clojure.var("clojure.core", "hash-map")
+            context = clojure_hashmap.invoke(
+                self.clojure.read(':reference-time'),
+                duckling_time.invoke(
+                    date_time,
+                    date_time.getYear(), date_time.getMonthOfYear(),
+                    date_time.getDayOfMonth(), date_time.getHourOfDay(),
+                    date_time.getMinuteOfHour(), date_time.getSecondOfMinute())
             )
+            self._reference_contexts.put(instant, context)
+        return context
+
+    def _reference_instant(self, reference_time):
+        # returns (epoch seconds, UTC offset in seconds), naive times are UTC
+        if isinstance(reference_time, datetime):
+            date_info = reference_time
+        elif isinstance(reference_time, string_types):
+            date_info = parse_datetime(reference_time)
+        elif isinstance(reference_time, integer_types + (float,)) and not isinstance(reference_time, bool):
+            return int(reference_time), 0
         else:
-            duckling_result = duckling_parse.invoke(
-                language, input_str, self.clojure.read(filter_str))
-        return self._parse_result(duckling_result)
-
-    def _parse_reference_time(self, reference_time):
-        date_info = parser.parse(reference_time)
-        utc_offset = int(date_info.utcoffset().total_seconds()) // 3600 if date_info.utcoffset() else 0
-        return (utc_offset, date_info.year,
-                date_info.month, date_info.day,
-                date_info.hour, date_info.minute,
-                date_info.second)
+            raise TypeError(
+                'Unsupported reference time {reference_time!r}, expected a string, '
+                'datetime or epoch seconds'.format(reference_time=reference_time))
+        utc_offset = int(date_info.utcoffset().total_seconds()) if date_info.utcoffset() else 0
+        epoch_seconds = calendar.timegm(date_info.replace(tzinfo=None).timetuple()) - utc_offset
+        return epoch_seconds, utc_offset
 
     def _parse_result(self, duckling_result):
         _functions = {
@@ -189,6 +851,63 @@ class Duckling(object):
             result.append(entry)
         return result
 
+    def _decode_result(self, duckling_json):
+        return self._decode_entries(json.loads(text_type(duckling_json)))
+
+    def _decode_results(self, duckling_json):
+        return [self._decode_entries(entries)
+                for entries in json.loads(text_type(duckling_json))]
+
+    def _decode_entries(self, entries):
+        for entry in entries:
+            if u'value' in entry:
+                entry[u'value'] = self._decode_dict(entry[u'value'], entry[u'dim'])
+        return entries
+
+    def _decode_dict(self, value_dict, dim=None):
+        _functions = {
+            u'day':    int,
+            u'hour':   int,
+            u'minute': int,
+            u'month':  int,
+            u'quarter': int,
+            u'second': int,
+            u'week':   int,
+            u'year':   int
+        }
+        _functions_with_dim = {
+            u'from':  self._decode_dict,
+            u'normalized':  self._decode_dict,
+            u'to':  self._decode_dict,
+            u'value':   self._decode_value,
+            u'values':   self._decode_list
+        }
+
+        for key, value in value_dict.items():
+            if key in _functions_with_dim:
+                value_dict[key] = _functions_with_dim[key](value, dim)
+            elif key in _functions:
+                value_dict[key] = _functions[key](value)
+        return value_dict
+
+    def _decode_list(self, values, dim=None):
+        return [self._decode_dict(value, dim) for value in values]
+
+    def _decode_value(self, value, dim=None):
+        _kinds = {
+            u'float':  float,
+            u'int':    int,
+            u'string': self._parse_string,
+            u'time':   self._parse_time
+        }
+        if not dim or dim not in _VALUE_KINDS:
+            return self._parse_string(value)
+        kind = _VALUE_KINDS[dim]
+        if value is None and kind in (u'float', u'int'):
+            # like nil in _parse_value(), which has no toString()
+            return 'ERROR: {msg}'.format(msg=self._parse_string(value))
+        return _kinds[kind](value)
+
     def _parse_dict(self, java_dict, dim=None):
         _functions = {
             u'day': self._parse_int,
@@ -235,38 +954,30 @@ class Duckling(object):
         return int(java_number.toString())
 
     def _parse_value(self, java_value, dim=None):
-        _dims = {
-            Dim.AMOUNTOFMONEY:  self._parse_float,
-            Dim.CYCLE:          self._parse_string,
-            Dim.DISTANCE:       self._parse_float,
-            Dim.DURATION:       self._parse_float,
-            Dim.EMAIL:          self._parse_string,
-            Dim.LEVENPRODUCT:   self._parse_string,
-            Dim.LEVENUNIT:      self._parse_string,
-            Dim.NUMBER:         self._parse_float,
-            Dim.ORDINAL:        self._parse_int,
-            Dim.PHONENUMBER:    self._parse_string,
-            Dim.QUANTITY:       self._parse_string,
-            Dim.TEMPERATURE:    self._parse_float,
-            Dim.TIME:           self._parse_time,
-            Dim.TIMEZONE:       self._parse_string,
-            Dim.UNITOFDURATION: self._parse_string,
-            Dim.URL:            self._parse_string,
-            Dim.VOLUME:         self._parse_float
+        _kinds = {
+            u'float':  self._parse_float,
+            u'int':    self._parse_int,
+            u'string': self._parse_string,
+            u'time':   self._parse_time
         }
-        if not dim or dim not in _dims:
+        if not dim or dim not in _VALUE_KINDS:
             return self._parse_string(java_value)
         try:
-            return _dims[dim](java_value)
+            return _kinds[_VALUE_KINDS[dim]](java_value)
         except AttributeError:
             return 'ERROR: {msg}'.format(msg=self._parse_string(java_value))
 
     def _parse_time(self, time):
         if self.parse_datetime:
+            record = self.instrumentation.current() if self.instrumentation.hooks else None
+            started = timer() if record is not None else None
             try:
-                return parser.parse(time)
+                return parse_datetime(time)
             except ValueError:
                 return None
+            finally:
+                if record is not None:
+                    record.add(u'datetime', timer() - started)
         else:
             return self._parse_string(time)
 
@@ -0,0 +1,110 @@
+from six import string_types
+
+_strings = {}
+
+# value fields with a small, fixed vocabulary worth sharing between entities
+_INTERNED_FIELDS = frozenset([u'grain', u'unit', u'type'])
+
+
+def _intern(string):
+    # works for unicode on Python 2 as well, unlike intern()
+    return _strings.setdefault(string, string)
+
+
+def _intern_value(value):
+    if isinstance(value, dict):
+        interned = {}
+        for key, field in value.items():
+            if key in _INTERNED_FIELDS and isinstance(field, string_types):
+                field = _intern(field)
+            else:
+                field = _intern_value(field)
+            interned[_intern(key)] = field
+        return interned
+    if isinstance(value, list):
+        return [_intern_value(entry) for entry in value]
+    return value
+
+
+class Entity(object):
+
+    """Compact result entry of Duckling.parse().
+
+    Uses __slots__ instead of a per-entry dict, and shares dim, grain, unit
+    and type strings as well as the keys of the value dict between entities.
+
+    Attributes:
+        dim: The dimension of the entity, e.g. Dim.TIME.
+        start: The start index of the entity in the input string.
+        end: The end index of the entity in the input string.
+        text: The part of the input string the entity was parsed from.
+        value: The dict with the parsed value.
+        latent: Whether Duckling marked the entity as latent, None if unknown.
+    """
+
+    __slots__ = ('dim', 'start', 'end', 'text', 'value', 'latent')
+
+    # key of the matched text in the dict representation
+    _TEXT_KEY = u'body'
+
+    def __init__(self, dim, start, end, text, value, latent=None):
+        self.dim = _intern(dim)
+        self.start = start
+        self.end = end
+        self.text = text
+        self.value = _intern_value(value)
+        self.latent = latent
+
+    @classmethod
+    def from_dict(cls, entry):
+        """Creates an entity from a result dict."""
+        return cls(entry[u'dim'], entry.get(u'start'), entry.get(u'end'),
+                   entry.get(cls._TEXT_KEY), entry.get(u'value'),
+                   entry.get(u'latent'))
+
+    def to_dict(self):
+        """Returns the result dict of the entity.
+
+        The value dict is shared with the entity, not copied.
+        """
+        entry = {
+            u'dim': self.dim,
+            self._TEXT_KEY: self.text,
+            u'start': self.start,
+            u'end': self.end,
+            u'value': self.value
+        }
+        if self.latent is not None:
+            entry[u'latent'] = self.latent
+        return entry
+
+    def __eq__(self, other):
+        return type(self) is type(other) and all(
+            getattr(self, slot) == getattr(other, slot) for slot in self.__slots__)
+
+    def __ne__(self, other):
+        return not self == other
+
+    __hash__ = None
+
+    def __reduce__(self):
+        return (self.__class__, tuple(getattr(self, slot) for slot in self.__slots__))
+
+    def __repr__(self):
+        return '{name}(dim={dim!r}, start={start!r}, end={end!r}, text={text!r}, ' \
+            'value={value!r})'.format(
+                name=self.__class__.__name__, dim=self.dim, start=self.start,
+                end=self.end, text=self.text, value=self.value)
+
+
+class WrapperEntity(Entity):
+
+    """Compact result entry of the DucklingWrapper parse methods.
+
+    Same as Entity, but its dict representation uses u'text' for the matched
+    text like the DucklingWrapper results.
+    """
+
+    __slots__ = ()
+
+    _TEXT_KEY = u'text'
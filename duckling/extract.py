@@ -0,0 +1,281 @@
+"""Bulk entity extraction for JSONL and CSV corpora.
+
+Records are read from a memory-mapped input file one at a time, parsed in
+batches by one or more workers and written in input order, so memory stays
+bounded however large the corpus is. Progress is checkpointed to a small
+JSON file next to the output; an interrupted run continues from the last
+checkpoint when started again with the same arguments.
+
+Usage:
+    python -m duckling.extract --in corpus.jsonl --out entities.jsonl \
+        [--dims time,amount-of-money] [--lang en] [--workers N]
+
+Input records are JSON objects (or strings) per line, or CSV rows with a
+header. The text is read from --text-field. Every JSONL output line holds the
+record number, the --id-field value (if given) and the entities of a record;
+CSV output has a header and one row per entity (see CSV_FIELDS).
+"""
+
+import io
+import os
+import csv
+import sys
+import json
+import mmap
+import argparse
+import functools
+from timeit import default_timer as timer
+from .duckling import Duckling
+from .pool import DucklingPool
+from .stream import stream_parse
+
+CSV_FIELDS = (u'record', u'id', u'dim', u'start', u'end', u'body', u'value')
+
+
+def _format(path, fmt=None):
+    fmt = fmt or os.path.splitext(path)[1].lstrip(u'.').lower()
+    if fmt not in (u'jsonl', u'csv'):
+        raise ValueError('Unknown format of {path}, use --format jsonl or csv'.format(path=path))
+    return fmt
+
+
+def _lines(data, offset, positions):
+    # yields decoded lines from offset on and appends the position after each
+    data.seek(offset)
+    while True:
+        line = data.readline()
+        if not line:
+            return
+        positions.append(data.tell())
+        yield line.decode('utf-8')
+
+
+def read_records(path, fmt=None, text_field=u'text', id_field=None, offset=0):
+    """Reads the records of a JSONL or CSV file via mmap.
+
+    Args:
+        path: The path of the input file.
+        fmt: Optional format, u'jsonl' or u'csv'. Default is derived from
+            the file extension.
+        text_field: Optional name of the field holding the text. Default is
+            u'text'.
+        id_field: Optional name of a field to pass through as record id.
+        offset: Optional byte offset to start reading at, returned by a
+            previous call. For CSV, the header is always read from the start.
+
+    Yields:
+        (offset, record_id, text) tuples, offset being the byte offset after
+        the record.
+
+    Raises:
+        ValueError: An error occurres when a record has no text field.
+    """
+    fmt = _format(path, fmt)
+    with open(path, 'rb') as input_file:
+        if os.fstat(input_file.fileno()).st_size == 0:
+            return
+        data = mmap.mmap(input_file.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            if fmt == u'csv':
+                data.seek(0)
+                header = next(csv.reader([data.readline().decode('utf-8')]))
+                offset = max(offset, data.tell())
+            positions = []
+            lines = _lines(data, offset, positions)
+            if fmt == u'csv':
+                records = (dict(zip(header, row)) for row in csv.reader(lines) if row)
+            else:
+                records = (json.loads(line) for line in lines if line.strip())
+            for record in records:
+                if not isinstance(record, dict):
+                    record = {text_field: record}
+                if text_field not in record:
+                    raise ValueError('Record ending at byte {offset} has no field {field}'.format(
+                        offset=positions[-1], field=text_field))
+                yield positions[-1], record.get(id_field) if id_field else None, record[text_field]
+        finally:
+            data.close()
+
+
+def load_checkpoint(path):
+    """Returns the state saved by save_checkpoint() or None."""
+    if not os.path.exists(path):
+        return None
+    with open(path) as checkpoint_file:
+        return json.load(checkpoint_file)
+
+
+def save_checkpoint(path, state):
+    """Atomically replaces the checkpoint at path with state (a dict)."""
+    temporary_path = u'{path}.tmp'.format(path=path)
+    with open(temporary_path, 'w') as checkpoint_file:
+        json.dump(state, checkpoint_file)
+    getattr(os, 'replace', os.rename)(temporary_path, path)
+
+
+def _jsonl_lines(record, record_id, entities):
+    line = {u'record': record, u'entities': entities}
+    if record_id is not None:
+        line[u'id'] = record_id
+    return json.dumps(line) + u'\n'
+
+
+def _csv_lines(record, record_id, entities):
+    lines = io.StringIO()
+    writer = csv.writer(lines)
+    for entity in entities:
+        writer.writerow([record, u'' if record_id is None else record_id, entity[u'dim'],
+                         entity[u'start'], entity[u'end'], entity[u'body'],
+                         json.dumps(entity[u'value'])])
+    return lines.getvalue()
+
+
+def extract(parse_batch, in_path, out_path, checkpoint_path=None, in_format=None,
+            out_format=None, text_field=u'text', id_field=None, reference_time='',
+            batch_size=32, workers=1, checkpoint_every=1000, progress=None):
+    """Extracts the entities of all records of in_path into out_path.
+
+    If a checkpoint of the same input exists, the records before it are
+    skipped and the output is truncated to its size at the checkpoint, so
+    records are never written twice. The checkpoint is removed once all
+    records are written.
+
+    Args:
+        parse_batch: A function taking a list of texts and a reference_time
+            keyword argument, e.g. a partial of Duckling.parse_batch.
+        in_path: The path of the JSONL or CSV input file.
+        out_path: The path of the JSONL or CSV output file.
+        checkpoint_path: Optional path of the checkpoint. Default is
+            out_path with .checkpoint appended.
+        in_format: Optional input format, see read_records().
+        out_format: Optional output format, u'jsonl' or u'csv'. Default is
+            derived from the file extension.
+        text_field: Optional name of the input field holding the text.
+        id_field: Optional name of an input field copied to the output.
+        reference_time: Optional reference time for Duckling.
+        batch_size: Optional number of records per parse_batch call. Default
+            is 32.
+        workers: Optional number of parse_batch calls running at the same
+            time. Default is 1.
+        checkpoint_every: Optional number of records between checkpoints.
+            Default is 1000.
+        progress: Optional function called with (records, entities, seconds)
+            after every batch of records written in this run.
+
+    Returns:
+        A dict with the number of records and entities written in this run,
+        the seconds it took and the record the run started at.
+    """
+    checkpoint_path = checkpoint_path or u'{path}.checkpoint'.format(path=out_path)
+    write_lines = _csv_lines if _format(out_path, out_format) == u'csv' else _jsonl_lines
+    input_size = os.path.getsize(in_path)
+    state = load_checkpoint(checkpoint_path)
+    if state is None or state[u'input_size'] != input_size or not os.path.exists(out_path):
+        state = {u'input_size': input_size, u'offset': 0, u'record': 0, u'output_size': 0}
+    first_record = state[u'record']
+
+    records = read_records(in_path, in_format, text_field, id_field, state[u'offset'])
+    inputs = (((offset, record_id), text) for offset, record_id, text in records)
+    results = stream_parse(parse_batch, inputs, reference_time=reference_time,
+                           window=batch_size * workers * 4, batch_size=batch_size,
+                           workers=workers)
+
+    started = timer()
+    entity_count = 0
+    record = first_record
+    with open(out_path, 'r+b' if state[u'output_size'] else 'wb') as out_file:
+        # drop anything written after the checkpoint
+        out_file.seek(state[u'output_size'])
+        out_file.truncate()
+        if write_lines is _csv_lines and not state[u'output_size']:
+            out_file.write(u','.join(CSV_FIELDS).encode('utf-8') + b'\r\n')
+        for (offset, record_id), entities in results:
+            out_file.write(write_lines(record, record_id, entities).encode('utf-8'))
+            record += 1
+            entity_count += len(entities)
+            if (record - first_record) % batch_size == 0 and progress:
+                progress(record - first_record, entity_count, timer() - started)
+            if (record - first_record) % checkpoint_every == 0:
+                out_file.flush()
+                os.fsync(out_file.fileno())
+                state.update({u'offset': offset, u'record': record,
+                              u'output_size': out_file.tell()})
+                save_checkpoint(checkpoint_path, state)
+    if os.path.exists(checkpoint_path):
+        os.remove(checkpoint_path)
+
+    seconds = timer() - started
+    if progress:
+        progress(record - first_record, entity_count, seconds)
+    return {u'records': record - first_record, u'entities': entity_count,
+            u'seconds': seconds, u'first_record': first_record}
+
+
+def _report(records, entities, seconds):
+    sys.stderr.write('\r{records} records, {entities} entities, {rate:.1f} records/s'.format(
+        records=records, entities=entities, rate=records / seconds if seconds else 0.0))
+    sys.stderr.flush()
+
+
+def main(argv=None):
+    arg_parser = argparse.ArgumentParser(
+        prog='python -m duckling.extract',
+        description='Extract Duckling entities from a JSONL or CSV corpus.')
+    arg_parser.add_argument('--in', dest='in_path', required=True,
+                            help='input file (.jsonl or .csv)')
+    arg_parser.add_argument('--out', dest='out_path', required=True,
+                            help='output file (.jsonl or .csv)')
+    arg_parser.add_argument('--dims', default='',
+                            help='comma-separated dims (default: all)')
+    arg_parser.add_argument('--lang', default='en')
+    arg_parser.add_argument('--workers', type=int, default=1,
+                            help='number of worker processes, each with its own JVM (default: 1)')
+    arg_parser.add_argument('--text-field', default='text')
+    arg_parser.add_argument('--id-field', default=None,
+                            help='input field copied to the output to identify records')
+    arg_parser.add_argument('--reference-time', default='')
+    arg_parser.add_argument('--format', default=None, choices=['jsonl', 'csv'],
+                            help='input format (default: from the file extension)')
+    arg_parser.add_argument('--batch-size', type=int, default=32)
+    arg_parser.add_argument('--checkpoint', default=None,
+                            help='checkpoint file (default: OUT.checkpoint)')
+    arg_parser.add_argument('--checkpoint-every', type=int, default=1000,
+                            help='records between checkpoints (default: 1000)')
+    arg_parser.add_argument('--restart', action='store_true',
+                            help='ignore an existing checkpoint and start from scratch')
+    arg_parser.add_argument('--maximum-heap-size', default='2048m')
+    args = arg_parser.parse_args(argv)
+
+    checkpoint_path = args.checkpoint or u'{path}.checkpoint'.format(path=args.out_path)
+    if args.restart and os.path.exists(checkpoint_path):
+        os.remove(checkpoint_path)
+    dims = [dim for dim in args.dims.split(',') if dim] or None
+
+    pool = None
+    if args.workers > 1:
+        pool = DucklingPool(processes=args.workers, languages=[args.lang],
+                            maximum_heap_size=args.maximum_heap_size)
+        parse_batch = functools.partial(pool.parse_batch, language=args.lang,
+                                        dim_filter=dims, chunk_size=args.batch_size)
+    else:
+        duckling = Duckling(maximum_heap_size=args.maximum_heap_size)
+        duckling.load([args.lang])
+        parse_batch = functools.partial(duckling.parse_batch, language=args.lang,
+                                        dim_filter=dims)
+    try:
+        summary = extract(
+            parse_batch, args.in_path, args.out_path, checkpoint_path=checkpoint_path,
+            in_format=args.format, text_field=args.text_field, id_field=args.id_field,
+            reference_time=args.reference_time, batch_size=args.batch_size,
+            workers=args.workers, checkpoint_every=args.checkpoint_every,
+            progress=_report)
+    finally:
+        if pool is not None:
+            pool.shutdown()
+    sys.stderr.write('\nDone after {seconds:.1f}s, resumed at record {record}\n'.format(
+        seconds=summary[u'seconds'], record=summary[u'first_record']))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
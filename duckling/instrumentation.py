@@ -0,0 +1,141 @@
+import threading
+from contextlib import contextmanager
+from timeit import default_timer as timer
+
+
+class ParseRecord(object):
+
+    """Timing breakdown of a single parse or batch call.
+
+    Stage timings are in seconds and keyed by stage name:
+        attach: attaching the calling thread to the JVM.
+        prescreen: the pre-screen check, if the input was rejected by it.
+        cache: looking up the result cache.
+        engine: the duckling.core/parse call.
+        conversion: converting the result to Python, including datetime.
+        datetime: parsing datetime strings (parse_datetime=True only).
+        postprocessing: the DucklingWrapper post-processing.
+        total: the whole call.
+
+    Attributes:
+        input_length: The length of the input string, or the total length
+            of the inputs of a batch call.
+        input_count: The number of inputs of a batch call, None for a call
+            with a single input.
+        language: The Duckling language id.
+        dims: The dim filter of the call.
+        entity_count: The number of entities returned, over all inputs of
+            a batch call.
+        timings: A dict of stage name to seconds.
+        error: The exception raised by the call, if any.
+    """
+
+    __slots__ = ('input_length', 'input_count', 'language', 'dims', 'entity_count',
+                 'timings', 'error', '_started', '_last')
+
+    def __init__(self, input_length, language, dims, input_count=None):
+        self.input_length = input_length
+        self.input_count = input_count
+        self.language = language
+        self.dims = dims
+        self.entity_count = 0
+        self.timings = {}
+        self.error = None
+        self._started = self._last = timer()
+
+    def mark(self, stage):
+        """Adds the time since the previous mark to stage."""
+        now = timer()
+        self.timings[stage] = self.timings.get(stage, 0.0) + now - self._last
+        self._last = now
+
+    def add(self, stage, seconds):
+        """Adds seconds to stage without moving the mark."""
+        self.timings[stage] = self.timings.get(stage, 0.0) + seconds
+
+    def _finish(self):
+        self.timings[u'total'] = timer() - self._started
+
+    def __repr__(self):
+        return 'ParseRecord(language={language!r}, dims={dims!r}, input_length={length}, ' \
+            'entity_count={count}, timings={timings!r})'.format(
+                language=self.language, dims=self.dims, length=self.input_length,
+                count=self.entity_count, timings=self.timings)
+
+
+class Instrumentation(object):
+
+    """Registry of hooks receiving a ParseRecord for every parse call.
+
+    Instrumentation is disabled while no hook is registered, which costs a
+    single list check per call. Hooks are called synchronously in the parsing
+    thread and should return quickly.
+
+    Attributes:
+        hooks: The list of registered hooks.
+    """
+
+    def __init__(self):
+        self.hooks = []
+        self._local = threading.local()
+
+    def add_hook(self, hook):
+        """Registers a callable which receives a ParseRecord per call."""
+        self.hooks.append(hook)
+
+    def remove_hook(self, hook):
+        """Unregisters a hook."""
+        self.hooks.remove(hook)
+
+    @contextmanager
+    def hook(self, hook):
+        """Context manager registering hook for the duration of the block."""
+        self.add_hook(hook)
+        try:
+            yield hook
+        finally:
+            self.remove_hook(hook)
+
+    def current(self):
+        """Returns the record of the call running in this thread, if any."""
+        return getattr(self._local, 'record', None)
+
+    def begin(self, input_str, language, dims):
+        """Starts a record for a call, unless an outer call already did.
+
+        Returns:
+            A tuple of the record and whether this call owns it and has to
+            pass it to end().
+        """
+        record = self.current()
+        if record is not None:
+            return record, False
+        record = ParseRecord(len(input_str), language, dims)
+        self._local.record = record
+        return record, True
+
+    def begin_batch(self, inputs, language, dims):
+        """Like begin(), for a call parsing a list of input strings."""
+        record = self.current()
+        if record is not None:
+            return record, False
+        record = ParseRecord(sum(len(input_str) for input_str in inputs), language, dims,
+                             input_count=len(inputs))
+        self._local.record = record
+        return record, True
+
+    def end(self, record, owner, result=None, error=None):
+        """Finishes a record and passes it to the hooks if owner is set."""
+        if not owner:
+            return
+        self._local.record = None
+        if result is None:
+            record.entity_count = 0
+        elif record.input_count is None:
+            record.entity_count = len(result)
+        else:
+            record.entity_count = sum(len(entities) for entities in result)
+        record.error = error
+        record._finish()
+        for hook in list(self.hooks):
+            hook(record)
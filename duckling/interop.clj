@@ -0,0 +1,202 @@
+(ns duckling.interop
+  (:require [clojure.edn :as edn]
+            [clojure.string :as string]
+            [duckling.core :as core]
+            [duckling.learn :as learn]))
+
+; Helpers loaded by the Python wrapper on top of duckling.core. They exist to
+; keep the number of JPype calls per request low: everything that would
+; otherwise be a loop in Python runs here, and a single Java structure is
+; handed back.
+
+(defn- parse-one
+  [module text dims context]
+  (vec (if context
+         (core/parse module text dims context)
+         (core/parse module text dims))))
+
+(defn parse-batch
+  "Parses every text of the texts array with the module and context found at
+  the same index of the modules and contexts arrays. A nil context means the
+  current date and time is used as reference time. With parallel? set, the
+  texts are parsed in parallel.
+  Returns a vector with one result vector per text."
+  ([modules texts dims contexts]
+   (parse-batch modules texts dims contexts false))
+  ([modules texts dims contexts parallel?]
+   (vec ((if parallel? pmap map) #(parse-one %1 %2 dims %3) modules texts contexts))))
+
+;--------------------------------------------------------------------------
+; Columnar output
+;--------------------------------------------------------------------------
+
+(defn- time-millis
+  "Returns the epoch milliseconds of a time value, or of the start (else the
+  end) of an interval. Long/MIN_VALUE if there is none."
+  [value]
+  (let [v (or (:value value) (get-in value [:from :value]) (get-in value [:to :value]))]
+    (if (string? v)
+      (.getMillis (org.joda.time.DateTime/parse v))
+      Long/MIN_VALUE)))
+
+(defn parse-batch-columns
+  "Parses like parse-batch and returns all entities as columns of primitive
+  arrays: int[] input indices, int[] starts, int[] ends, int[] dim codes (the
+  index of the dim in the dim-names array, -1 if missing), double[] numeric
+  values (NaN if not numeric) and long[] epoch milliseconds of time values
+  (Long/MIN_VALUE if not a time)."
+  [modules texts dims contexts dim-names]
+  (let [codes (zipmap (map keyword dim-names) (range))
+        entities (vec (for [[index result] (map-indexed vector
+                                                         (parse-batch modules texts dims contexts))
+                            entity result]
+                        [index entity]))
+        n (count entities)
+        indices (int-array n)
+        starts (int-array n)
+        ends (int-array n)
+        dim-codes (int-array n)
+        values (double-array n)
+        times (long-array n)]
+    (dotimes [i n]
+      (let [[index {:keys [dim start end value]}] (entities i)
+            number (:value value)]
+        (aset indices i (int index))
+        (aset starts i (int start))
+        (aset ends i (int end))
+        (aset dim-codes i (int (get codes (keyword dim) -1)))
+        (aset values i (if (number? number) (double number) Double/NaN))
+        (aset times i (if (= (keyword dim) :time) (long (time-millis value)) Long/MIN_VALUE))))
+    (object-array [indices starts ends dim-codes values times])))
+
+;--------------------------------------------------------------------------
+; Incremental loading
+;--------------------------------------------------------------------------
+
+(defn- loaded-modules
+  []
+  (mapv name (keys @core/rules-map)))
+
+(defn- module-lang
+  [config-key]
+  (-> config-key name (string/split #"\$") first))
+
+(defn load-languages!
+  "Loads the languages (ISO 639-1 codes) which are not loaded yet.
+  Unlike duckling.core/load!, already loaded languages are kept and stay
+  usable while the new ones are trained.
+  Returns the ids of all loaded modules."
+  [languages]
+  (let [missing (remove #(contains? @core/rules-map (keyword (str % "$core")))
+                        languages)
+        data (->> (#'core/gen-config-for-langs missing)
+                  (pmap (fn [[config-key {corpus-files :corpus rules-files :rules}]]
+                          (let [lang (module-lang config-key)
+                                corpus (#'core/make-corpus lang corpus-files)
+                                rules (#'core/make-rules lang rules-files)
+                                c (learn/train-classifiers corpus rules learn/extract-route-features)]
+                            [config-key {:corpus corpus :rules rules :classifier c}])))
+                  (into {}))]
+    (doseq [[config-key {:keys [classifier corpus rules]}] data]
+      ; rules go last, a module without classifiers can't be parsed
+      (swap! core/classifiers-map assoc config-key classifier)
+      (swap! core/corpus-map assoc config-key corpus)
+      (swap! core/rules-map assoc config-key rules))
+    (loaded-modules)))
+
+;--------------------------------------------------------------------------
+; Snapshots
+;--------------------------------------------------------------------------
+
+(defn snapshot
+  "Returns the trained classifiers of all loaded modules as EDN string.
+  With the EDN string of an earlier snapshot, its classifiers of modules not
+  loaded in this process are kept."
+  ([]
+   (snapshot "{}"))
+  ([previous-edn]
+   (pr-str (merge (edn/read-string previous-edn)
+                  (select-keys @core/classifiers-map (keys @core/rules-map))))))
+
+(defn restore-languages!
+  "Restores the languages (ISO 639-1 codes) which are not loaded yet from an
+  EDN string returned by snapshot. Only the classifiers are stored, the rules
+  are rebuilt from the rule files, which is cheap compared to training.
+  Languages not contained in the snapshot are left alone.
+  Returns the ids of all loaded modules."
+  [snapshot-edn languages]
+  (let [classifiers (edn/read-string snapshot-edn)
+        missing (->> languages
+                     (map #(keyword (str % "$core")))
+                     (remove #(contains? @core/rules-map %))
+                     (filter #(contains? classifiers %))
+                     (map module-lang))]
+    (doseq [[config-key {rules-files :rules}] (#'core/gen-config-for-langs missing)]
+      (let [rules (#'core/make-rules (module-lang config-key) rules-files)]
+        (swap! core/classifiers-map assoc config-key (get classifiers config-key))
+        (swap! core/rules-map assoc config-key rules)))
+    (loaded-modules)))
+
+;--------------------------------------------------------------------------
+; JSON transport
+;--------------------------------------------------------------------------
+
+(defn- write-string
+  [^StringBuilder sb ^String s]
+  (.append sb \")
+  (dotimes [i (.length s)]
+    (let [c (.charAt s i)]
+      (case c
+        \" (.append sb "\\\"")
+        \\ (.append sb "\\\\")
+        \newline (.append sb "\\n")
+        \return (.append sb "\\r")
+        \tab (.append sb "\\t")
+        (if (< (int c) 0x20)
+          (.append sb (format "\\u%04x" (int c)))
+          (.append sb c)))))
+  (.append sb \"))
+
+(defn- write-json
+  "Appends x as JSON to sb. Keywords are written as their name."
+  [^StringBuilder sb x]
+  (cond
+    (nil? x) (.append sb "null")
+    (true? x) (.append sb "true")
+    (false? x) (.append sb "false")
+    (string? x) (write-string sb x)
+    (keyword? x) (write-string sb (name x))
+    (ratio? x) (.append sb (str (double x)))
+    (number? x) (.append sb (str x))
+    (map? x) (do
+               (.append sb \{)
+               (doseq [[i [k v]] (map-indexed vector x)]
+                 (when (pos? i) (.append sb \,))
+                 (write-string sb (if (keyword? k) (name k) (str k)))
+                 (.append sb \:)
+                 (write-json sb v))
+               (.append sb \}))
+    (sequential? x) (do
+                      (.append sb \[)
+                      (doseq [[i v] (map-indexed vector x)]
+                        (when (pos? i) (.append sb \,))
+                        (write-json sb v))
+                      (.append sb \]))
+    :else (write-string sb (str x)))
+  sb)
+
+(defn- json-str
+  [x]
+  (str (write-json (StringBuilder.) x)))
+
+(defn parse-json
+  "Like duckling.core/parse, but returns the result as a JSON string."
+  [module text dims context]
+  (json-str (parse-one module text dims context)))
+
+(defn parse-batch-json
+  "Like parse-batch, but returns the results as a single JSON string."
+  ([modules texts dims contexts]
+   (parse-batch-json modules texts dims contexts false))
+  ([modules texts dims contexts parallel?]
+   (json-str (parse-batch modules texts dims contexts parallel?))))
@@ -0,0 +1,48 @@
+from datetime import datetime
+from dateutil import parser
+from dateutil.tz import tzoffset, tzutc
+
+# one tzinfo per UTC offset in seconds, shared by all parsed datetimes
+_timezones = {0: tzutc()}
+
+
+def timezone(offset_seconds):
+    """Returns the shared tzinfo for a UTC offset in seconds."""
+    tz = _timezones.get(offset_seconds)
+    if tz is None:
+        tz = _timezones.setdefault(offset_seconds, tzoffset(None, offset_seconds))
+    return tz
+
+
+def parse_datetime(value):
+    """Parses a Duckling time value into a timezone-aware datetime.
+
+    The fixed layout emitted by Duckling, with or without milliseconds, is
+    parsed by slicing, anything else falls back to dateutil.
+
+    Args:
+        value: A datetime string, e.g. 2013-02-12T04:30:00.000-02:00.
+
+    Returns:
+        A datetime with a tzinfo shared between all values of the same
+        offset.
+
+    Raises:
+        ValueError: An error occurres when value is no valid datetime.
+    """
+    length = len(value)
+    # the offset follows the seconds, with or without milliseconds
+    offset_index = 23 if length == 29 and value[19] == u'.' else 19 if length == 25 else None
+    if offset_index and value[10] == u'T' and value[offset_index] in u'+-' \
+            and value[offset_index + 3] == u':':
+        try:
+            offset = int(value[offset_index + 1:offset_index + 3]) * 3600 + \
+                int(value[offset_index + 4:offset_index + 6]) * 60
+            return datetime(
+                int(value[0:4]), int(value[5:7]), int(value[8:10]),
+                int(value[11:13]), int(value[14:16]), int(value[17:19]),
+                int(value[20:23]) * 1000 if offset_index == 23 else 0,
+                timezone(-offset if value[offset_index] == u'-' else offset))
+        except ValueError:
+            pass
+    return parser.parse(value)
@@ -0,0 +1,44 @@
+import threading
+import jpype
+from six.moves import _thread
+
+_thread_state = threading.local()
+
+
+class _ThreadAttachment(object):
+
+    """Attachment of one thread to the JVM.
+
+    Instances live in thread-local state, so they are released when their
+    thread exits, which detaches the thread again. Threads which were
+    already attached (e.g. the thread that started the JVM) are left alone.
+    """
+
+    def __init__(self):
+        self._ident = _thread.get_ident()
+        self._attached = False
+        if not jpype.isThreadAttachedToJVM():
+            jpype.attachThreadToJVM()
+            self._attached = True
+
+    def __del__(self):
+        # thread-local state is cleared by the exiting thread itself; never
+        # detach another thread if it is released anywhere else. The thread
+        # is already unregistered from threading here, and current_thread()
+        # would register a dummy thread that is never removed
+        if not self._attached or _thread.get_ident() != self._ident:
+            return
+        try:
+            if jpype.isJVMStarted() and jpype.isThreadAttachedToJVM():
+                jpype.detachThreadFromJVM()
+        except Exception:
+            pass
+
+
+def attach_thread():
+    """Attaches the calling thread to the JVM, once per thread.
+
+    The thread is detached automatically when it exits.
+    """
+    if getattr(_thread_state, 'attachment', None) is None:
+        _thread_state.attachment = _ThreadAttachment()
@@ -0,0 +1,198 @@
+"""JVM heap footprints of Duckling and heap sizing for a set of languages.
+
+Every loaded language keeps its rules and trained classifiers on the JVM
+heap, and training them needs more heap than they keep. A footprint is the
+peak heap in MB a language takes while load() trains it; BASE_HEAP_MB is the
+heap used by Clojure and duckling.core alone.
+
+HEAP_FOOTPRINTS_MB holds estimates only, scaled from the size of each
+language's rules and corpus in the bundled Duckling jar (about 1.5 MB of heap
+per KB of source), not measurements. heap_size() therefore never goes below
+UNMEASURED_HEAP_MB unless every language has a measured footprint. Measure
+them for the JVM in use with:
+    python -m duckling.memory [--languages en,de] [--out footprints.json]
+and pass the result as footprints to heap_size().
+"""
+
+import sys
+import json
+import math
+import argparse
+import multiprocessing
+import jpype
+from six import text_type
+from .language import Language
+
+MB = 1024 * 1024
+
+BASE_HEAP_MB = 128
+
+# heap size while any footprint is an estimate, the default -Xmx of Duckling
+UNMEASURED_HEAP_MB = 2048
+
+HEAP_FOOTPRINTS_MB = {
+    u'ar': 29,
+    u'da': 80,
+    u'de': 95,
+    u'en': 106,
+    u'es': 77,
+    u'et': 96,
+    u'fr': 112,
+    u'ga': 54,
+    u'id': 29,
+    u'it': 95,
+    u'ja': 32,
+    u'ko': 86,
+    u'pt': 78,
+    u'ru': 30,
+    u'uk': 30,
+    u'vi': 33,
+    u'zh': 57,
+}
+
+
+def heap_size(languages=[], footprints=None, headroom=1.25, granularity_mb=64):
+    """Returns a maximum heap size for the languages, e.g. '768m'.
+
+    Args:
+        languages: Optional languages to size the heap for, defaults to all.
+        footprints: Optional dict of ISO 639-1 code to footprint in MB, e.g.
+            measured by measure(). Languages missing in it fall back to
+            HEAP_FOOTPRINTS_MB, and the size is then at least
+            UNMEASURED_HEAP_MB.
+        headroom: Optional factor for parse-time allocations on top of the
+            loaded languages. Default is 1.25.
+        granularity_mb: Optional step the size is rounded up to. Default is
+            64.
+
+    Returns:
+        A heap size string for -Xmx.
+    """
+    measured = footprints or {}
+    iso_languages = set(Language.convert_to_iso(language)
+                        for language in languages or Language.SUPPORTED_LANGUAGES)
+    size_mb = (BASE_HEAP_MB + sum(measured.get(language, HEAP_FOOTPRINTS_MB[language])
+                                  for language in iso_languages)) * headroom
+    if not iso_languages <= set(measured):
+        size_mb = max(size_mb, UNMEASURED_HEAP_MB)
+    return '{size}m'.format(size=int(math.ceil(size_mb / granularity_mb)) * granularity_mb)
+
+
+def _usage(memory_usage):
+    return {
+        u'init': int(memory_usage.getInit()),
+        u'used': int(memory_usage.getUsed()),
+        u'committed': int(memory_usage.getCommitted()),
+        u'max': int(memory_usage.getMax())
+    }
+
+
+def memory_stats():
+    """Reads heap, memory pool and garbage collector stats of the JVM.
+
+    Returns:
+        A dict with the heap and non-heap usage in bytes (init, used,
+        committed and max, -1 if undefined), the usage of every memory pool
+        by pool name and the collection count and time of every garbage
+        collector by name:
+
+        {
+            u'heap': {u'init': ..., u'used': ..., u'committed': ..., u'max': ...},
+            u'non_heap': {...},
+            u'pools': {u'G1 Old Gen': {u'type': u'HEAP', u'used': ..., ...}, ...},
+            u'gc': {u'G1 Young Generation': {u'count': ..., u'time_ms': ...}, ...}
+        }
+    """
+    management = jpype.JClass('java.lang.management.ManagementFactory')
+    memory = management.getMemoryMXBean()
+    stats = {
+        u'heap': _usage(memory.getHeapMemoryUsage()),
+        u'non_heap': _usage(memory.getNonHeapMemoryUsage()),
+        u'pools': {},
+        u'gc': {}
+    }
+    for pool in management.getMemoryPoolMXBeans():
+        usage = _usage(pool.getUsage())
+        usage[u'type'] = text_type(pool.getType().name())
+        stats[u'pools'][text_type(pool.getName())] = usage
+    for collector in management.getGarbageCollectorMXBeans():
+        stats[u'gc'][text_type(collector.getName())] = {
+            u'count': int(collector.getCollectionCount()),
+            u'time_ms': int(collector.getCollectionTime())
+        }
+    return stats
+
+
+def _used_heap_after_gc():
+    jpype.JClass('java.lang.System').gc()
+    management = jpype.JClass('java.lang.management.ManagementFactory')
+    for pool in management.getMemoryPoolMXBeans():
+        pool.resetPeakUsage()
+    return memory_stats()[u'heap'][u'used']
+
+
+def _peak_heap():
+    # the sum of the pool peaks is an upper bound of the peak heap usage
+    management = jpype.JClass('java.lang.management.ManagementFactory')
+    return sum(int(pool.getPeakUsage().getUsed()) for pool in management.getMemoryPoolMXBeans()
+               if text_type(pool.getType().name()) == u'HEAP')
+
+
+def _measure_language(iso_language):
+    from .duckling import Duckling
+
+    duckling = Duckling(maximum_heap_size='4096m')
+    before = _used_heap_after_gc()
+    duckling.load([iso_language])
+    return iso_language, int(math.ceil(float(_peak_heap() - before) / MB))
+
+
+def measure(languages=[]):
+    """Measures the heap footprint of each language in a fresh JVM.
+
+    Every language is loaded in its own worker process, and the peak heap
+    usage during load() is compared to the heap used after a full garbage
+    collection before it.
+
+    Args:
+        languages: Optional languages to measure, defaults to all.
+
+    Returns:
+        A dict of ISO 639-1 code to footprint in MB.
+    """
+    iso_languages = sorted(set(Language.convert_to_iso(language)
+                               for language in languages or Language.SUPPORTED_LANGUAGES))
+    context = multiprocessing.get_context('spawn')
+    footprints = {}
+    for iso_language in iso_languages:
+        # a process per language, JPype can't restart a JVM
+        worker_pool = context.Pool(processes=1)
+        try:
+            footprints.update([worker_pool.apply(_measure_language, (iso_language,))])
+        finally:
+            worker_pool.terminate()
+    return footprints
+
+
+def main(argv=None):
+    arg_parser = argparse.ArgumentParser(
+        prog='python -m duckling.memory',
+        description='Measure the JVM heap footprint of Duckling languages.')
+    arg_parser.add_argument('--languages', default='',
+                            help='comma-separated languages (default: all)')
+    arg_parser.add_argument('--out', default=None,
+                            help='write the footprints as JSON to this file (default: stdout)')
+    args = arg_parser.parse_args(argv)
+
+    footprints = measure([language for language in args.languages.split(',') if language])
+    if args.out:
+        with open(args.out, 'w') as out_file:
+            json.dump(footprints, out_file, indent=2, sort_keys=True)
+    else:
+        json.dump(footprints, sys.stdout, indent=2, sort_keys=True)
+        sys.stdout.write('\n')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
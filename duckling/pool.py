@@ -0,0 +1,144 @@
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from .duckling import Duckling
+from .language import Language
+
+# Duckling instance of the current worker process, set up by _initialize()
+_duckling = None
+
+
+def _initialize(languages, duckling_args):
+    global _duckling
+    _duckling = Duckling(**duckling_args)
+    _duckling.load(languages)
+
+
+def _call(method, *args):
+    try:
+        return getattr(_duckling, method)(*args)
+    except (RuntimeError, ValueError):
+        raise
+    except Exception as error:
+        # Java exceptions can't be pickled back to the parent process
+        raise RuntimeError('{name}: {msg}'.format(
+            name=type(error).__name__, msg=error))
+
+
+class DucklingPool(object):
+
+    """Pool of worker processes, each running its own Duckling JVM.
+
+    JPype supports only one JVM per process, so the pool scales Duckling
+    across CPU cores by starting one Duckling instance per worker process.
+    Workers are started with the spawn start method, so a JVM running in the
+    parent process is never forked. Requires Python 3.7 or newer.
+
+    Attributes:
+        processes: Optional number of worker processes. Default is the number
+            of CPUs.
+        languages: Optional languages to load in every worker, defaults to
+            all.
+        parse_datetime: Optional attribute to specify if datetime string should
+            be parsed with datetime.strptime(). Default is False.
+        minimum_heap_size: Optional attribute to set initial and minimum heap
+            size per worker. Default is 128m.
+        maximum_heap_size: Optional attribute to set maximum heap size per
+            worker. Default is 2048m.
+        json_transport: Optional attribute to specify if workers use the JSON
+            result transport. Default is False.
+    """
+
+    def __init__(self,
+                 processes=None,
+                 languages=[],
+                 parse_datetime=False,
+                 minimum_heap_size='128m',
+                 maximum_heap_size='2048m',
+                 json_transport=False):
+        self.processes = processes or multiprocessing.cpu_count()
+        self._executor = ProcessPoolExecutor(
+            max_workers=self.processes,
+            mp_context=multiprocessing.get_context('spawn'),
+            initializer=_initialize,
+            initargs=(languages, {
+                u'parse_datetime': parse_datetime,
+                u'minimum_heap_size': minimum_heap_size,
+                u'maximum_heap_size': maximum_heap_size,
+                u'json_transport': json_transport
+            }))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.shutdown()
+
+    def submit(self, input_str, language=Language.ENGLISH, dim_filter=None, reference_time=''):
+        """Schedules parsing of input_str on a worker.
+
+        Args:
+            input_str: The input as string that has to be parsed.
+            language: Optional parameter to specify language,
+                e.g. Duckling.ENGLISH or supported ISO 639-1 Code (e.g. "en")
+            dim_filter: Optional parameter to specify a single filter or
+                list of filters for dimensions in Duckling.
+            reference_time: Optional reference time for Duckling.
+
+        Returns:
+            A concurrent.futures.Future resolving to the list of dicts returned
+            by Duckling.parse(). Exceptions raised in the worker are raised by
+            Future.result().
+        """
+        return self._executor.submit(
+            _call, 'parse', input_str, language, dim_filter, reference_time)
+
+    def parse(self, input_str, language=Language.ENGLISH, dim_filter=None, reference_time=''):
+        """Parses input_str on a worker and waits for the result.
+
+        See Duckling.parse() for arguments and return value.
+        """
+        return self.submit(input_str, language, dim_filter, reference_time).result()
+
+    def parse_batch(self, inputs, language=Language.ENGLISH, dim_filter=None,
+                    reference_time='', chunk_size=None):
+        """Parses a list of strings, distributing chunks across the workers.
+
+        Args:
+            inputs: A list of strings that have to be parsed.
+            language: Optional language or list of languages, one per input.
+            dim_filter: Optional parameter to specify a single filter or
+                list of filters for dimensions in Duckling.
+            reference_time: Optional reference time or list of reference
+                times, one per input.
+            chunk_size: Optional number of inputs per worker call. Default
+                spreads the inputs evenly over all workers.
+
+        Returns:
+            A list with one list of dicts per input, in input order.
+        """
+        inputs = list(inputs)
+        if not inputs:
+            return []
+        chunk_size = chunk_size or -(-len(inputs) // self.processes)
+        futures = []
+        for start in range(0, len(inputs), chunk_size):
+            end = start + chunk_size
+            futures.append(self._executor.submit(
+                _call, 'parse_batch', inputs[start:end],
+                self._chunk(language, start, end), dim_filter,
+                self._chunk(reference_time, start, end)))
+        return [result for future in futures for result in future.result()]
+
+    def _chunk(self, value, start, end):
+        if isinstance(value, (list, tuple)):
+            return list(value[start:end])
+        return value
+
+    def shutdown(self, wait=True):
+        """Stops the workers.
+
+        Args:
+            wait: Optional parameter to wait until all pending parses are
+                done (graceful drain). Default is True.
+        """
+        self._executor.shutdown(wait=wait)
@@ -0,0 +1,84 @@
+from .jvm import attach_thread
+from .prescreen import might_contain_entities
+
+
+class PreparedParser(object):
+
+    """Reusable parser for a fixed language, dims and reference time.
+
+    Instances are created by Duckling.prepare() and hold the resolved
+    Duckling parse function together with the Clojure dimension filter and
+    reference time context, so a call only runs the parse itself and the
+    result conversion.
+
+    Attributes:
+        language: The Duckling language id the parser was prepared for.
+    """
+
+    def __init__(self, duckling, language, dim_filter, reference_context, dims=None):
+        self._duckling = duckling
+        if duckling.json_transport:
+            self._duckling_parse = duckling.clojure.var("duckling.interop", "parse-json")
+        else:
+            self._duckling_parse = duckling.clojure.var("duckling.core", "parse")
+        self._dim_filter = dim_filter
+        self._reference_context = reference_context
+        self._dims = dims or []
+        self.language = language
+
+    def __call__(self, input_str):
+        """Parses the input string.
+
+        Args:
+            input_str: The input as string that has to be parsed.
+
+        Returns:
+            A list of dicts with the result from the Duckling.parse() call, or
+            of Entity objects if compact_results is set on the Duckling.
+        """
+        instrumentation = self._duckling.instrumentation
+        if not instrumentation.hooks:
+            return self._parse(input_str)
+        record, owner = instrumentation.begin(input_str, self.language, self._dims or None)
+        result = error = None
+        try:
+            result = self._parse(input_str, record)
+            return result
+        except Exception as parse_error:
+            error = parse_error
+            raise
+        finally:
+            instrumentation.end(record, owner, result, error)
+
+    def _parse(self, input_str, record=None):
+        if self._duckling.prescreen and not might_contain_entities(
+                input_str, self.language, self._dims):
+            if record is not None:
+                record.mark(u'prescreen')
+            return []
+        attach_thread()
+        if record is not None:
+            record.mark(u'attach')
+        if self._duckling.json_transport:
+            duckling_result = self._duckling._invoke(
+                self._duckling_parse, self.language, input_str, self._dim_filter,
+                self._reference_context)
+            if record is not None:
+                record.mark(u'engine')
+            result = self._duckling._decode_result(duckling_result)
+        else:
+            if self._reference_context is None:
+                duckling_result = self._duckling._invoke(
+                    self._duckling_parse, self.language, input_str, self._dim_filter)
+            else:
+                duckling_result = self._duckling._invoke(
+                    self._duckling_parse, self.language, input_str, self._dim_filter,
+                    self._reference_context)
+            if record is not None:
+                record.mark(u'engine')
+            result = self._duckling._parse_result(duckling_result)
+        if self._duckling.compact_results:
+            result = self._duckling._compact(result)
+        if record is not None:
+            record.mark(u'conversion')
+        return result
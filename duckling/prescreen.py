@@ -0,0 +1,136 @@
+"""Cheap check whether an input can contain any Duckling entity at all.
+
+Every Duckling token is built bottom-up from rules whose pattern consists of
+regular expressions only (e.g. "tomorrow", digits, number words, "@" in
+emails). The trigger of such a rule is its first regular expression. If no
+trigger of the rules a dim depends on matches anywhere in the input, Duckling
+can't find an entity of that dim, and the input doesn't need to enter the
+JVM.
+
+The triggers are read from the rule files in the bundled Duckling jar. They
+are matched case-insensitively and with a looser version of Duckling's word
+boundary check, so the check only ever lets through more inputs than
+Duckling would match.
+Languages are only screened once their corpus was verified to pass; all
+other languages always pass.
+"""
+
+import re
+import threading
+from .dim import Dim
+from .sources import language_sources, read_forms
+
+# ISO 639-1 codes of the languages which are screened
+LANGUAGES = frozenset([u'en'])
+
+# rule files (without .clj) a dim can be built from, most dims use numbers
+_DIM_RULE_FILES = {
+    Dim.AMOUNTOFMONEY:  (u'finance', u'numbers'),
+    Dim.CYCLE:          (u'cycles', u'numbers'),
+    Dim.DISTANCE:       (u'measure', u'numbers'),
+    Dim.DURATION:       (u'duration', u'numbers'),
+    Dim.EMAIL:          (u'communication', u'numbers'),
+    Dim.LEVENPRODUCT:   (u'measure', u'numbers'),
+    Dim.LEVENUNIT:      (u'measure', u'numbers'),
+    Dim.NUMBER:         (u'numbers',),
+    Dim.ORDINAL:        (u'numbers',),
+    Dim.PHONENUMBER:    (u'communication', u'numbers'),
+    Dim.QUANTITY:       (u'measure', u'numbers'),
+    Dim.TEMPERATURE:    (u'temperature', u'numbers'),
+    Dim.TIME:           (u'time', u'cycles', u'duration', u'numbers'),
+    Dim.TIMEZONE:       (u'time',),
+    Dim.UNIT:           (u'finance', u'numbers'),
+    Dim.UNITOFDURATION: (u'duration',),
+    Dim.URL:            (u'communication',),
+    Dim.VOLUME:         (u'measure', u'numbers'),
+}
+
+# Java's default regex semantics: ASCII classes and ASCII case folding
+_FLAGS = re.IGNORECASE | getattr(re, 'ASCII', 0)
+_INLINE_FLAGS = re.compile(r'\(\?-?i\)')
+
+# Duckling only keeps matches whose first and last characters are of another
+# class (lower case, upper case, digit) than their neighbours, see
+# duckling.util/separated-substring?. Other characters are always accepted.
+_START = (u'(?-i:(?<![a-z])(?=[a-z])|(?<![A-Z])(?=[A-Z])|(?<![0-9])(?=[0-9])'
+          u'|(?=[^a-zA-Z0-9]))')
+_END = (u'(?-i:(?<=[a-z])(?![a-z])|(?<=[A-Z])(?![A-Z])|(?<=[0-9])(?![0-9])'
+        u'|(?<=[^a-zA-Z0-9]))')
+
+_triggers = {}
+_screens = {}
+_lock = threading.Lock()
+
+
+def rule_triggers(source):
+    """Returns the trigger regexes of the rules of a Duckling rule file.
+
+    Rules are (name, pattern, production) triples. The trigger of a rule
+    whose pattern consists of regexes only is its first regex. Rules with
+    other pattern elements are built on tokens of such rules and have no
+    trigger of their own.
+
+    Args:
+        source: The content of the rule file.
+
+    Returns:
+        A list of regex strings.
+    """
+    forms = read_forms(source)
+    triggers = []
+    for name, pattern in zip(forms[0::3], forms[1::3]):
+        if pattern[0] == u'regex':
+            triggers.append(pattern[1])
+        elif pattern[0] == u'vector' and pattern[1] and \
+                all(kind == u'regex' for kind, _ in pattern[1]):
+            triggers.append(pattern[1][0][1])
+    return triggers
+
+
+def _load_triggers(iso_language):
+    return dict((name, rule_triggers(source))
+                for name, source in language_sources(iso_language, u'rules'))
+
+
+def _screen(iso_language, rule_files):
+    key = (iso_language, rule_files)
+    if key in _screens:
+        return _screens[key]
+    with _lock:
+        if iso_language not in _triggers:
+            _triggers[iso_language] = _load_triggers(iso_language)
+        triggers = _triggers[iso_language]
+        patterns = [pattern for rule_file in sorted(triggers)
+                    if rule_files is None or rule_file in rule_files
+                    for pattern in triggers[rule_file]]
+        try:
+            screen = re.compile(u'{start}(?:{patterns}){end}'.format(
+                start=_START, end=_END, patterns=u'|'.join(
+                    u'(?:{pattern})'.format(pattern=_INLINE_FLAGS.sub(u'', pattern))
+                    for pattern in patterns)), _FLAGS)
+        except re.error:
+            # a regex this Python can't compile, never screen this language
+            screen = None
+        _screens[key] = screen
+        return screen
+
+
+def might_contain_entities(input_str, language, dims=None):
+    """Checks if Duckling might find an entity of the dims in the input.
+
+    Args:
+        input_str: The input string.
+        language: The Duckling language id, e.g. Language.ENGLISH.
+        dims: Optional list of dims, empty or None for all dims.
+
+    Returns:
+        False if Duckling can't find any entity, True otherwise.
+    """
+    iso_language = language[:2]
+    if iso_language not in LANGUAGES:
+        return True
+    rule_files = None
+    if dims and all(dim in _DIM_RULE_FILES for dim in dims):
+        rule_files = frozenset(rule_file for dim in dims for rule_file in _DIM_RULE_FILES[dim])
+    screen = _screen(iso_language, rule_files)
+    return screen is None or screen.search(input_str) is not None
@@ -0,0 +1,94 @@
+import re
+from bisect import bisect_left, bisect_right
+from .entity import Entity
+
+# ends of sentences (including closing quotes and brackets) and of lines
+_BOUNDARY = re.compile(u'[.!?][\'")\\]]*\\s+|\\n\\s*')
+
+
+def segment(document, max_length=1000, overlap=100):
+    """Splits a document into overlapping segments.
+
+    Segments end at a sentence or line boundary if there is one in the last
+    max_length characters, else at a space. Every segment after the first
+    starts up to overlap characters before the end of the previous one, at a
+    boundary if possible, so entities crossing the end of a segment are
+    found whole in the next one.
+
+    Args:
+        document: The document string.
+        max_length: Optional maximum length of a segment. Default is 1000.
+        overlap: Optional maximum number of characters shared by two
+            consecutive segments. Default is 100.
+
+    Returns:
+        A list of (offset, segment) tuples, offset being the position of the
+        segment in the document.
+
+    Raises:
+        ValueError: An error occurres when overlap is negative or not smaller
+            than max_length.
+    """
+    if not 0 <= overlap < max_length:
+        raise ValueError(
+            'overlap has to be between 0 and max_length, got {overlap}'.format(overlap=overlap))
+    if len(document) <= max_length:
+        return [(0, document)]
+
+    boundaries = [match.end() for match in _BOUNDARY.finditer(document)]
+    segments = []
+    start = 0
+    while start + max_length < len(document):
+        limit = start + max_length
+        index = bisect_right(boundaries, limit) - 1
+        if index >= 0 and boundaries[index] > start:
+            end = boundaries[index]
+        else:
+            end = document.rfind(u' ', start + 1, limit) + 1 or limit
+        segments.append((start, document[start:end]))
+
+        lowest = max(start + 1, end - overlap)
+        index = bisect_left(boundaries, lowest)
+        if index < len(boundaries) and boundaries[index] <= end:
+            start = boundaries[index]
+        else:
+            start = document.find(u' ', lowest, end) + 1 or end
+    segments.append((start, document[start:]))
+    return segments
+
+
+def _shift(entry, offset):
+    if not offset:
+        return entry
+    if isinstance(entry, Entity):
+        return type(entry)(entry.dim, entry.start + offset, entry.end + offset,
+                           entry.text, entry.value, entry.latent)
+    shifted = dict(entry)
+    shifted[u'start'] += offset
+    shifted[u'end'] += offset
+    return shifted
+
+
+def merge(segments, results):
+    """Combines the results of the segments into results for the document.
+
+    Start and end of every entry are shifted to document positions. A
+    segment keeps the entries starting before the next segment; later ones
+    are found again with more context in the next segment.
+
+    Args:
+        segments: The list of (offset, segment) tuples returned by segment().
+        results: The list of results (dicts or Entity objects), one per
+            segment.
+
+    Returns:
+        A list with the entries of all segments in document positions.
+    """
+    merged = []
+    for index, ((offset, _), result) in enumerate(zip(segments, results)):
+        limit = segments[index + 1][0] if index + 1 < len(segments) else None
+        for entry in result:
+            start = entry.start if isinstance(entry, Entity) else entry[u'start']
+            if limit is None or offset + start < limit:
+                merged.append(_shift(entry, offset))
+    return merged
@@ -0,0 +1,369 @@
+"""Local HTTP server for Duckling.
+
+One server process per host keeps a single warm JVM and serves any number
+of clients over HTTP/1.1 with keep-alive. Requests are put into a bounded
+queue and parsed by a fixed number of worker threads sharing one Duckling
+(or DucklingWrapper) instance. When the queue is full, requests are
+rejected right away with 503 instead of piling up.
+
+Usage:
+    python -m duckling.server [--host 127.0.0.1] [--port 8000] [--languages en,de]
+
+Endpoints:
+    POST /parse        {"text": ..., "language": "en", "dims": [...],
+                        "reference_time": ...} -> {"result": [...]}
+    POST /parse_batch  {"texts": [...], "language": "en", "dims": [...],
+                        "reference_time": ...} -> {"results": [[...], ...]}
+    GET  /health/live  200 as long as the server is running.
+    GET  /health/ready 200 once load() finished, 503 before.
+
+language, dims and reference_time are optional. reference_time of
+/parse_batch is either a single reference time or a list with one per text.
+"""
+
+import sys
+import json
+import argparse
+import threading
+from six.moves import BaseHTTPServer, queue, socketserver
+from .duckling import Duckling
+from .language import Language
+from .wrapper import DucklingWrapper
+
+_STOP = object()
+
+
+def _json_default(value):
+    # datetimes of parse_datetime=True and Entity objects of compact_results=True
+    if hasattr(value, 'isoformat'):
+        return value.isoformat()
+    if hasattr(value, 'to_dict'):
+        return value.to_dict()
+    raise TypeError('{value!r} is not JSON serializable'.format(value=value))
+
+
+class _Job(object):
+
+    def __init__(self, function, args, kwargs):
+        self.function = function
+        self.args = args
+        self.kwargs = kwargs
+        self.result = None
+        self.error = None
+        self.done = threading.Event()
+
+
+class _HTTPServer(socketserver.ThreadingMixIn, BaseHTTPServer.HTTPServer):
+
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, address, handler, duckling_server):
+        BaseHTTPServer.HTTPServer.__init__(self, address, handler)
+        self.duckling_server = duckling_server
+
+
+class _RequestHandler(BaseHTTPServer.BaseHTTPRequestHandler):
+
+    # keep connections open between requests
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        server = self.server.duckling_server
+        if self.path == '/health/live':
+            self._respond(200, {u'status': u'alive'})
+        elif self.path == '/health/ready':
+            if server.ready:
+                self._respond(200, {u'status': u'ready'})
+            elif server.load_error is not None:
+                self._respond(503, {u'status': u'failed', u'error': server.load_error})
+            else:
+                self._respond(503, {u'status': u'loading'})
+        else:
+            self._respond(404, {u'error': u'Not found'})
+
+    def do_POST(self):
+        server = self.server.duckling_server
+        try:
+            length = int(self.headers.get('Content-Length') or 0)
+            if length < 0:
+                raise ValueError('negative Content-Length {length}'.format(length=length))
+        except ValueError as error:
+            # the body can't be skipped, so the connection can't be reused
+            self.close_connection = True
+            self._respond(400, {u'error': u'Invalid request: {msg}'.format(msg=error)})
+            return
+        body = self.rfile.read(length) if length else b''
+        if self.path not in (u'/parse', u'/parse_batch'):
+            self._respond(404, {u'error': u'Not found'})
+            return
+        if not server.ready:
+            self._respond(503, {u'error': u'Duckling is not loaded yet'},
+                          {'Retry-After': '1'})
+            return
+        try:
+            request = json.loads(body.decode('utf-8'))
+            if self.path == u'/parse':
+                job = server.submit_parse(request[u'text'], **self._options(request))
+            else:
+                job = server.submit_parse_batch(request[u'texts'], **self._options(request))
+        except queue.Full:
+            self._respond(503, {u'error': u'Too many requests queued'},
+                          {'Retry-After': '1'})
+            return
+        except (ValueError, KeyError, TypeError, AttributeError) as error:
+            self._respond(400, {u'error': u'Invalid request: {msg}'.format(msg=error)})
+            return
+
+        job.done.wait()
+        if job.error is None:
+            key = u'result' if self.path == u'/parse' else u'results'
+            self._respond(200, {key: job.result})
+        elif isinstance(job.error, (ValueError, TypeError)):
+            self._respond(400, {u'error': u'{msg}'.format(msg=job.error)})
+        else:
+            self._respond(500, {u'error': u'{name}: {msg}'.format(
+                name=type(job.error).__name__, msg=job.error)})
+
+    @staticmethod
+    def _options(request):
+        options = {}
+        for name in (u'language', u'dims', u'reference_time'):
+            if request.get(name) is not None:
+                options[str(name)] = request[name]
+        return options
+
+    def _respond(self, status, content, headers={}):
+        body = json.dumps(content, default=_json_default).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        if self.server.duckling_server.verbose:
+            BaseHTTPServer.BaseHTTPRequestHandler.log_message(self, format, *args)
+
+
+class DucklingServer(object):
+
+    """HTTP/1.1 server parsing requests with a pool of worker threads.
+
+    The server accepts connections right away and loads Duckling in the
+    background; /health/ready reports ready once load() finished. All
+    workers share one Duckling instance, so the JVM and the loaded models
+    exist once per server.
+
+    Attributes:
+        address: Optional (host, port) tuple to listen on. Default is
+            ('127.0.0.1', 8000). Port 0 picks a free port, see port.
+        duckling: Optional Duckling or DucklingWrapper instance to serve.
+            Default creates a Duckling instance (or a DucklingWrapper if
+            wrapper is set) in the background.
+        languages: Optional languages to load, defaults to all. Ignored by
+            DucklingWrapper, which loads its own language.
+        wrapper: Optional attribute to specify if results are post-processed
+            by DucklingWrapper. Its language is the first of languages (or
+            English); the language of requests is ignored. Default is False.
+        workers: Optional number of requests parsed at the same time. Default
+            is 4.
+        queue_size: Optional maximum number of requests waiting for a
+            worker. Further requests get a 503 response. Default is 64.
+        warmup: Optional attribute to warm up the loaded languages before
+            reporting ready, see Duckling.warmup(). Default is False.
+        verbose: Optional attribute to log every request to stderr. Default
+            is False.
+        duckling_args: Optional dict of keyword arguments for the Duckling
+            or DucklingWrapper instance created by the server.
+    """
+
+    def __init__(self,
+                 address=('127.0.0.1', 8000),
+                 duckling=None,
+                 languages=[],
+                 wrapper=False,
+                 workers=4,
+                 queue_size=64,
+                 warmup=False,
+                 verbose=False,
+                 duckling_args=None):
+        self.duckling = duckling
+        self.languages = languages
+        self.wrapper = wrapper
+        self.warmup = warmup
+        self.verbose = verbose
+        self.duckling_args = duckling_args or {}
+        self.ready = False
+        self.load_error = None
+        self._jobs = queue.Queue(maxsize=queue_size)
+        self._workers = [threading.Thread(target=self._work, name='duckling-worker-{index}'.format(index=index))
+                         for index in range(workers)]
+        for worker in self._workers:
+            worker.daemon = True
+            worker.start()
+        self._loader = threading.Thread(target=self._load, name='duckling-loader')
+        self._loader.daemon = True
+        self._http_server = _HTTPServer(address, _RequestHandler, self)
+
+    @property
+    def port(self):
+        """The port the server listens on."""
+        return self._http_server.server_address[1]
+
+    def _load(self):
+        try:
+            if self.duckling is None:
+                if self.wrapper:
+                    self.duckling = DucklingWrapper(
+                        language=(self.languages or [Language.ENGLISH])[0], **self.duckling_args)
+                else:
+                    self.duckling = Duckling(**self.duckling_args)
+            if isinstance(self.duckling, DucklingWrapper):
+                duckling = self.duckling.duckling
+            else:
+                duckling = self.duckling
+                duckling.load(self.languages)
+            if self.warmup:
+                duckling.warmup()
+            self.ready = True
+        except Exception as error:
+            self.load_error = u'{name}: {msg}'.format(name=type(error).__name__, msg=error)
+
+    def _work(self):
+        while True:
+            job = self._jobs.get()
+            if job is _STOP:
+                return
+            try:
+                job.result = job.function(*job.args, **job.kwargs)
+            except Exception as error:
+                job.error = error
+            finally:
+                job.done.set()
+
+    def _submit(self, function, *args, **kwargs):
+        job = _Job(function, args, kwargs)
+        self._jobs.put_nowait(job)
+        return job
+
+    def submit_parse(self, text, language=Language.ENGLISH, dims=None, reference_time=''):
+        """Queues parsing of a single text.
+
+        Args:
+            text: The input string.
+            language: Optional language of the text. Default is English.
+            dims: Optional list of dims, defaults to all.
+            reference_time: Optional reference time for Duckling.
+
+        Returns:
+            A job whose done event is set once result or error is set.
+
+        Raises:
+            queue.Full: An error occurres when the queue is full.
+        """
+        if isinstance(self.duckling, DucklingWrapper):
+            return self._submit(self.duckling.parse, text,
+                                reference_time=reference_time, dims=dims)
+        return self._submit(self.duckling.parse, text, language,
+                            dim_filter=dims, reference_time=reference_time)
+
+    def submit_parse_batch(self, texts, language=Language.ENGLISH, dims=None, reference_time=''):
+        """Queues parsing of a list of texts with a single call into Duckling.
+
+        Args:
+            texts: The list of input strings.
+            language: Optional language of all texts, or a list with one
+                language per text. Default is English.
+            dims: Optional list of dims, defaults to all.
+            reference_time: Optional reference time for Duckling, either a
+                single reference time or a list with one per text.
+
+        Returns:
+            A job whose done event is set once result or error is set.
+
+        Raises:
+            queue.Full: An error occurres when the queue is full.
+        """
+        if isinstance(self.duckling, DucklingWrapper):
+            return self._submit(self.duckling.parse_batch, texts,
+                                dims=dims, reference_time=reference_time)
+        return self._submit(self.duckling.parse_batch, texts, language,
+                            dim_filter=dims, reference_time=reference_time)
+
+    def start(self):
+        """Starts loading Duckling and serving requests in the background."""
+        self._loader.start()
+        server_thread = threading.Thread(
+            target=self._http_server.serve_forever, name='duckling-server')
+        server_thread.daemon = True
+        server_thread.start()
+
+    def serve_forever(self):
+        """Starts loading Duckling and serves requests until shutdown()."""
+        self._loader.start()
+        self._http_server.serve_forever()
+
+    def shutdown(self):
+        """Stops serving requests and stops the workers.
+
+        Requests which are already queued are parsed first.
+        """
+        self._http_server.shutdown()
+        self._http_server.server_close()
+        for _ in self._workers:
+            self._jobs.put(_STOP)
+        for worker in self._workers:
+            worker.join()
+
+
+def main(argv=None):
+    arg_parser = argparse.ArgumentParser(
+        prog='python -m duckling.server',
+        description='Serve Duckling over HTTP from a single warm JVM.')
+    arg_parser.add_argument('--host', default='127.0.0.1')
+    arg_parser.add_argument('--port', type=int, default=8000)
+    arg_parser.add_argument('--languages', default='',
+                            help='comma-separated languages to load (default: all)')
+    arg_parser.add_argument('--wrapper', action='store_true',
+                            help='post-process results like DucklingWrapper '
+                                 '(single language, the first of --languages)')
+    arg_parser.add_argument('--workers', type=int, default=4,
+                            help='number of requests parsed at the same time (default: 4)')
+    arg_parser.add_argument('--queue-size', type=int, default=64,
+                            help='number of waiting requests before responding '
+                                 'with 503 (default: 64)')
+    arg_parser.add_argument('--maximum-heap-size', default='2048m',
+                            help='-Xmx of the JVM, or auto to size it for --languages')
+    arg_parser.add_argument('--warmup', action='store_true',
+                            help='warm up the JIT before reporting ready')
+    arg_parser.add_argument('--verbose', action='store_true', help='log every request')
+    args = arg_parser.parse_args(argv)
+
+    languages = [language for language in args.languages.split(',') if language]
+    duckling_args = {u'maximum_heap_size': args.maximum_heap_size}
+    if not args.wrapper:
+        # the server never loads other languages
+        duckling_args[u'heap_languages'] = languages
+    server = DucklingServer(
+        address=(args.host, args.port),
+        languages=languages,
+        wrapper=args.wrapper,
+        workers=args.workers,
+        queue_size=args.queue_size,
+        warmup=args.warmup,
+        verbose=args.verbose,
+        duckling_args=duckling_args)
+    sys.stderr.write('Serving Duckling on http://{host}:{port}\n'.format(
+        host=args.host, port=server.port))
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
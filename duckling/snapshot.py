@@ -0,0 +1,75 @@
+import os
+import json
+import gzip
+import hashlib
+import tempfile
+
+# bump whenever the layout of the snapshot payload changes
+FORMAT_VERSION = 1
+
+
+def fingerprint(classpath):
+    """Returns a fingerprint of the Duckling jars and the snapshot format.
+
+    Snapshots are only restored if their fingerprint matches, so upgrading
+    any bundled jar invalidates them.
+
+    Args:
+        classpath: The classpath string with the bundled jars.
+
+    Returns:
+        A dict with the snapshot format version and the SHA-1 of every jar.
+    """
+    jars = {}
+    for jar in classpath.split(os.pathsep):
+        sha1 = hashlib.sha1()
+        with open(jar, 'rb') as jar_file:
+            for chunk in iter(lambda: jar_file.read(1 << 16), b''):
+                sha1.update(chunk)
+        jars[os.path.basename(jar)] = sha1.hexdigest()
+    return {u'format': FORMAT_VERSION, u'jars': jars}
+
+
+def read(path, expected_fingerprint):
+    """Reads the payload of a snapshot file.
+
+    Args:
+        path: The path of the snapshot file.
+        expected_fingerprint: The fingerprint of the running Duckling.
+
+    Returns:
+        The payload string, or None if the file is missing, unreadable or was
+        written for other jars.
+    """
+    try:
+        with gzip.open(path, 'rb') as snapshot_file:
+            header = json.loads(snapshot_file.readline().decode('utf-8'))
+            if header != expected_fingerprint:
+                return None
+            return snapshot_file.read().decode('utf-8')
+    except (IOError, OSError, ValueError, EOFError):
+        return None
+
+
+def write(path, current_fingerprint, payload):
+    """Atomically writes a snapshot file.
+
+    Args:
+        path: The path of the snapshot file.
+        current_fingerprint: The fingerprint of the running Duckling.
+        payload: The payload string.
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    if not os.path.isdir(directory):
+        os.makedirs(directory)
+    handle, temp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+    os.close(handle)
+    try:
+        with gzip.open(temp_path, 'wb') as snapshot_file:
+            snapshot_file.write(json.dumps(current_fingerprint).encode('utf-8'))
+            snapshot_file.write(b'\n')
+            snapshot_file.write(payload.encode('utf-8'))
+        getattr(os, 'replace', os.rename)(temp_path, path)
+    except Exception:
+        os.remove(temp_path)
+        raise
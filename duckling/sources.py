@@ -0,0 +1,100 @@
+"""Rule and corpus sources of the bundled Duckling jar.
+
+Duckling's rules and corpora are Clojure files inside its jar, one per
+language and topic, e.g. languages/en/rules/time.clj. They are read without
+a JVM, e.g. to build the pre-screen triggers (duckling.prescreen) and the
+warm-up corpora (duckling.warmup).
+"""
+
+import os
+import glob
+import zipfile
+
+
+def jar_path():
+    """Returns the path of the bundled Duckling jar."""
+    return sorted(glob.glob(os.path.join(
+        os.path.dirname(os.path.abspath(__file__)), 'jars', 'duckling-*.jar')))[-1]
+
+
+def language_sources(iso_language, kind):
+    """Reads the rule or corpus files of a language from the Duckling jar.
+
+    Args:
+        iso_language: The ISO 639-1 code of the language, e.g. u'en'.
+        kind: u'rules' or u'corpus'.
+
+    Returns:
+        A list of (name, source) tuples sorted by name, name being the file
+        name without .clj, e.g. (u'time', u'(\n  "today"\n ...').
+    """
+    prefix = u'languages/{language}/{kind}/'.format(language=iso_language, kind=kind)
+    sources = []
+    with zipfile.ZipFile(jar_path()) as jar:
+        for name in sorted(jar.namelist()):
+            if name.startswith(prefix) and name.endswith(u'.clj'):
+                sources.append((name[len(prefix):-len(u'.clj')], jar.read(name).decode('utf-8')))
+    return sources
+
+
+def read_forms(source):
+    """Reads the forms of the outermost list of a rule or corpus file.
+
+    Only literals are read, everything else is skipped without evaluating it.
+
+    Args:
+        source: The content of the file.
+
+    Returns:
+        A list of (kind, value) tuples. kind is u'string', u'regex',
+        u'vector' (value: the (kind, value) tuples of its elements) or
+        u'other' (value: None).
+    """
+    forms = []
+    stack = []
+    index = 0
+    while index < len(source):
+        char = source[index]
+        if char == u';':
+            index = source.find(u'\n', index)
+            if index < 0:
+                break
+        elif char == u'\\' and stack:
+            # character literal, e.g. \space
+            index += 2
+            while index < len(source) and source[index].isalnum():
+                index += 1
+            continue
+        elif char == u'"' or source.startswith(u'#"', index):
+            regex = char == u'#'
+            end = index + (2 if regex else 1)
+            while source[end] != u'"':
+                end += 2 if source[end] == u'\\' else 1
+            literal = (u'regex' if regex else u'string',
+                       source[index + (2 if regex else 1):end])
+            if len(stack) == 1:
+                forms.append(literal)
+            elif len(stack) == 2 and stack[-1][0] == u'[':
+                stack[-1][1].append(literal)
+            index = end
+        elif char in u'([{':
+            if len(stack) == 2 and stack[-1][0] == u'[':
+                stack[-1][1].append((u'other', None))
+            stack.append((char, []))
+        elif char in u')]}':
+            opening, elements = stack.pop()
+            if len(stack) == 1:
+                forms.append((u'vector', elements) if opening == u'[' else (u'other', None))
+        elif not char.isspace() and char != u'#' and len(stack) in (1, 2):
+            # symbols, keywords and numbers
+            end = index
+            while end < len(source) and not source[end].isspace() and source[end] not in u'()[]{}";':
+                end += 1
+            if len(stack) == 1:
+                forms.append((u'other', None))
+            elif stack[-1][0] == u'[':
+                stack[-1][1].append((u'other', None))
+            index = end
+            continue
+        index += 1
+    return forms
@@ -0,0 +1,85 @@
+import itertools
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+
+_NO_ID = object()
+
+
+def stream_parse(parse_batch, inputs, reference_time='', window=256,
+                 batch_size=32, workers=1, ordered=True):
+    """Lazily parses an iterable of inputs with a bounded in-flight window.
+
+    Inputs are consumed in batches of batch_size and handed to parse_batch on
+    a thread pool. At most window inputs are read ahead of the consumer, so
+    memory stays bounded however long the iterable is.
+
+    Args:
+        parse_batch: A function taking a list of strings and a reference_time
+            keyword argument (single value or one per string) and returning
+            one result per string, e.g. Duckling.parse_batch.
+        inputs: An iterable of input strings or of (id, text) and
+            (id, text, reference_time) tuples.
+        reference_time: Optional reference time used for inputs which don't
+            specify one.
+        window: Optional maximum number of inputs in flight. Default is 256.
+        batch_size: Optional number of inputs per parse_batch call. Default
+            is 32.
+        workers: Optional number of threads calling parse_batch. Default is 1.
+        ordered: Optional parameter to yield results in input order. If
+            False, batches are yielded as soon as they complete. Default is
+            True.
+
+    Yields:
+        The result for each input string, or an (id, result) tuple for each
+        tuple input.
+    """
+    batch_size = max(1, min(batch_size, window))
+    max_batches = max(1, window // batch_size)
+    iterator = iter(inputs)
+    pending = deque()
+    exhausted = False
+    executor = ThreadPoolExecutor(max_workers=workers)
+    try:
+        while pending or not exhausted:
+            while not exhausted and len(pending) < max_batches:
+                chunk = list(itertools.islice(iterator, batch_size))
+                if not chunk:
+                    exhausted = True
+                    break
+                ids, texts, reference_times = _unpack(chunk, reference_time)
+                pending.append((executor.submit(
+                    parse_batch, texts, reference_time=reference_times), ids))
+            if not pending:
+                break
+
+            if ordered:
+                future, ids = pending.popleft()
+            else:
+                done, _ = wait([entry[0] for entry in pending],
+                               return_when=FIRST_COMPLETED)
+                future, ids = next(entry for entry in pending if entry[0] in done)
+                pending.remove((future, ids))
+            for input_id, result in zip(ids, future.result()):
+                yield result if input_id is _NO_ID else (input_id, result)
+    finally:
+        for future, _ in pending:
+            future.cancel()
+        executor.shutdown(wait=True)
+
+
+def _unpack(chunk, default_reference_time):
+    ids = []
+    texts = []
+    reference_times = []
+    for item in chunk:
+        if isinstance(item, tuple):
+            ids.append(item[0])
+            texts.append(item[1])
+            reference_times.append(
+                item[2] if len(item) > 2 and item[2] not in (None, '')
+                else default_reference_time)
+        else:
+            ids.append(_NO_ID)
+            texts.append(item)
+            reference_times.append(default_reference_time)
+    return ids, texts, reference_times
@@ -0,0 +1,21 @@
+from duckling import bench
+
+
+def test_percentiles():
+    result = bench.percentiles([i / 1000.0 for i in range(1, 101)])
+    assert result[u'count'] == 100
+    assert result[u'p50_ms'] == 51.0
+    assert result[u'p99_ms'] == 100.0
+    assert result[u'max_ms'] == 100.0
+
+
+def test_pad():
+    assert len(bench.pad(u'2pm', 100)) >= 100
+    assert bench.pad(u'2pm', 0) == u'2pm'
+
+
+def test_compare():
+    baseline = {u'results': {u'startup': {u'jvm_start_s': 1.0, u'require_s': 2.0}}}
+    results = {u'results': {u'startup': {u'jvm_start_s': 1.1, u'require_s': 3.0}}}
+    assert bench.compare(results, baseline, tolerance=0.2) == [
+        (u'startup.require_s', 2.0, 3.0)]
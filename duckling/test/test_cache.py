@@ -0,0 +1,74 @@
+import time
+import pytest
+from duckling import ResultCache, Dim, Language
+
+
+@pytest.fixture
+def cache():
+    return ResultCache(max_entries=2)
+
+
+def test_get_put(cache):
+    key, expires = cache.key(u'42', Language.ENGLISH, [Dim.NUMBER], '')
+    assert expires is None
+    assert cache.get(key) is None
+    cache.put(key, [], expires)
+    assert cache.get(key) == []
+    assert cache.hits == 1
+    assert cache.misses == 1
+
+
+def test_lru_eviction(cache):
+    keys = [cache.key(text, Language.ENGLISH, [Dim.NUMBER], '')[0]
+            for text in (u'1', u'2', u'3')]
+    cache.put(keys[0], [1])
+    cache.put(keys[1], [2])
+    assert cache.get(keys[0]) == [1]
+    cache.put(keys[2], [3])
+
+    assert len(cache) == 2
+    assert cache.evictions == 1
+    assert cache.get(keys[1]) is None
+    assert cache.get(keys[0]) == [1]
+
+
+def test_max_bytes():
+    cache = ResultCache(max_entries=None, max_bytes=1024)
+    for i in range(100):
+        cache.put(i, [{u'dim': u'number', u'value': {u'value': float(i)}}])
+    assert cache.stats()[u'bytes'] <= 1024
+    assert cache.evictions > 0
+
+
+def test_time_bucket():
+    cache = ResultCache(time_bucket=ResultCache.DAY)
+    key, expires = cache.key(u'tomorrow', Language.ENGLISH, [Dim.TIME], '')
+    assert time.time() < expires <= time.time() + ResultCache.DAY
+    assert key == cache.key(u'tomorrow', Language.ENGLISH, [Dim.TIME], '')[0]
+
+    _, expires = cache.key(u'tomorrow', Language.ENGLISH, [], '')
+    assert expires is not None
+    _, expires = cache.key(u'tomorrow', Language.ENGLISH, [Dim.TIME], '1990-12-30')
+    assert expires is None
+
+
+def test_expiration(cache):
+    cache.put(u'key', [], time.time() - 1)
+    assert cache.get(u'key') is None
+    assert cache.expirations == 1
+    assert len(cache) == 0
+
+
+def test_key_options():
+    cache = ResultCache()
+    key = cache.key(u'42', Language.ENGLISH, [Dim.NUMBER], '', (False, False, False))[0]
+    assert key != cache.key(u'42', Language.ENGLISH, [Dim.NUMBER], '', (True, False, False))[0]
+    assert key == cache.key(u'42', Language.ENGLISH, [Dim.NUMBER], '', (False, False, False))[0]
+
+
+def test_key_epoch_zero_reference_time():
+    cache = ResultCache()
+    key, expires = cache.key(u'tomorrow', Language.ENGLISH, [Dim.TIME], 0)
+    assert expires is None
+    assert key != cache.key(u'tomorrow', Language.ENGLISH, [Dim.TIME], '')[0]
+    assert cache.key(u'tomorrow', Language.ENGLISH, [Dim.TIME], None)[1] is not None
@@ -0,0 +1,41 @@
+import json
+import pytest
+from duckling import cds
+
+
+@pytest.fixture
+def jvm_path(tmpdir):
+    path = tmpdir.join('libjvm.so')
+    path.write('jvm')
+    return str(path)
+
+
+@pytest.fixture
+def archive_path(tmpdir, jvm_path):
+    path = tmpdir.join('duckling.jsa')
+    path.write('archive')
+    tmpdir.join('duckling.jsa.json').write(
+        json.dumps(cds._fingerprint(jvm_path, 'a.jar:b.jar')))
+    return str(path)
+
+
+def test_jvm_options(archive_path, jvm_path):
+    options = cds.jvm_options('a.jar:b.jar', archive_path, jvm_path)
+    assert '-XX:SharedArchiveFile={path}'.format(path=archive_path) in options
+    assert '-Xshare:auto' in options
+
+
+def test_jvm_options_outdated(archive_path, jvm_path):
+    assert cds.jvm_options('a.jar', archive_path, jvm_path) == []
+    with open(jvm_path, 'w') as jvm:
+        jvm.write('another jvm')
+    assert cds.jvm_options('a.jar:b.jar', archive_path, jvm_path) == []
+
+
+def test_jvm_options_missing(tmpdir, jvm_path):
+    assert cds.jvm_options('a.jar:b.jar', str(tmpdir.join('missing.jsa')), jvm_path) == []
+
+
+def test_remove(archive_path, jvm_path):
+    cds.remove(archive_path)
+    assert cds.jvm_options('a.jar:b.jar', archive_path, jvm_path) == []
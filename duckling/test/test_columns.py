@@ -0,0 +1,29 @@
+from array import array
+import pytest
+from duckling import Dim
+from duckling.columns import to_columns
+
+
+def test_dim_codes():
+    assert Dim.from_code(Dim.code(Dim.TIME)) == Dim.TIME
+    assert Dim.code(u'unknown') == -1
+    assert Dim.from_code(-1) is None
+
+
+def test_to_columns():
+    numpy = pytest.importorskip('numpy')
+    nat = -2 ** 63
+    columns = to_columns([
+        array('i', [0, 0, 1]),
+        array('i', [0, 10, 3]),
+        array('i', [3, 12, 5]),
+        array('i', [Dim.code(Dim.TIME), Dim.code(Dim.NUMBER), Dim.code(Dim.EMAIL)]),
+        array('d', [float('nan'), 42.0, float('nan')]),
+        array('q', [1360650600000, nat, nat])
+    ])
+
+    assert list(columns[u'input_index']) == [0, 0, 1]
+    assert list(columns[u'end'] - columns[u'start']) == [3, 2, 2]
+    assert columns[u'value'][1] == 42.0
+    assert columns[u'time'][0] == numpy.datetime64('2013-02-12T06:30:00.000')
+    assert numpy.isnat(columns[u'time'][1])
@@ -2,8 +2,9 @@ import pytest
 import jpype
 from datetime import datetime, timedelta
 from dateutil import parser
-from dateutil.tz import tzlocal
-from duckling import Duckling, Dim, Language
+from dateutil.tz import tzlocal, tzutc
+from duckling import Duckling, Dim, Entity, Language, ResultCache
+from duckling import snapshot
 
 
 @pytest.fixture
@@ -138,6 +139,23 @@ def test_parse_with_reference_time(duckling_loaded, test_time_input, dec_30):
         result[0][u'value'][u'values'][0][u'value']).date()
 
 
+def test_parse_with_reference_datetime_and_epoch(duckling_loaded, test_time_input):
+    expected = duckling_loaded.parse(
+        test_time_input, dim_filter=Dim.TIME, reference_time=u'2013-02-12T04:30:00+00:00')
+    reference_datetime = datetime(2013, 2, 12, 4, 30, tzinfo=tzutc())
+
+    assert duckling_loaded.parse(
+        test_time_input, dim_filter=Dim.TIME, reference_time=reference_datetime) == expected
+    assert duckling_loaded.parse(
+        test_time_input, dim_filter=Dim.TIME, reference_time=1360643400) == expected
+
+
+def test_parse_with_reference_time_minute_offset(duckling_loaded):
+    result = duckling_loaded.parse(
+        u'today at 9pm', dim_filter=Dim.TIME, reference_time=u'2013-02-12T04:30:00+05:30')
+    assert result[0][u'value'][u'value'].endswith(u'+05:30')
+
+
 def test_parse_with_filter(duckling_loaded, test_input, two_pm):
     result = duckling_loaded.parse(test_input, dim_filter=Dim.TIME)
 
@@ -387,3 +405,317 @@ def test_multiple_dims(duckling_loaded):
     assert len(result) == 2
     assert result[0][u'value']['value'] == float(test_input)
     assert result[1][u'value']['value'] == float(test_input)
+
+
+def test_parse_batch(duckling_loaded):
+    result = duckling_loaded.parse_batch(
+        ['42 degrees', 'forty-two', '42 degrees'], dim_filter=Dim.TEMPERATURE)
+
+    assert len(result) == 3
+    assert len(result[0]) == 1
+    assert result[0][0][u'value']['value'] == 42
+    assert result[1] == []
+    assert result[2] is result[0]
+
+
+def test_parse_batch_with_reference_times(duckling_loaded, test_time_input, dec_30):
+    result = duckling_loaded.parse_batch(
+        [test_time_input, test_time_input],
+        language=[Language.ENGLISH, 'en'],
+        dim_filter=Dim.TIME,
+        reference_time=[dec_30, ''])
+
+    assert len(result) == 2
+    assert parser.parse(u'1990-12-30').date() + timedelta(days=1) == parser.parse(
+        result[0][0][u'value'][u'values'][0][u'value']).date()
+    assert datetime.now().date() + timedelta(days=1) == parser.parse(
+        result[1][0][u'value'][u'values'][0][u'value']).date()
+
+
+def test_parse_batch_length_mismatch(duckling_loaded):
+    with pytest.raises(ValueError):
+        duckling_loaded.parse_batch(['2pm', '3pm'], reference_time=['1990-12-30'])
+
+
+def test_prepare(duckling_loaded, test_time_input, dec_30):
+    parse = duckling_loaded.prepare(
+        Language.ENGLISH, dim_filter=Dim.TIME, reference_time=dec_30)
+
+    result = parse(test_time_input)
+    assert result == duckling_loaded.parse(
+        test_time_input, dim_filter=Dim.TIME, reference_time=dec_30)
+    assert parser.parse(u'1990-12-30').date() + timedelta(days=1) == parser.parse(
+        result[0][u'value'][u'values'][0][u'value']).date()
+
+
+def test_prepare_not_load():
+    duckling = Duckling()
+    with pytest.raises(RuntimeError):
+        duckling.prepare()
+
+
+def test_parse_with_cache(duckling_loaded, test_input):
+    duckling_loaded.cache = ResultCache()
+
+    result = duckling_loaded.parse(test_input, dim_filter=Dim.NUMBER)
+    assert duckling_loaded.parse(test_input, dim_filter=Dim.NUMBER) is result
+    assert duckling_loaded.cache.hits == 1
+    assert duckling_loaded.cache.misses == 1
+    duckling_loaded.cache = None
+
+
+def test_parse_with_json_transport(duckling_loaded, test_input, dec_30):
+    expected = duckling_loaded.parse(test_input, reference_time=dec_30)
+    expected_batch = duckling_loaded.parse_batch(
+        [test_input, '42 days'], reference_time=dec_30)
+    duckling_loaded.json_transport = True
+
+    assert duckling_loaded.parse(test_input, reference_time=dec_30) == expected
+    assert duckling_loaded.parse_batch(
+        [test_input, '42 days'], reference_time=dec_30) == expected_batch
+    duckling_loaded.json_transport = False
+
+
+@pytest.mark.parametrize('dim', Dim.CODES)
+@pytest.mark.parametrize('parse_datetime', [False, True])
+def test_json_transport_parity(duckling_loaded, dec_30, dim, parse_datetime):
+    input_str = (u'from 9am to 11am tomorrow, at 3pm pdt, 42 degrees, 3 cups of '
+                 u'sugar, 5 miles, 2 liters, $20, 2 hours, the 2nd, coming week, '
+                 u'contact@frank-blechschmidt.com, github.com/FraBle, '
+                 u'(650)-424-4242, 1 second')
+    duckling_loaded.parse_datetime = parse_datetime
+    try:
+        expected = duckling_loaded.parse(input_str, dim_filter=dim, reference_time=dec_30)
+        duckling_loaded.json_transport = True
+        result = duckling_loaded.parse(input_str, dim_filter=dim, reference_time=dec_30)
+    finally:
+        duckling_loaded.json_transport = False
+        duckling_loaded.parse_datetime = False
+
+    assert result == expected
+
+
+def test_decode_result(duckling):
+    result = duckling._decode_result(
+        u'[{"dim":"duration","body":"42 days","value":{"day":42,"value":42,"unit":"day",'
+        u'"normalized":{"value":3628800,"unit":"second"}},"start":0,"end":7}]')
+
+    assert result == [{
+        u'dim': u'duration', u'body': u'42 days', u'start': 0, u'end': 7,
+        u'value': {u'day': 42, u'value': 42.0, u'unit': u'day',
+                   u'normalized': {u'value': 3628800.0, u'unit': u'second'}}}]
+    assert isinstance(result[0][u'value'][u'value'], float)
+
+
+def test_parse_stream(duckling_loaded, dec_30):
+    inputs = (('id{number}'.format(number=number), '{number} degrees'.format(number=number), dec_30)
+              for number in range(10))
+    result = list(duckling_loaded.parse_stream(
+        inputs, dim_filter=Dim.TEMPERATURE, window=4, batch_size=2))
+
+    assert [input_id for input_id, _ in result] == ['id{number}'.format(number=number)
+                                                    for number in range(10)]
+    assert [entries[0][u'value'][u'value'] for _, entries in result] == list(range(10))
+
+
+def test_load_languages():
+    duckling = Duckling(jvm_started=True)
+    duckling.load([Language.ENGLISH])
+    assert Language.ENGLISH in duckling._loaded_languages
+
+    duckling.load(['en', Language.GERMAN])
+    assert {Language.ENGLISH, Language.GERMAN} <= duckling._loaded_languages
+    assert len(duckling.parse('42 degrees', dim_filter=Dim.TEMPERATURE)) == 1
+
+
+def test_lazy_load():
+    duckling = Duckling(jvm_started=True, lazy_load=True)
+    result = duckling.parse('zwei und vierzig', language=Language.GERMAN, dim_filter=Dim.NUMBER)
+
+    assert duckling._is_loaded is True
+    assert Language.GERMAN in duckling._loaded_languages
+    assert len(result) == 1
+    assert result[0][u'value'][u'value'] == 42
+
+
+def test_load_with_snapshot(tmpdir):
+    snapshot_path = str(tmpdir.join('duckling.snapshot'))
+    duckling = Duckling(jvm_started=True)
+    duckling.load([Language.ENGLISH], snapshot_path=snapshot_path)
+    assert tmpdir.join('duckling.snapshot').check()
+
+    # forget the loaded rules, so English has to be restored from the snapshot
+    clojure = jpype.JClass('clojure.java.api.Clojure')
+    clojure_reset = clojure.var('clojure.core', 'reset!')
+    rules_map = clojure.var('duckling.core', 'rules-map').deref()
+    loaded_rules = rules_map.deref()
+    clojure_reset.invoke(rules_map, clojure.read('{}'))
+    try:
+        duckling.load([Language.ENGLISH], snapshot_path=snapshot_path)
+
+        assert Language.ENGLISH in duckling._loaded_languages
+        assert len(duckling.parse('42 degrees', dim_filter=Dim.TEMPERATURE)) == 1
+    finally:
+        clojure_reset.invoke(rules_map, loaded_rules)
+
+
+def test_load_with_snapshot_keeps_other_languages(tmpdir):
+    snapshot_path = str(tmpdir.join('duckling.snapshot'))
+    duckling = Duckling(jvm_started=True)
+    # a snapshot written by another process, with a module not loaded here
+    snapshot.write(snapshot_path, duckling._snapshot_fingerprint(), u'{:xx$core {}}')
+    duckling.load([Language.ENGLISH], snapshot_path=snapshot_path)
+
+    payload = snapshot.read(snapshot_path, duckling._snapshot_fingerprint())
+    assert u':xx$core' in payload
+    assert u':en$core' in payload
+
+
+def test_parse_with_instrumentation(duckling_loaded, test_input):
+    records = []
+    duckling_loaded.parse_datetime = True
+    with duckling_loaded.instrumentation.hook(records.append):
+        result = duckling_loaded.parse(test_input, dim_filter=Dim.TIME)
+    duckling_loaded.parse_datetime = False
+
+    assert len(records) == 1
+    assert records[0].entity_count == len(result)
+    assert records[0].input_length == len(test_input)
+    assert {u'attach', u'engine', u'conversion', u'datetime', u'total'} <= set(records[0].timings)
+
+
+def test_parse_batch_with_instrumentation(duckling_loaded, test_input):
+    records = []
+    with duckling_loaded.instrumentation.hook(records.append):
+        results = duckling_loaded.parse_batch([test_input, u'42 degrees'])
+
+    assert len(records) == 1
+    assert records[0].input_count == 2
+    assert records[0].input_length == len(test_input) + len(u'42 degrees')
+    assert records[0].entity_count == sum(len(result) for result in results)
+    assert {u'attach', u'engine', u'conversion', u'total'} <= set(records[0].timings)
+
+
+def test_prepare_with_instrumentation(duckling_loaded, test_input):
+    parse = duckling_loaded.prepare(dim_filter=Dim.TIME)
+    records = []
+    with duckling_loaded.instrumentation.hook(records.append):
+        result = parse(test_input)
+
+    assert len(records) == 1
+    assert records[0].input_count is None
+    assert records[0].entity_count == len(result)
+    assert {u'attach', u'engine', u'conversion', u'total'} <= set(records[0].timings)
+
+
+def test_parse_concurrently(duckling_loaded, dec_30):
+    from concurrent.futures import ThreadPoolExecutor
+    duckling = Duckling(jvm_started=True, max_concurrency=2)
+    duckling.load([Language.ENGLISH])
+    inputs = [dec_30, u'42 degrees', u'two hours'] * 20
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        results = list(executor.map(duckling.parse, inputs))
+
+    assert results == [duckling.parse(input_str) for input_str in inputs]
+
+
+def test_parse_compact_results(duckling_loaded, dec_30):
+    result = duckling_loaded.parse(dec_30)
+    duckling_loaded.compact_results = True
+    try:
+        compact_result = duckling_loaded.parse(dec_30)
+        compact_batch = duckling_loaded.parse_batch([dec_30])
+    finally:
+        duckling_loaded.compact_results = False
+
+    assert all(isinstance(entity, Entity) for entity in compact_result)
+    assert [entity.to_dict() for entity in compact_result] == result
+    assert compact_batch == [compact_result]
+
+
+def test_parse_columns(duckling_loaded):
+    numpy = pytest.importorskip('numpy')
+    columns = duckling_loaded.parse_columns(
+        [u'42 degrees', u'nothing here', u'tomorrow at 2pm'],
+        dim_filter=[Dim.TEMPERATURE, Dim.TIME],
+        reference_time=u'2013-02-12T04:30:00-02:00')
+
+    assert list(columns[u'input_index']) == [0, 2]
+    assert [Dim.from_code(code) for code in columns[u'dim']] == [Dim.TEMPERATURE, Dim.TIME]
+    assert columns[u'value'][0] == 42.0
+    assert numpy.isnat(columns[u'time'][0])
+    assert columns[u'time'][1] == numpy.datetime64('2013-02-13T16:00:00.000')
+
+
+def test_parse_document(duckling_loaded):
+    document = u' '.join(u'It is {number} degrees outside.'.format(number=number)
+                         for number in range(30))
+    result = duckling_loaded.parse_document(
+        document, dim_filter=Dim.TEMPERATURE, max_segment_length=200, overlap=50)
+
+    assert [entry[u'value'][u'value'] for entry in result] == [float(number) for number in range(30)]
+    assert all(document[entry[u'start']:entry[u'end']] == entry[u'body'] for entry in result)
+
+
+def test_parse_with_prescreen(duckling_loaded, test_input, dec_30):
+    inputs = [test_input, u'ok thanks', u'42 degrees']
+    expected = duckling_loaded.parse_batch(inputs, reference_time=dec_30)
+    duckling_loaded.prescreen = True
+    try:
+        assert duckling_loaded.parse(u'ok thanks') == []
+        assert duckling_loaded.parse_batch(inputs, reference_time=dec_30) == expected
+    finally:
+        duckling_loaded.prescreen = False
+
+
+def test_parse_multilingual():
+    duckling = Duckling(jvm_started=True, lazy_load=True)
+    result = duckling.parse_multilingual(
+        u'zwei und vierzig', [Language.ENGLISH, 'de'], dim_filter=Dim.NUMBER)
+
+    assert list(result) == [Language.ENGLISH, Language.GERMAN]
+    assert result[Language.GERMAN][0][u'value'][u'value'] == 42.0
+    assert result == duckling.parse(
+        u'zwei und vierzig', language=[Language.ENGLISH, Language.GERMAN], dim_filter=Dim.NUMBER)
+
+
+def test_parse_batch_with_mixed_languages():
+    duckling = Duckling(jvm_started=True, lazy_load=True)
+    inputs = [u'42 degrees', u'zwei und vierzig', u'forty two']
+    languages = [Language.ENGLISH, Language.GERMAN, Language.ENGLISH]
+    result = duckling.parse_batch(inputs, languages, dim_filter=Dim.NUMBER)
+
+    assert result == [duckling.parse(input_str, input_language, dim_filter=Dim.NUMBER)
+                      for input_str, input_language in zip(inputs, languages)]
+
+
+def test_memory_stats(duckling_loaded):
+    stats = duckling_loaded.memory_stats()
+
+    assert 0 < stats[u'heap'][u'used'] <= stats[u'heap'][u'committed']
+    assert stats[u'pools']
+    assert all(pool[u'type'] in (u'HEAP', u'NON_HEAP') for pool in stats[u'pools'].values())
+    assert all(collector[u'count'] >= 0 for collector in stats[u'gc'].values())
+
+
+def test_auto_heap_size_with_started_jvm():
+    # a running JVM can't be resized, Duckling is ready right away
+    duckling = Duckling(jvm_started=True, maximum_heap_size='auto')
+    assert duckling.maximum_heap_size == 'auto'
+    assert duckling.clojure is not None
+
+
+def test_warmup(duckling_loaded):
+    report = duckling_loaded.warmup(
+        languages=[Language.ENGLISH], dims=Dim.NUMBER, iterations=5)
+
+    assert list(report) == [Language.ENGLISH]
+    assert 1 <= report[Language.ENGLISH][u'rounds'] <= 5
+    assert report[Language.ENGLISH][u'first_ms'] > 0
+
+
+def test_warmup_with_corpus(duckling_loaded):
+    report = duckling_loaded.warmup(
+        languages=['en'], corpus={'en': [u'42 degrees', u'tomorrow']}, iterations=3)
+    assert report[Language.ENGLISH][u'rounds'] <= 3
@@ -0,0 +1,92 @@
+import asyncio
+import pytest
+from duckling import AsyncDuckling, AsyncDucklingWrapper, Dim, Duckling, DucklingWrapper, Language
+
+
+@pytest.fixture(scope='module')
+def async_duckling():
+    async_duckling = AsyncDuckling()
+    asyncio.run(async_duckling.load())
+    yield async_duckling
+    async_duckling.close()
+
+
+@pytest.fixture(scope='module')
+def async_duckling_wrapper():
+    async_duckling_wrapper = AsyncDucklingWrapper(jvm_started=True)
+    yield async_duckling_wrapper
+    async_duckling_wrapper.close()
+
+
+def test_parse(async_duckling):
+    result = asyncio.run(async_duckling.parse('42 degrees', dim_filter=Dim.TEMPERATURE))
+    assert len(result) == 1
+    assert result[0][u'value'][u'value'] == 42
+
+
+def test_parse_concurrently(async_duckling):
+    async def parse_all():
+        return await asyncio.gather(*[
+            async_duckling.parse('{number} degrees'.format(number=number),
+                                 dim_filter=Dim.TEMPERATURE)
+            for number in range(10)])
+
+    result = asyncio.run(parse_all())
+    assert [entries[0][u'value'][u'value'] for entries in result] == list(range(10))
+
+
+def test_parse_timeout(async_duckling):
+    with pytest.raises(asyncio.TimeoutError):
+        asyncio.run(async_duckling.parse('42 degrees', timeout=0))
+
+
+def test_wrapper_parse_time(async_duckling_wrapper):
+    result = asyncio.run(async_duckling_wrapper.parse_time(u'Let\'s meet at 11:45am'))
+    assert len(result) == 1
+
+
+def test_parse_methods():
+    for async_cls, cls in ((AsyncDuckling, Duckling), (AsyncDucklingWrapper, DucklingWrapper)):
+        for name in dir(cls):
+            if name.startswith('parse'):
+                assert async_cls.__dict__[name].__doc__.splitlines()[0].endswith(
+                    'version of {cls}.{name}().'.format(cls=cls.__name__, name=name))
+
+
+def test_parse_multilingual(async_duckling):
+    result = asyncio.run(async_duckling.parse_multilingual(
+        u'42', [Language.ENGLISH, Language.GERMAN], dim_filter=Dim.NUMBER))
+    assert list(result) == [Language.ENGLISH, Language.GERMAN]
+
+
+def test_parse_document(async_duckling):
+    result = asyncio.run(async_duckling.parse_document(
+        u'It is 42 degrees outside.', dim_filter=Dim.TEMPERATURE))
+    assert result[0][u'value'][u'value'] == 42
+
+
+def test_parse_columns(async_duckling):
+    pytest.importorskip('numpy')
+    columns = asyncio.run(async_duckling.parse_columns(
+        [u'42 degrees', u'nothing'], dim_filter=Dim.TEMPERATURE))
+    assert list(columns[u'input_index']) == [0]
+
+
+def test_parse_stream(async_duckling):
+    async def parse_all():
+        return [result async for result in async_duckling.parse_stream(
+            iter([u'{number} degrees'.format(number=number) for number in range(10)]),
+            dim_filter=Dim.TEMPERATURE, batch_size=3)]
+
+    result = asyncio.run(parse_all())
+    assert [entries[0][u'value'][u'value'] for entries in result] == list(range(10))
+
+
+def test_wrapper_parse_stream(async_duckling_wrapper):
+    async def parse_all():
+        return [result async for result in async_duckling_wrapper.parse_stream(
+            [u'Let\'s meet at 11:45am', u'nothing'], dims=[Dim.TIME])]
+
+    result = asyncio.run(parse_all())
+    assert len(result) == 2
+    assert result[1] == []
@@ -0,0 +1,34 @@
+import pytest
+from duckling import DucklingPool, Dim, Language
+
+
+@pytest.fixture(scope='module')
+def duckling_pool():
+    pool = DucklingPool(processes=2, languages=[Language.ENGLISH])
+    yield pool
+    pool.shutdown()
+
+
+def test_parse(duckling_pool):
+    result = duckling_pool.parse('42 degrees', dim_filter=Dim.TEMPERATURE)
+    assert len(result) == 1
+    assert result[0][u'value'][u'value'] == 42
+
+
+def test_parse_batch(duckling_pool):
+    inputs = ['{number} degrees'.format(number=number) for number in range(10)]
+    result = duckling_pool.parse_batch(
+        inputs, dim_filter=Dim.TEMPERATURE, chunk_size=3)
+    assert len(result) == 10
+    assert [entries[0][u'value'][u'value'] for entries in result] == list(range(10))
+
+
+def test_submit(duckling_pool):
+    future = duckling_pool.submit('42 degrees', dim_filter=Dim.TEMPERATURE)
+    assert len(future.result()) == 1
+
+
+def test_worker_exception(duckling_pool):
+    future = duckling_pool.submit('42 degrees', language='xx')
+    with pytest.raises(ValueError):
+        future.result()
@@ -114,6 +114,89 @@ def test_parse_times_with_datetime(duckling_wrapper_with_datetime):
     assert time(11, 45) == result[1][u'value'][u'value'].time()
 
 
+def test_parse_with_dims(duckling_wrapper):
+    result = duckling_wrapper.parse(
+        u'You owe me twenty bucks, please call me today',
+        dims=[Dim.TIME, Dim.AMOUNTOFMONEY])
+    assert {Dim.TIME, Dim.AMOUNTOFMONEY} == set(entry[u'dim'] for entry in result)
+    assert [entry for entry in result if entry[u'dim'] == Dim.AMOUNTOFMONEY] == \
+        duckling_wrapper.parse_money(u'You owe me twenty bucks, please call me today')
+
+
+def test_parse_document(duckling_wrapper):
+    document = u'I commute 5 miles everyday.\n' * 20
+    result = duckling_wrapper.parse_document(
+        document, dims=[Dim.DISTANCE], max_segment_length=100, overlap=20)
+    assert len(result) == 20
+    assert all(document[entry[u'start']:entry[u'end']] == entry[u'text'] for entry in result)
+
+
+def test_parse_batch(duckling_wrapper):
+    result = duckling_wrapper.parse_batch(
+        [u'Let\'s meet at 11:45am', u'I commute 5 miles everyday'],
+        dims=[Dim.TIME])
+    assert len(result) == 2
+    assert len(result[0]) == 1
+    assert time(11, 45) == parser.parse(result[0][0][u'value'][u'value']).time()
+    assert result[1] == []
+
+
+def test_parse_batch_per_dim(duckling_wrapper):
+    inputs = [u'I commute 5 miles everyday', u'Let\'s meet at 11:45am']
+    assert duckling_wrapper.parse_distance_batch(inputs) == [
+        duckling_wrapper.parse_distance(input_str) for input_str in inputs]
+    assert duckling_wrapper.parse_time_batch(inputs, reference_time=u'1990-12-30') == [
+        duckling_wrapper.parse_time(input_str, reference_time=u'1990-12-30')
+        for input_str in inputs]
+
+
+def test_batch_methods():
+    per_dim_methods = [name for name in dir(DucklingWrapper) if name.startswith('parse_')
+                       and not name.endswith('_batch')
+                       and name not in ('parse_document', 'parse_stream')]
+    assert all(hasattr(DucklingWrapper, name + '_batch') for name in per_dim_methods)
+
+
+def test_parse_stream(duckling_wrapper):
+    result = list(duckling_wrapper.parse_stream(
+        iter([u'Let\'s meet at 11:45am', u'I commute 5 miles everyday']),
+        dims=[Dim.TIME], window=1))
+    assert len(result) == 2
+    assert time(11, 45) == parser.parse(result[0][0][u'value'][u'value']).time()
+    assert result[1] == []
+
+
+def test_parse_with_instrumentation(duckling_wrapper):
+    records = []
+    with duckling_wrapper.duckling.instrumentation.hook(records.append):
+        result = duckling_wrapper.parse_time(u'Let\'s meet at 11:45am')
+    assert len(records) == 1
+    assert records[0].entity_count == len(result)
+    assert u'postprocessing' in records[0].timings
+
+
+def test_parse_batch_with_instrumentation(duckling_wrapper):
+    records = []
+    with duckling_wrapper.duckling.instrumentation.hook(records.append):
+        result = duckling_wrapper.parse_time_batch([u'Let\'s meet at 11:45am', u'no time'])
+    assert len(records) == 1
+    assert records[0].input_count == 2
+    assert records[0].entity_count == sum(len(entities) for entities in result)
+    assert u'postprocessing' in records[0].timings
+
+
+def test_parse_compact_results(duckling_wrapper):
+    result = duckling_wrapper.parse_distance(u'I commute 5 miles everyday')
+    duckling_wrapper.compact_results = True
+    try:
+        compact_result = duckling_wrapper.parse_distance(u'I commute 5 miles everyday')
+    finally:
+        duckling_wrapper.compact_results = False
+    assert len(compact_result) == 1
+    assert u'5 miles' == compact_result[0].text
+    assert [entity.to_dict() for entity in compact_result] == result
+
+
 def test_parse_timezone(duckling_wrapper):
     result = duckling_wrapper.parse_timezone(
         u'my timezone is pdt')
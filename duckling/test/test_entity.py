@@ -0,0 +1,43 @@
+import pickle
+from duckling import Dim, Entity, WrapperEntity
+
+
+def test_round_trip():
+    entry = {
+        u'dim': Dim.TIME,
+        u'body': u'2pm',
+        u'start': 0,
+        u'end': 3,
+        u'latent': False,
+        u'value': {u'type': u'value', u'grain': u'hour', u'value': u'2013-02-12T14:00:00.000-02:00'}
+    }
+    entity = Entity.from_dict(entry)
+
+    assert entity.dim == Dim.TIME
+    assert entity.text == u'2pm'
+    assert entity.to_dict() == entry
+    assert not hasattr(entity, '__dict__')
+
+
+def test_wrapper_entity_uses_text_key():
+    entry = {u'dim': Dim.NUMBER, u'text': u'42', u'start': 0, u'end': 2,
+             u'value': {u'value': 42.0}}
+    entity = WrapperEntity.from_dict(entry)
+
+    assert entity.text == u'42'
+    assert entity.to_dict() == entry
+
+
+def test_strings_are_shared():
+    first = Entity(u''.join([u'ti', u'me']), 0, 3, u'2pm',
+                   {u'grain': u''.join([u'ho', u'ur']), u'values': [{u'grain': u'day'}]})
+    second = Entity(u''.join([u'tim', u'e']), 4, 7, u'3pm',
+                    {u'grain': u''.join([u'hou', u'r']), u'values': [{u'grain': u'day'}]})
+
+    assert first.dim is second.dim
+    assert first.value[u'grain'] is second.value[u'grain']
+
+
+def test_pickle():
+    entity = Entity(Dim.NUMBER, 0, 2, u'42', {u'value': 42.0}, False)
+    assert pickle.loads(pickle.dumps(entity)) == entity
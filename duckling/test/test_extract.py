@@ -0,0 +1,81 @@
+import csv
+import json
+import pytest
+from duckling import extract
+
+
+def fake_parse_batch(inputs, reference_time=''):
+    return [[{u'dim': u'number', u'start': 0, u'end': len(text), u'body': text,
+              u'value': {u'value': len(text)}}] if text else [] for text in inputs]
+
+
+@pytest.fixture
+def corpus(tmpdir):
+    path = tmpdir.join('corpus.jsonl')
+    path.write(u''.join(json.dumps({u'id': u'r{i}'.format(i=i), u'text': u'x' * i}) + u'\n'
+                        for i in range(100)))
+    return str(path)
+
+
+def read_jsonl(path):
+    with open(path) as out_file:
+        return [json.loads(line) for line in out_file]
+
+
+def test_read_records(tmpdir):
+    path = tmpdir.join('corpus.csv')
+    path.write_text(u'id,text\n1,"two\nlines"\n2,\xfcber\n', 'utf-8')
+    records = list(extract.read_records(str(path), id_field=u'id'))
+
+    assert [(record_id, text) for _, record_id, text in records] == [
+        (u'1', u'two\nlines'), (u'2', u'\xfcber')]
+    resumed = list(extract.read_records(str(path), id_field=u'id', offset=records[0][0]))
+    assert resumed == records[1:]
+
+
+def test_extract_jsonl(corpus, tmpdir):
+    out_path = str(tmpdir.join('entities.jsonl'))
+    summary = extract.extract(fake_parse_batch, corpus, out_path, id_field=u'id',
+                              batch_size=7, workers=3)
+    lines = read_jsonl(out_path)
+
+    assert summary[u'records'] == 100
+    assert summary[u'entities'] == 99
+    assert [line[u'record'] for line in lines] == list(range(100))
+    assert lines[42][u'id'] == u'r42'
+    assert lines[42][u'entities'][0][u'value'] == {u'value': 42}
+    assert not tmpdir.join('entities.jsonl.checkpoint').exists()
+
+
+def test_extract_csv_output(corpus, tmpdir):
+    out_path = str(tmpdir.join('entities.csv'))
+    extract.extract(fake_parse_batch, corpus, out_path)
+    with open(out_path) as out_file:
+        rows = list(csv.reader(out_file))
+
+    assert len(rows) == 100
+    assert rows[0] == list(extract.CSV_FIELDS)
+    assert rows[1] == [u'1', u'', u'number', u'0', u'1', u'x', u'{"value": 1}']
+
+
+def test_extract_resume(corpus, tmpdir):
+    out_path = str(tmpdir.join('entities.jsonl'))
+    expected_path = str(tmpdir.join('expected.jsonl'))
+    extract.extract(fake_parse_batch, corpus, expected_path)
+
+    parsed = []
+
+    def failing_parse_batch(inputs, reference_time=''):
+        if len(parsed) >= 50:
+            raise RuntimeError('interrupted')
+        parsed.extend(inputs)
+        return fake_parse_batch(inputs, reference_time)
+
+    with pytest.raises(RuntimeError):
+        extract.extract(failing_parse_batch, corpus, out_path, batch_size=10,
+                        checkpoint_every=20)
+    assert tmpdir.join('entities.jsonl.checkpoint').exists()
+
+    summary = extract.extract(fake_parse_batch, corpus, out_path, batch_size=10)
+    assert summary[u'first_record'] == 40
+    assert read_jsonl(out_path) == read_jsonl(expected_path)
@@ -0,0 +1,57 @@
+from duckling import Instrumentation
+
+
+def test_disabled():
+    instrumentation = Instrumentation()
+    assert not instrumentation.hooks
+    assert instrumentation.current() is None
+
+
+def test_hook():
+    instrumentation = Instrumentation()
+    records = []
+    with instrumentation.hook(records.append):
+        record, owner = instrumentation.begin(u'2pm', u'en$core', None)
+        assert instrumentation.current() is record
+        record.mark(u'engine')
+        instrumentation.end(record, owner, [{}])
+    assert not instrumentation.hooks
+
+    assert records == [record]
+    assert record.input_length == 3
+    assert record.entity_count == 1
+    assert record.timings[u'engine'] <= record.timings[u'total']
+    assert instrumentation.current() is None
+
+
+def test_nested_calls():
+    instrumentation = Instrumentation()
+    records = []
+    instrumentation.add_hook(records.append)
+    outer, outer_owner = instrumentation.begin(u'2pm', u'en$core', None)
+    inner, inner_owner = instrumentation.begin(u'2pm', u'en$core', None)
+    assert inner is outer
+    assert not inner_owner
+
+    instrumentation.end(inner, inner_owner, [])
+    assert records == []
+    instrumentation.end(outer, outer_owner, [], error=ValueError())
+    assert records == [outer]
+    assert isinstance(outer.error, ValueError)
+
+
+def test_batch_call():
+    instrumentation = Instrumentation()
+    records = []
+    instrumentation.add_hook(records.append)
+    record, owner = instrumentation.begin_batch([u'2pm', u'42 degrees'], u'en$core', None)
+    inner, inner_owner = instrumentation.begin(u'2pm', u'en$core', None)
+    assert inner is record
+    assert not inner_owner
+    instrumentation.end(inner, inner_owner, [{}])
+
+    instrumentation.end(record, owner, [[{}], [{}, {}]])
+    assert records == [record]
+    assert record.input_count == 2
+    assert record.input_length == 13
+    assert record.entity_count == 3
@@ -0,0 +1,26 @@
+import pytest
+from dateutil import parser
+from duckling.isotime import parse_datetime
+
+
+@pytest.mark.parametrize('value', [
+    u'2013-02-12T04:30:00.000-02:00',
+    u'2013-02-12T04:30:00.123+05:30',
+    u'2013-02-12T04:30:00.000+00:00',
+    u'2013-02-12T04:30:00-02:00',
+    u'2013-02-12'
+])
+def test_parse_datetime(value):
+    assert parse_datetime(value) == parser.parse(value)
+
+
+def test_parse_datetime_shares_timezones():
+    first = parse_datetime(u'2013-02-12T04:30:00.000-02:00')
+    second = parse_datetime(u'2017-08-01T00:00:00.000-02:00')
+    assert first.tzinfo is second.tzinfo
+    assert first.utcoffset().total_seconds() == -7200
+
+
+def test_parse_datetime_invalid():
+    with pytest.raises(ValueError):
+        parse_datetime(u'2013-02-30T04:30:00.000-02:00')
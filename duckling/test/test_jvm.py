@@ -0,0 +1,51 @@
+import threading
+import jpype
+from six.moves import _thread
+from duckling import jvm
+
+
+def test_attach_thread_once_and_detach_on_exit(monkeypatch):
+    calls = []
+    attached = set()
+    monkeypatch.setattr(jpype, 'isJVMStarted', lambda: True)
+    monkeypatch.setattr(jpype, 'isThreadAttachedToJVM',
+                        lambda: _thread.get_ident() in attached)
+
+    def attach():
+        calls.append(u'attach')
+        attached.add(_thread.get_ident())
+
+    def detach():
+        calls.append(u'detach')
+        attached.discard(_thread.get_ident())
+
+    monkeypatch.setattr(jpype, 'attachThreadToJVM', attach)
+    monkeypatch.setattr(jpype, 'detachThreadFromJVM', detach)
+
+    def work():
+        jvm.attach_thread()
+        jvm.attach_thread()
+
+    threads = len(threading.enumerate())
+    thread = threading.Thread(target=work)
+    thread.start()
+    thread.join()
+
+    assert calls == [u'attach', u'detach']
+    assert not attached
+    # no dummy thread is left behind by the detach on exit
+    assert len(threading.enumerate()) == threads
+
+
+def test_attach_thread_keeps_existing_attachment(monkeypatch):
+    calls = []
+    monkeypatch.setattr(jpype, 'isJVMStarted', lambda: True)
+    monkeypatch.setattr(jpype, 'isThreadAttachedToJVM', lambda: True)
+    monkeypatch.setattr(jpype, 'attachThreadToJVM', lambda: calls.append(u'attach'))
+    monkeypatch.setattr(jpype, 'detachThreadFromJVM', lambda: calls.append(u'detach'))
+
+    thread = threading.Thread(target=jvm.attach_thread)
+    thread.start()
+    thread.join()
+
+    assert calls == []
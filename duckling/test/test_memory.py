@@ -0,0 +1,21 @@
+from duckling import memory, Language
+
+
+def test_heap_size():
+    assert memory.heap_size(['en'], footprints={u'en': 500}) == '832m'
+    assert memory.heap_size(['en', 'de'], footprints={u'en': 106, u'de': 95}) == '448m'
+    assert memory.heap_size(['en'], footprints={u'en': 106},
+                            headroom=1.0, granularity_mb=1) == '234m'
+
+
+def test_heap_size_without_measurements():
+    floor = '{size}m'.format(size=memory.UNMEASURED_HEAP_MB)
+    assert memory.heap_size([Language.ENGLISH]) == floor
+    assert memory.heap_size(['en', 'de'], footprints={u'en': 106}) == floor
+    assert memory.heap_size(['en'], footprints={u'en': 4000}) == '5184m'
+
+
+def test_heap_size_all_languages():
+    assert memory.heap_size() == memory.heap_size(Language.SUPPORTED_LANGUAGES)
+    assert set(memory.HEAP_FOOTPRINTS_MB) == set(
+        Language.convert_to_iso(language) for language in Language.SUPPORTED_LANGUAGES)
@@ -0,0 +1,68 @@
+import pytest
+from duckling import Dim, Language
+from duckling import prescreen, sources
+
+# dims of the entities in each English corpus file of the Duckling jar
+CORPUS_DIMS = {
+    u'communication': [Dim.EMAIL, Dim.URL, Dim.PHONENUMBER],
+    u'finance': [Dim.AMOUNTOFMONEY],
+    u'measure': [Dim.DISTANCE, Dim.VOLUME],
+    u'numbers': [Dim.NUMBER, Dim.ORDINAL],
+    u'temperature': [Dim.TEMPERATURE],
+    u'time': [Dim.TIME]
+}
+
+
+def corpus_texts(name):
+    source = dict(sources.language_sources(u'en', u'corpus'))[name]
+    return [value for kind, value in sources.read_forms(source) if kind == u'string']
+
+
+@pytest.mark.parametrize('name', sorted(CORPUS_DIMS))
+def test_corpus_passes(name):
+    texts = corpus_texts(name)
+    assert texts
+    for text in texts:
+        assert prescreen.might_contain_entities(text, Language.ENGLISH)
+        for dim in CORPUS_DIMS[name]:
+            assert prescreen.might_contain_entities(text, Language.ENGLISH, [dim]), (text, dim)
+
+
+@pytest.mark.parametrize('text', [
+    u'2pm', u'Let\'s meet tomorrow', u'it\'s 65 degrees in here', u'my timezone is pdt',
+    u'You owe me twenty bucks, please call me today', u'contact@frank-blechschmidt.com',
+    u'github.com/FraBle', u'(650)-424-4242', u'I commute 5 miles everyday'
+])
+def test_example_inputs_pass(text):
+    assert prescreen.might_contain_entities(text, Language.ENGLISH)
+
+
+@pytest.mark.parametrize('text', [u'ok thanks', u'sounds good', u'lol', u'Thanks!'])
+def test_chit_chat_is_rejected(text):
+    assert not prescreen.might_contain_entities(text, Language.ENGLISH)
+
+
+def test_dims():
+    assert prescreen.might_contain_entities(u'see you tomorrow', Language.ENGLISH, [Dim.TIME])
+    assert not prescreen.might_contain_entities(u'see you tomorrow', Language.ENGLISH, [Dim.EMAIL])
+
+
+def test_other_languages_pass():
+    assert prescreen.might_contain_entities(u'ok danke', Language.GERMAN)
+
+
+def test_rule_triggers():
+    source = u'''(
+      "intersect"
+      [(dim :number) #"(?i)and" (dim :number)]
+      (compose-numbers %1 %3)
+
+      "ten" ; a comment with "quotes"
+      #"(?i)ten"
+      {:dim :number :value 10}
+
+      "a pair"
+      [#"(?i)a" #"pair"]
+      {:dim :number :value 2}
+    )'''
+    assert prescreen.rule_triggers(source) == [u'(?i)ten', u'(?i)a']
@@ -0,0 +1,58 @@
+import pytest
+from duckling import Dim, Entity
+from duckling.segment import merge, segment
+
+
+@pytest.fixture
+def document():
+    return u''.join(u'Sentence number {number} is here. '.format(number=number)
+                    for number in range(40))
+
+
+def test_short_document():
+    assert segment(u'tomorrow at 2pm', max_length=100, overlap=10) == [(0, u'tomorrow at 2pm')]
+
+
+def test_segments_cover_document(document):
+    segments = segment(document, max_length=100, overlap=30)
+
+    assert len(segments) > 1
+    assert all(len(segment_str) <= 100 for _, segment_str in segments)
+    for offset, segment_str in segments:
+        assert document[offset:offset + len(segment_str)] == segment_str
+    for (offset, segment_str), (next_offset, _) in zip(segments, segments[1:]):
+        assert offset < next_offset <= offset + len(segment_str)
+    assert segments[-1][0] + len(segments[-1][1]) == len(document)
+
+
+def test_segments_end_at_boundaries(document):
+    for _, segment_str in segment(document, max_length=100, overlap=30)[:-1]:
+        assert segment_str.endswith(u'. ')
+
+
+def test_segments_without_boundaries():
+    document = u'word ' * 100
+    segments = segment(document, max_length=64, overlap=16)
+    assert all(segment_str.endswith(u' ') for _, segment_str in segments)
+    assert segments[-1][0] + len(segments[-1][1]) == len(document)
+
+
+def test_invalid_overlap():
+    with pytest.raises(ValueError):
+        segment(u'text', max_length=10, overlap=10)
+
+
+def test_merge():
+    segments = [(0, u'at 2pm. see you at 3pm. '), (8, u'see you at 3pm. ')]
+    results = [
+        [{u'dim': Dim.TIME, u'start': 3, u'end': 6},
+         {u'dim': Dim.TIME, u'start': 16, u'end': 22}],
+        [Entity(Dim.TIME, 8, 14, u'at 3pm', {})]
+    ]
+
+    merged = merge(segments, results)
+
+    assert [(entry[u'start'], entry[u'end']) for entry in merged[:1]] == [(3, 6)]
+    assert (merged[1].start, merged[1].end) == (16, 22)
+    assert len(merged) == 2
+    assert results[0][0] == {u'dim': Dim.TIME, u'start': 3, u'end': 6}
@@ -0,0 +1,141 @@
+import json
+import time
+import threading
+import pytest
+from datetime import datetime
+from six.moves import http_client
+from duckling import Duckling, Dim, DucklingServer, Entity
+
+
+class FakeDuckling(object):
+
+    def __init__(self):
+        self.loaded = threading.Event()
+        self.release = threading.Event()
+        self.release.set()
+
+    def load(self, languages=[]):
+        self.loaded.wait()
+
+    def parse(self, input_str, language='en$core', dim_filter=None, reference_time=''):
+        self.release.wait()
+        if input_str == u'error':
+            raise ValueError('bad input')
+        if input_str == u'entity':
+            return [Entity(Dim.TIME, 0, 6, input_str, {u'value': datetime(2013, 2, 12, 4, 30)})]
+        return [{u'body': input_str, u'language': language, u'dims': dim_filter}]
+
+    def parse_batch(self, inputs, language='en$core', dim_filter=None, reference_time=''):
+        return [self.parse(input_str, language, dim_filter) for input_str in inputs]
+
+
+@pytest.fixture
+def fake_server():
+    duckling = FakeDuckling()
+    server = DucklingServer(address=('127.0.0.1', 0), duckling=duckling,
+                            workers=1, queue_size=1)
+    server.start()
+    yield server, duckling
+    duckling.loaded.set()
+    duckling.release.set()
+    server.shutdown()
+
+
+def request(connection, method, path, content=None):
+    body = json.dumps(content) if content is not None else None
+    connection.request(method, path, body)
+    response = connection.getresponse()
+    return response.status, json.loads(response.read().decode('utf-8'))
+
+
+def test_readiness(fake_server):
+    server, duckling = fake_server
+    connection = http_client.HTTPConnection('127.0.0.1', server.port)
+
+    assert request(connection, 'GET', '/health/live')[0] == 200
+    assert request(connection, 'GET', '/health/ready') == (503, {u'status': u'loading'})
+    assert request(connection, 'POST', '/parse', {u'text': u'2pm'})[0] == 503
+
+    duckling.loaded.set()
+    server._loader.join()
+    assert request(connection, 'GET', '/health/ready') == (200, {u'status': u'ready'})
+
+
+def test_parse_keep_alive(fake_server):
+    server, duckling = fake_server
+    duckling.loaded.set()
+    server._loader.join()
+    connection = http_client.HTTPConnection('127.0.0.1', server.port)
+
+    assert request(connection, 'POST', '/parse', {u'text': u'2pm', u'dims': [u'time']}) == (
+        200, {u'result': [{u'body': u'2pm', u'language': u'en$core', u'dims': [u'time']}]})
+    status, content = request(connection, 'POST', '/parse_batch',
+                              {u'texts': [u'a', u'b'], u'language': u'de'})
+    assert status == 200
+    assert [result[0][u'body'] for result in content[u'results']] == [u'a', u'b']
+    assert content[u'results'][0][0][u'language'] == u'de'
+
+    assert request(connection, 'POST', '/parse', {u'input': u'2pm'})[0] == 400
+    assert request(connection, 'POST', '/parse', {u'text': u'error'})[0] == 400
+    assert request(connection, 'POST', '/unknown', {})[0] == 404
+
+
+def test_full_queue(fake_server):
+    server, duckling = fake_server
+    duckling.loaded.set()
+    server._loader.join()
+    duckling.release.clear()
+
+    # one request is parsed by the worker and one waits in the queue
+    running = server.submit_parse(u'running')
+    while not server._jobs.empty():
+        time.sleep(0.01)
+    waiting = server.submit_parse(u'waiting')
+    connection = http_client.HTTPConnection('127.0.0.1', server.port)
+    assert request(connection, 'POST', '/parse', {u'text': u'2pm'})[0] == 503
+
+    duckling.release.set()
+    assert running.done.wait(5) and waiting.done.wait(5)
+    assert waiting.result[0][u'body'] == u'waiting'
+
+
+def test_parse_entities_and_datetimes(fake_server):
+    server, duckling = fake_server
+    duckling.loaded.set()
+    server._loader.join()
+    connection = http_client.HTTPConnection('127.0.0.1', server.port)
+
+    assert request(connection, 'POST', '/parse', {u'text': u'entity'}) == (
+        200, {u'result': [{u'dim': u'time', u'body': u'entity', u'start': 0, u'end': 6,
+                           u'value': {u'value': u'2013-02-12T04:30:00'}}]})
+
+
+@pytest.mark.parametrize('length', ['-1', 'many'])
+def test_invalid_content_length(fake_server, length):
+    server, duckling = fake_server
+    duckling.loaded.set()
+    server._loader.join()
+    connection = http_client.HTTPConnection('127.0.0.1', server.port)
+    connection.putrequest('POST', '/parse')
+    connection.putheader('Content-Length', length)
+    connection.endheaders()
+    response = connection.getresponse()
+
+    assert response.status == 400
+    assert u'Invalid request' in json.loads(response.read().decode('utf-8'))[u'error']
+
+
+def test_parse_duckling():
+    server = DucklingServer(address=('127.0.0.1', 0),
+                            duckling=Duckling(jvm_started=True), languages=['en'])
+    server.start()
+    try:
+        server._loader.join()
+        connection = http_client.HTTPConnection('127.0.0.1', server.port)
+        status, content = request(connection, 'POST', '/parse',
+                                  {u'text': u'42 degrees', u'dims': [Dim.TEMPERATURE]})
+    finally:
+        server.shutdown()
+
+    assert status == 200
+    assert content[u'result'][0][u'value'][u'value'] == 42.0
@@ -0,0 +1,33 @@
+import os
+import pytest
+from duckling import snapshot
+
+
+@pytest.fixture
+def classpath(tmpdir):
+    tmpdir.join('a.jar').write('a')
+    tmpdir.join('b.jar').write('b')
+    return os.pathsep.join([str(tmpdir.join('a.jar')), str(tmpdir.join('b.jar'))])
+
+
+def test_write_read(tmpdir, classpath):
+    path = str(tmpdir.join('snapshots', 'duckling.snapshot'))
+    fingerprint = snapshot.fingerprint(classpath)
+    snapshot.write(path, fingerprint, u'{:en$core {"rule" {}}}')
+
+    assert snapshot.read(path, fingerprint) == u'{:en$core {"rule" {}}}'
+
+
+def test_read_other_jars(tmpdir, classpath):
+    path = str(tmpdir.join('duckling.snapshot'))
+    snapshot.write(path, snapshot.fingerprint(classpath), u'{}')
+    tmpdir.join('b.jar').write('another b')
+
+    assert snapshot.read(path, snapshot.fingerprint(classpath)) is None
+
+
+def test_read_invalid(tmpdir, classpath):
+    path = tmpdir.join('duckling.snapshot')
+    assert snapshot.read(str(path), snapshot.fingerprint(classpath)) is None
+    path.write('not gzipped')
+    assert snapshot.read(str(path), snapshot.fingerprint(classpath)) is None
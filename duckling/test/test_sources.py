@@ -0,0 +1,20 @@
+from duckling import sources
+
+
+def test_read_forms():
+    source = u'(\n  ; a comment "skipped"\n  "42"\n  #"(?i)forty[- ]two"\n' \
+             u'  ["a" #"b" (c)]\n  {:value 42}\n)'
+    assert sources.read_forms(source) == [
+        (u'string', u'42'),
+        (u'regex', u'(?i)forty[- ]two'),
+        (u'vector', [(u'string', u'a'), (u'regex', u'b'), (u'other', None)]),
+        (u'other', None)
+    ]
+
+
+def test_language_sources():
+    rules = dict(sources.language_sources(u'en', u'rules'))
+    assert u'time' in rules
+    assert [name for name, _ in sources.language_sources(u'en', u'corpus')] == sorted(
+        name for name, _ in sources.language_sources(u'en', u'corpus'))
+    assert sources.language_sources(u'xx', u'rules') == []
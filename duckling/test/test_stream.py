@@ -0,0 +1,42 @@
+import time
+import random
+from duckling.stream import stream_parse
+
+
+def fake_parse_batch(inputs, reference_time=''):
+    time.sleep(random.random() / 100)
+    return [[text.upper(), ref] for text, ref in zip(inputs, reference_time)]
+
+
+def test_stream_ordered():
+    inputs = ['input {i}'.format(i=i) for i in range(100)]
+    result = list(stream_parse(fake_parse_batch, iter(inputs), window=10,
+                               batch_size=3, workers=4))
+    assert [entry[0] for entry in result] == [text.upper() for text in inputs]
+
+
+def test_stream_unordered():
+    inputs = ['input {i}'.format(i=i) for i in range(100)]
+    result = list(stream_parse(fake_parse_batch, iter(inputs), window=10,
+                               batch_size=3, workers=4, ordered=False))
+    assert sorted(entry[0] for entry in result) == sorted(text.upper() for text in inputs)
+
+
+def test_stream_tuples():
+    inputs = [(1, 'a', '1990-12-30'), (2, 'b'), 'c']
+    result = list(stream_parse(fake_parse_batch, inputs, reference_time='now'))
+    assert result == [(1, ['A', '1990-12-30']), (2, ['B', 'now']), ['C', 'now']]
+
+
+def test_stream_window():
+    consumed = []
+
+    def inputs():
+        for i in range(1000):
+            consumed.append(i)
+            yield str(i)
+
+    stream = stream_parse(fake_parse_batch, inputs(), window=8, batch_size=4)
+    next(stream)
+    assert len(consumed) <= 8 + 4
+    stream.close()
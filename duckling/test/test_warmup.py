@@ -0,0 +1,37 @@
+import time
+from duckling import warmup
+
+
+def test_corpus():
+    texts = warmup.corpus(u'en')
+    assert 0 < len(texts) <= warmup.CORPUS_SIZE
+    assert u'37°C' in warmup.corpus(u'en', size=1000)
+    assert len(warmup.corpus(u'en', size=10)) <= 10
+
+
+def test_is_steady():
+    assert not warmup.is_steady([1.0, 1.0])
+    assert not warmup.is_steady([50.0, 10.0, 2.0, 1.0])
+    assert warmup.is_steady([50.0, 10.0, 1.05, 1.0, 1.02])
+
+
+def test_run():
+    parsed = []
+
+    def parse(text):
+        # the first round is slow, later rounds are steady
+        time.sleep(0.05 if len(parsed) < 2 else 0.01)
+        parsed.append(text)
+
+    report = warmup.run(parse, [u'a', u'b'], iterations=10, tolerance=0.5)
+    assert report[u'steady'] is True
+    assert report[u'rounds'] == 4
+    assert report[u'first_ms'] > report[u'steady_ms']
+    assert parsed == [u'a', u'b'] * 4
+
+
+def test_run_not_steady():
+    report = warmup.run(lambda text: None, [u'a'], iterations=2)
+    assert report[u'rounds'] == 2
+    assert report[u'steady'] is False
+    assert warmup.run(lambda text: None, [])[u'rounds'] == 0
@@ -0,0 +1,100 @@
+"""Warm-up of the JVM JIT for Duckling.
+
+The first parses after load() run interpreted Clojure rule code and are much
+slower than later ones. Warming up parses a corpus in rounds until the mean
+latency of a round stops improving, so the JIT has compiled the hot code
+before real inputs arrive.
+
+The built-in corpus of a language is taken from the corpus files of the
+bundled Duckling jar, which cover every dim the language supports.
+"""
+
+from timeit import default_timer as timer
+from .sources import language_sources, read_forms
+
+# fixed reference time of warm-up parses
+REFERENCE_TIME = u'2013-02-12T04:30:00-02:00'
+
+# maximum number of texts of a built-in corpus used per round
+CORPUS_SIZE = 100
+
+_corpora = {}
+
+
+def corpus(iso_language, size=CORPUS_SIZE):
+    """Returns the built-in warm-up corpus of a language.
+
+    Args:
+        iso_language: The ISO 639-1 code of the language, e.g. u'en'.
+        size: Optional maximum number of texts, spread evenly over the
+            corpus of the language. Default is CORPUS_SIZE.
+
+    Returns:
+        A list of input strings, empty if the jar has no corpus for the
+        language.
+    """
+    if iso_language not in _corpora:
+        _corpora[iso_language] = [value for _, source in language_sources(iso_language, u'corpus')
+                                  for kind, value in read_forms(source) if kind == u'string']
+    texts = _corpora[iso_language]
+    step = max(1, -(-len(texts) // size))
+    return texts[::step]
+
+
+def is_steady(latencies, window=3, tolerance=0.1):
+    """Checks if the last rounds of a warm-up have a stable latency.
+
+    Args:
+        latencies: The mean latency of every round so far.
+        window: Optional number of last rounds to compare. Default is 3.
+        tolerance: Optional relative difference accepted between the
+            fastest and the slowest of these rounds. Default is 0.1.
+
+    Returns:
+        True if there are at least window rounds and the slowest of the last
+        window rounds is at most tolerance slower than the fastest.
+    """
+    if len(latencies) < window:
+        return False
+    last = latencies[-window:]
+    return max(last) <= min(last) * (1 + tolerance)
+
+
+def run(parse, texts, iterations=20, window=3, tolerance=0.1):
+    """Parses texts in rounds until the latency is steady.
+
+    Args:
+        parse: A function taking an input string.
+        texts: The list of input strings parsed every round.
+        iterations: Optional maximum number of rounds. Default is 20.
+        window: Optional number of rounds which have to be steady, see
+            is_steady(). Default is 3.
+        tolerance: Optional tolerance of is_steady(). Default is 0.1.
+
+    Returns:
+        A dict with the number of rounds, whether the latency got steady,
+        the mean latency per text in milliseconds of the first and the last
+        round and the total seconds:
+
+        {
+            u'rounds': 7,
+            u'steady': True,
+            u'first_ms': 41.2,
+            u'steady_ms': 1.3,
+            u'seconds': 5.8
+        }
+    """
+    latencies = []
+    started = timer()
+    while texts and len(latencies) < iterations and not is_steady(latencies, window, tolerance):
+        round_started = timer()
+        for text in texts:
+            parse(text)
+        latencies.append((timer() - round_started) / len(texts))
+    return {
+        u'rounds': len(latencies),
+        u'steady': is_steady(latencies, window, tolerance),
+        u'first_ms': 1000.0 * latencies[0] if latencies else None,
+        u'steady_ms': 1000.0 * latencies[-1] if latencies else None,
+        u'seconds': timer() - started
+    }
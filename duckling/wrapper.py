@@ -1,6 +1,9 @@
+import functools
 from .duckling import Duckling
 from .language import Language
 from .dim import Dim
+from .entity import WrapperEntity
+from .stream import stream_parse
 
 
 class DucklingWrapper(object):
@@ -18,6 +21,14 @@ class DucklingWrapper(object):
             size. Default is 128m.
         maximum_heap_size: Optional attribute to set maximum heap size. Default
             is 2048m.
+        cache: Optional ResultCache to cache Duckling results in. Default is
+            None (no caching).
+        compact_results: Optional attribute to specify if results should be
+            returned as WrapperEntity objects instead of dicts. Default is
+            False.
+        prescreen: Optional attribute to specify if inputs which can't
+            contain any entity should skip Duckling, see Duckling. Default is
+            False.
     """
 
     def __init__(self,
@@ -25,15 +36,21 @@ class DucklingWrapper(object):
                  parse_datetime=False,
                  language=Language.ENGLISH,
                  minimum_heap_size='128m',
-                 maximum_heap_size='2048m'):
+                 maximum_heap_size='2048m',
+                 cache=None,
+                 compact_results=False,
+                 prescreen=False):
         super(DucklingWrapper, self).__init__()
+        self.compact_results = compact_results
         self.language = Language.convert_to_duckling_language_id(language)
         self.duckling = Duckling(
             jvm_started=jvm_started,
             parse_datetime=parse_datetime,
             minimum_heap_size=minimum_heap_size,
-            maximum_heap_size=maximum_heap_size)
-        self.duckling.load()
+            maximum_heap_size=maximum_heap_size,
+            cache=cache,
+            prescreen=prescreen)
+        self.duckling.load([self.language])
         self._dims = {
             Dim.TIME:           self._parse_time,
             Dim.TEMPERATURE:    self._parse_number_with_unit,
@@ -58,13 +75,63 @@ class DucklingWrapper(object):
         }
 
     def _parse(self, input_str, dim=None, reference_time=''):
+        instrumentation = self.duckling.instrumentation
+        if not instrumentation.hooks:
+            duckling_result = self.duckling.parse(
+                input_str, self.language, dim_filter=dim,
+                reference_time=reference_time)
+            return self._process(duckling_result)
+
+        # Duckling.parse() adds its stages to the record started here
+        record, owner = instrumentation.begin(input_str, self.language, dim)
+        result = error = None
+        try:
+            duckling_result = self.duckling.parse(
+                input_str, self.language, dim_filter=dim,
+                reference_time=reference_time)
+            result = self._process(duckling_result)
+            record.mark(u'postprocessing')
+            return result
+        except Exception as parse_error:
+            error = parse_error
+            raise
+        finally:
+            instrumentation.end(record, owner, result, error)
+
+    def _parse_batch(self, input_strs, dim=None, reference_time=''):
+        instrumentation = self.duckling.instrumentation
+        if not instrumentation.hooks:
+            duckling_results = self.duckling.parse_batch(
+                input_strs, self.language, dim_filter=dim,
+                reference_time=reference_time)
+            return [self._process(duckling_result)
+                    for duckling_result in duckling_results]
+
+        # Duckling.parse_batch() adds its stages to the record started here
+        input_strs = list(input_strs)
+        record, owner = instrumentation.begin_batch(input_strs, self.language, dim)
+        result = error = None
+        try:
+            duckling_results = self.duckling.parse_batch(
+                input_strs, self.language, dim_filter=dim,
+                reference_time=reference_time)
+            result = [self._process(duckling_result)
+                      for duckling_result in duckling_results]
+            record.mark(u'postprocessing')
+            return result
+        except Exception as parse_error:
+            error = parse_error
+            raise
+        finally:
+            instrumentation.end(record, owner, result, error)
+
+    def _process(self, duckling_result):
         result = []
-        duckling_result = self.duckling.parse(
-            input_str, self.language, dim_filter=dim,
-            reference_time=reference_time)
         for entry in duckling_result:
             if entry[u'dim'] in self._dims:
                 result_entry = self._dims[entry[u'dim']](entry)
+                if self.compact_results:
+                    result_entry = WrapperEntity.from_dict(result_entry)
                 result.append(result_entry)
         return result
 
@@ -164,13 +231,18 @@ class DucklingWrapper(object):
 
     # Public API
 
-    def parse(self, input_str, reference_time=''):
-        """Parses input with Duckling for all dims.
+    def parse(self, input_str, reference_time='', dims=None):
+        """Parses input with Duckling for all dims or the given dims.
+
+        The dims are parsed with a single Duckling call and the results of
+        all dims are returned in one list.
 
         Args:
             input_str: An input string, e.g. 'You owe me twenty bucks, please
                 call me today'.
             reference_time: Optional reference time for Duckling.
+            dims: Optional list of dims to parse, e.g. [Dim.TIME,
+                Dim.AMOUNTOFMONEY]. Default is None (all dims).
 
         Returns:
             A preprocessed list of results (dicts) from Duckling output. For
@@ -253,7 +325,81 @@ class DucklingWrapper(object):
                }
             ]
         """
-        return self._parse(input_str, reference_time=reference_time)
+        return self._parse(input_str, dim=dims, reference_time=reference_time)
+
+    def parse_batch(self, input_strs, dims=None, reference_time=''):
+        """Parses a list of inputs with a single call into Duckling.
+
+        Args:
+            input_strs: A list of input strings, e.g. ['Let's meet at 11:45am',
+                'You owe me 10 dollars'].
+            dims: Optional list of dims to parse, e.g. [Dim.TIME,
+                Dim.AMOUNTOFMONEY]. Default is None (all dims).
+            reference_time: Optional reference time for Duckling, either a
+                single reference time or a list with one per input string.
+
+        Returns:
+            A list with one preprocessed list of results (dicts) per input
+            string, in input order.
+        """
+        return self._parse_batch(input_strs, dim=dims,
+                                 reference_time=reference_time)
+
+    def parse_document(self, document, dims=None, reference_time='',
+                       max_segment_length=1000, overlap=100, parallel=True):
+        """Parses a long document in overlapping segments.
+
+        See Duckling.parse_document(). Entity positions are relative to the
+        document.
+
+        Args:
+            document: The document string that has to be parsed.
+            dims: Optional list of dims to parse. Default is None (all dims).
+            reference_time: Optional reference time for Duckling.
+            max_segment_length: Optional maximum length of a segment. Default
+                is 1000.
+            overlap: Optional maximum number of characters shared by two
+                consecutive segments. Default is 100.
+            parallel: Optional parameter to parse the segments in parallel.
+                Default is True.
+
+        Returns:
+            A preprocessed list of results (dicts) from Duckling output, like
+            parse().
+        """
+        return self._process(self.duckling.parse_document(
+            document, self.language, dim_filter=dims,
+            reference_time=reference_time, max_segment_length=max_segment_length,
+            overlap=overlap, parallel=parallel))
+
+    def parse_stream(self, inputs, dims=None, reference_time='', window=256,
+                     batch_size=32, workers=1, ordered=True):
+        """Lazily parses an iterable of inputs with a bounded in-flight window.
+
+        Args:
+            inputs: An iterable of input strings or of (id, text) and
+                (id, text, reference_time) tuples.
+            dims: Optional list of dims to parse, e.g. [Dim.TIME,
+                Dim.AMOUNTOFMONEY]. Default is None (all dims).
+            reference_time: Optional reference time for inputs which don't
+                specify one.
+            window: Optional maximum number of inputs in flight. Default is
+                256.
+            batch_size: Optional number of inputs per Duckling call. Default
+                is 32.
+            workers: Optional number of threads parsing batches. Default is 1.
+            ordered: Optional parameter to yield results in input order. If
+                False, results are yielded as soon as their batch completes.
+                Default is True.
+
+        Yields:
+            A preprocessed list of results (dicts) for each input string, or
+            an (id, results) tuple for each tuple input.
+        """
+        return stream_parse(
+            functools.partial(self._parse_batch, dim=dims), inputs,
+            reference_time=reference_time, window=window,
+            batch_size=batch_size, workers=workers, ordered=ordered)
 
     def parse_time(self, input_str, reference_time=''):
         """Parses input with Duckling for occurences of times.
@@ -286,6 +432,21 @@ class DucklingWrapper(object):
         return self._parse(input_str, dim=Dim.TIME,
                            reference_time=reference_time)
 
+    def parse_time_batch(self, input_strs, reference_time=''):
+        """Parses a list of inputs with Duckling for occurences of times.
+
+        Args:
+            input_strs: A list of input strings, e.g. ['Let's meet at 11:45am'].
+            reference_time: Optional reference time for Duckling, either a
+                single reference time or a list with one per input string.
+
+        Returns:
+            A list with one preprocessed list of results (dicts) per input
+            string, in input order, like parse_time().
+        """
+        return self._parse_batch(input_strs, dim=Dim.TIME,
+                                 reference_time=reference_time)
+
     def parse_timezone(self, input_str):
         """Parses input with Duckling for occurences of timezones.
 
@@ -310,6 +471,21 @@ class DucklingWrapper(object):
         """
         return self._parse(input_str, dim=Dim.TIMEZONE)
 
+    def parse_timezone_batch(self, input_strs, reference_time=''):
+        """Parses a list of inputs with Duckling for occurences of timezones.
+
+        Args:
+            input_strs: A list of input strings, e.g. ['My timezone is pdt'].
+            reference_time: Optional reference time for Duckling, either a
+                single reference time or a list with one per input string.
+
+        Returns:
+            A list with one preprocessed list of results (dicts) per input
+            string, in input order, like parse_timezone().
+        """
+        return self._parse_batch(input_strs, dim=Dim.TIMEZONE,
+                                 reference_time=reference_time)
+
     def parse_temperature(self, input_str):
         """Parses input with Duckling for occurences of temperatures.
 
@@ -346,6 +522,22 @@ class DucklingWrapper(object):
         """
         return self._parse(input_str, dim=Dim.TEMPERATURE)
 
+    def parse_temperature_batch(self, input_strs, reference_time=''):
+        """Parses a list of inputs with Duckling for occurences of temperatures.
+
+        Args:
+            input_strs: A list of input strings, e.g.
+                ['Let's change the temperature from thirty two celsius to 65 degrees'].
+            reference_time: Optional reference time for Duckling, either a
+                single reference time or a list with one per input string.
+
+        Returns:
+            A list with one preprocessed list of results (dicts) per input
+            string, in input order, like parse_temperature().
+        """
+        return self._parse_batch(input_strs, dim=Dim.TEMPERATURE,
+                                 reference_time=reference_time)
+
     def parse_number(self, input_str):
         """Parses input with Duckling for occurences of numbers.
 
@@ -370,6 +562,21 @@ class DucklingWrapper(object):
         """
         return self._parse(input_str, dim=Dim.NUMBER)
 
+    def parse_number_batch(self, input_strs, reference_time=''):
+        """Parses a list of inputs with Duckling for occurences of numbers.
+
+        Args:
+            input_strs: A list of input strings, e.g. ['I'm 25 years old'].
+            reference_time: Optional reference time for Duckling, either a
+                single reference time or a list with one per input string.
+
+        Returns:
+            A list with one preprocessed list of results (dicts) per input
+            string, in input order, like parse_number().
+        """
+        return self._parse_batch(input_strs, dim=Dim.NUMBER,
+                                 reference_time=reference_time)
+
     def parse_ordinal(self, input_str):
         """Parses input with Duckling for occurences of ordinals.
 
@@ -403,6 +610,21 @@ class DucklingWrapper(object):
         """
         return self._parse(input_str, dim=Dim.ORDINAL)
 
+    def parse_ordinal_batch(self, input_strs, reference_time=''):
+        """Parses a list of inputs with Duckling for occurences of ordinals.
+
+        Args:
+            input_strs: A list of input strings, e.g. ['I'm first, you're 2nd'].
+            reference_time: Optional reference time for Duckling, either a
+                single reference time or a list with one per input string.
+
+        Returns:
+            A list with one preprocessed list of results (dicts) per input
+            string, in input order, like parse_ordinal().
+        """
+        return self._parse_batch(input_strs, dim=Dim.ORDINAL,
+                                 reference_time=reference_time)
+
     def parse_distance(self, input_str):
         """Parses input with Duckling for occurences of distances.
 
@@ -428,6 +650,21 @@ class DucklingWrapper(object):
         """
         return self._parse(input_str, dim=Dim.DISTANCE)
 
+    def parse_distance_batch(self, input_strs, reference_time=''):
+        """Parses a list of inputs with Duckling for occurences of distances.
+
+        Args:
+            input_strs: A list of input strings, e.g. ['I commute 5 miles everyday'].
+            reference_time: Optional reference time for Duckling, either a
+                single reference time or a list with one per input string.
+
+        Returns:
+            A list with one preprocessed list of results (dicts) per input
+            string, in input order, like parse_distance().
+        """
+        return self._parse_batch(input_strs, dim=Dim.DISTANCE,
+                                 reference_time=reference_time)
+
     def parse_volume(self, input_str):
         """Parses input with Duckling for occurences of volumes.
 
@@ -465,6 +702,21 @@ class DucklingWrapper(object):
         """
         return self._parse(input_str, dim=Dim.VOLUME)
 
+    def parse_volume_batch(self, input_strs, reference_time=''):
+        """Parses a list of inputs with Duckling for occurences of volumes.
+
+        Args:
+            input_strs: A list of input strings, e.g. ['1 gallon is 3785ml'].
+            reference_time: Optional reference time for Duckling, either a
+                single reference time or a list with one per input string.
+
+        Returns:
+            A list with one preprocessed list of results (dicts) per input
+            string, in input order, like parse_volume().
+        """
+        return self._parse_batch(input_strs, dim=Dim.VOLUME,
+                                 reference_time=reference_time)
+
     def parse_money(self, input_str):
         """Parses input with Duckling for occurences of moneys.
 
@@ -490,6 +742,21 @@ class DucklingWrapper(object):
         """
         return self._parse(input_str, dim=Dim.AMOUNTOFMONEY)
 
+    def parse_money_batch(self, input_strs, reference_time=''):
+        """Parses a list of inputs with Duckling for occurences of moneys.
+
+        Args:
+            input_strs: A list of input strings, e.g. ['You owe me 10 dollars'].
+            reference_time: Optional reference time for Duckling, either a
+                single reference time or a list with one per input string.
+
+        Returns:
+            A list with one preprocessed list of results (dicts) per input
+            string, in input order, like parse_money().
+        """
+        return self._parse_batch(input_strs, dim=Dim.AMOUNTOFMONEY,
+                                 reference_time=reference_time)
+
     def parse_duration(self, input_str):
         """Parses input with Duckling for occurences of durations.
 
@@ -521,6 +788,21 @@ class DucklingWrapper(object):
         """
         return self._parse(input_str, dim=Dim.DURATION)
 
+    def parse_duration_batch(self, input_strs, reference_time=''):
+        """Parses a list of inputs with Duckling for occurences of durations.
+
+        Args:
+            input_strs: A list of input strings, e.g. ['I ran for 2 hours today'].
+            reference_time: Optional reference time for Duckling, either a
+                single reference time or a list with one per input string.
+
+        Returns:
+            A list with one preprocessed list of results (dicts) per input
+            string, in input order, like parse_duration().
+        """
+        return self._parse_batch(input_strs, dim=Dim.DURATION,
+                                 reference_time=reference_time)
+
     def parse_email(self, input_str):
         """Parses input with Duckling for occurences of emails.
 
@@ -546,6 +828,22 @@ class DucklingWrapper(object):
         """
         return self._parse(input_str, dim=Dim.EMAIL)
 
+    def parse_email_batch(self, input_strs, reference_time=''):
+        """Parses a list of inputs with Duckling for occurences of emails.
+
+        Args:
+            input_strs: A list of input strings, e.g.
+                ['Shoot me an email at contact@frank-blechschmidt.com'].
+            reference_time: Optional reference time for Duckling, either a
+                single reference time or a list with one per input string.
+
+        Returns:
+            A list with one preprocessed list of results (dicts) per input
+            string, in input order, like parse_email().
+        """
+        return self._parse_batch(input_strs, dim=Dim.EMAIL,
+                                 reference_time=reference_time)
+
     def parse_url(self, input_str):
         """Parses input with Duckling for occurences of urls.
 
@@ -581,6 +879,22 @@ class DucklingWrapper(object):
         """
         return self._parse(input_str, dim=Dim.URL)
 
+    def parse_url_batch(self, input_strs, reference_time=''):
+        """Parses a list of inputs with Duckling for occurences of urls.
+
+        Args:
+            input_strs: A list of input strings, e.g.
+                ['http://frank-blechschmidt.com is under construction'].
+            reference_time: Optional reference time for Duckling, either a
+                single reference time or a list with one per input string.
+
+        Returns:
+            A list with one preprocessed list of results (dicts) per input
+            string, in input order, like parse_url().
+        """
+        return self._parse_batch(input_strs, dim=Dim.URL,
+                                 reference_time=reference_time)
+
     def parse_phone_number(self, input_str):
         """Parses input with Duckling for occurences of phone numbers.
 
@@ -606,6 +920,21 @@ class DucklingWrapper(object):
         """
         return self._parse(input_str, dim=Dim.PHONENUMBER)
 
+    def parse_phone_number_batch(self, input_strs, reference_time=''):
+        """Parses a list of inputs with Duckling for occurences of phone numbers.
+
+        Args:
+            input_strs: A list of input strings, e.g. ['424-242-4242 is obviously a fake number'].
+            reference_time: Optional reference time for Duckling, either a
+                single reference time or a list with one per input string.
+
+        Returns:
+            A list with one preprocessed list of results (dicts) per input
+            string, in input order, like parse_phone_number().
+        """
+        return self._parse_batch(input_strs, dim=Dim.PHONENUMBER,
+                                 reference_time=reference_time)
+
     def parse_leven_product(self, input_str):
         """Parses input with Duckling for occurences of products.
 
@@ -631,6 +960,21 @@ class DucklingWrapper(object):
         """
         return self._parse(input_str, dim=Dim.LEVENPRODUCT)
 
+    def parse_leven_product_batch(self, input_strs, reference_time=''):
+        """Parses a list of inputs with Duckling for occurences of products.
+
+        Args:
+            input_strs: A list of input strings, e.g. ['5 cups of sugar'].
+            reference_time: Optional reference time for Duckling, either a
+                single reference time or a list with one per input string.
+
+        Returns:
+            A list with one preprocessed list of results (dicts) per input
+            string, in input order, like parse_leven_product().
+        """
+        return self._parse_batch(input_strs, dim=Dim.LEVENPRODUCT,
+                                 reference_time=reference_time)
+
     def parse_leven_unit(self, input_str):
         """Parses input with Duckling for occurences of leven units.
 
@@ -656,6 +1000,21 @@ class DucklingWrapper(object):
         """
         return self._parse(input_str, dim=Dim.LEVENUNIT)
 
+    def parse_leven_unit_batch(self, input_strs, reference_time=''):
+        """Parses a list of inputs with Duckling for occurences of leven units.
+
+        Args:
+            input_strs: A list of input strings, e.g. ['two pounds of meat'].
+            reference_time: Optional reference time for Duckling, either a
+                single reference time or a list with one per input string.
+
+        Returns:
+            A list with one preprocessed list of results (dicts) per input
+            string, in input order, like parse_leven_unit().
+        """
+        return self._parse_batch(input_strs, dim=Dim.LEVENUNIT,
+                                 reference_time=reference_time)
+
     def parse_quantity(self, input_str):
         """Parses input with Duckling for occurences of quantities.
 
@@ -683,6 +1042,21 @@ class DucklingWrapper(object):
         """
         return self._parse(input_str, dim=Dim.QUANTITY)
 
+    def parse_quantity_batch(self, input_strs, reference_time=''):
+        """Parses a list of inputs with Duckling for occurences of quantities.
+
+        Args:
+            input_strs: A list of input strings, e.g. ['5 cups of sugar'].
+            reference_time: Optional reference time for Duckling, either a
+                single reference time or a list with one per input string.
+
+        Returns:
+            A list with one preprocessed list of results (dicts) per input
+            string, in input order, like parse_quantity().
+        """
+        return self._parse_batch(input_strs, dim=Dim.QUANTITY,
+                                 reference_time=reference_time)
+
     def parse_cycle(self, input_str):
         """Parses input with Duckling for occurences of cycles.
 
@@ -694,6 +1068,21 @@ class DucklingWrapper(object):
         """
         return self._parse(input_str, dim=Dim.CYCLE)
 
+    def parse_cycle_batch(self, input_strs, reference_time=''):
+        """Parses a list of inputs with Duckling for occurences of cycles.
+
+        Args:
+            input_strs: A list of input strings, e.g. ['coming week'].
+            reference_time: Optional reference time for Duckling, either a
+                single reference time or a list with one per input string.
+
+        Returns:
+            A list with one preprocessed list of results (dicts) per input
+            string, in input order, like parse_cycle().
+        """
+        return self._parse_batch(input_strs, dim=Dim.CYCLE,
+                                 reference_time=reference_time)
+
     def parse_unit(self, input_str):
         """Parses input with Duckling for occurences of units.
 
@@ -705,6 +1094,21 @@ class DucklingWrapper(object):
         """
         return self._parse(input_str, dim=Dim.UNIT)
 
+    def parse_unit_batch(self, input_strs, reference_time=''):
+        """Parses a list of inputs with Duckling for occurences of units.
+
+        Args:
+            input_strs: A list of input strings, e.g. ['6 degrees outside'].
+            reference_time: Optional reference time for Duckling, either a
+                single reference time or a list with one per input string.
+
+        Returns:
+            A list with one preprocessed list of results (dicts) per input
+            string, in input order, like parse_unit().
+        """
+        return self._parse_batch(input_strs, dim=Dim.UNIT,
+                                 reference_time=reference_time)
+
     def parse_unit_of_duration(self, input_str):
         """Parses input with Duckling for occurences of units of duration.
 
@@ -715,3 +1119,18 @@ class DucklingWrapper(object):
             A preprocessed list of results (dicts) from Duckling output.
         """
         return self._parse(input_str, dim=Dim.UNITOFDURATION)
+
+    def parse_unit_of_duration_batch(self, input_strs, reference_time=''):
+        """Parses a list of inputs with Duckling for occurences of units of duration.
+
+        Args:
+            input_strs: A list of input strings, e.g. ['1 second'].
+            reference_time: Optional reference time for Duckling, either a
+                single reference time or a list with one per input string.
+
+        Returns:
+            A list with one preprocessed list of results (dicts) per input
+            string, in input order, like parse_unit_of_duration().
+        """
+        return self._parse_batch(input_strs, dim=Dim.UNITOFDURATION,
+                                 reference_time=reference_time)
@@ -34,8 +34,12 @@ setup(
     install_requires=[
         'JPype1',
         'python-dateutil',
-        'six'
+        'six',
+        'futures; python_version < "3.2"'
     ],
+    extras_require={
+        'numpy': ['numpy']
+    },
     setup_requires=['pytest-runner'],
     tests_require=['pytest', 'pytest-cov'],
     package_data={
@@ -48,6 +52,7 @@ setup(
             'jars/plumbing-0.5.3.jar',
             'jars/schema-1.0.1.jar',
             'jars/tools.logging-0.2.6.jar',
+            'interop.clj',
         ],
     },
     package_dir={'duckling': 'duckling'},